@@ -0,0 +1,248 @@
+"""
+Assistant Base
+==============
+Code shared by the CSV and Google Sheets assistants: running data
+sources (see sources.py) and handing their records to the assistant's
+sink (CSV files or Google Sheets tabs).
+
+The fetch_* and run_*_automation methods of both assistants are thin
+wrappers around the registered sources, so a fix or optimization in a
+source benefits both versions, and any registered source can be run
+with run_source(name).
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+from sources import get_source
+
+
+class AssistantBase:
+    """
+    Source runner shared by AutomationAssistant and AutomationAssistantGSheets.
+
+    Subclasses set SINK, implement save() and create self._sources = {};
+    they also provide the attributes sources use (http, stream_json,
+    max_workers, caches, ...).
+    """
+
+    SINK = None  # Sink name used to pick each source's default target
+    shards = 1   # Processes splitting sharded sources (see sharding.py)
+
+    def source(self, name):
+        """
+        Get this assistant's instance of a registered source.
+
+        Args:
+            name (str): Source name (e.g. "weather")
+
+        Returns:
+            Source: The source, created on first use
+        """
+        if name not in self._sources:
+            self._sources[name] = get_source(name)(self)
+        return self._sources[name]
+
+    def save(self, data, target):
+        """
+        Save records to one target of this assistant's sink.
+
+        Args:
+            data (list, record or RecordBatch): Records to save
+            target (str): CSV file name or Sheets tab name
+        """
+        raise NotImplementedError
+
+    def _mark_saved(self, data, target):
+        """
+        Record data as saved successfully: remembered for skip_unchanged,
+        and passed to every source (e.g. news articles only count as
+        collected once they are saved).
+
+        Args:
+            data (list or RecordBatch): Saved data
+            target (str): CSV file name or Sheets tab name
+        """
+        self.response_cache.mark_saved(target, data)
+        for source in list(self._sources.values()):
+            source.saved(data)
+
+    def _mark_failed(self, data, target=None):
+        """
+        Tell every source that saving data failed (e.g. so fetched news
+        articles can be fetched again).
+
+        Args:
+            data (list or RecordBatch): Data that was not saved
+            target (str): CSV file name or Sheets tab name
+        """
+        for source in list(self._sources.values()):
+            source.save_failed(data)
+
+    def _save(self, data, target):
+        """
+        Hand data to the write-behind queue, or save it right away
+        if write-behind is disabled.
+
+        Args:
+            data (list or RecordBatch): Data to save
+            target (str): CSV file name or Sheets tab name
+        """
+        if self.write_queue is None:
+            self.save(data, target)
+        else:
+            self.write_queue.put(data, target)
+
+    def run_source(self, name, target=None, **options):
+        """
+        Run one automation: fetch a source's data and save it.
+
+        Args:
+            name (str): Registered source name (e.g. "crypto")
+            target (str): Where to save (default: the source's target for this sink)
+            **options: Passed to the source's fetch()
+
+        Returns:
+            The fetched records (None or empty if nothing was fetched, and
+            None in sharded mode)
+        """
+        source = self.source(name)
+
+        print("\n" + "="*60)
+        print(source.title or f"{name.upper()} AUTOMATION")
+        print("="*60)
+
+        with self.metrics.span(name):
+            if self.shards > 1 and source.shard_option:
+                # Records stay in the shard processes; only the files are merged
+                self._run_sharded(source, target or source.target_for(self.SINK), options)
+                return None
+            data = source.fetch(**options)
+            if data:
+                self._save(data, target or source.target_for(self.SINK))
+        return data
+
+    def _run_sharded(self, source, target, options):
+        """
+        Fetch and save a source's items in self.shards processes.
+
+        Args:
+            source (Source): Source with a shard_option
+            target (str): Where the merged data goes
+            options (dict): fetch() options
+        """
+        raise NotImplementedError(f"{type(self).__name__} doesn't support sharded runs")
+
+    # --- Compatibility wrappers around the built-in sources -----------
+
+    @property
+    def crypto_failures(self):
+        """(chunk, reason) tuples for the crypto requests that failed last time."""
+        return self.source('crypto').failures
+
+    def _geocode_city(self, city):
+        """Convert a city name to (latitude, longitude), or None if not found."""
+        return self.source('weather').geocode(city)
+
+    def fetch_weather_data(self, city="London"):
+        """
+        Fetch current weather data from Open-Meteo API (free, no key required).
+
+        Args:
+            city (str): City name to get weather for
+
+        Returns:
+            WeatherRecord: Weather data or None if request fails
+        """
+        return self.source('weather').fetch_city(city)
+
+    def fetch_weather_batch(self, cities, chunk_size=None, max_workers=None):
+        """
+        Fetch current weather for many cities using as few forecast
+        requests as possible.
+
+        Args:
+            cities (list): City names to get weather for
+            chunk_size (int): Locations per forecast request (default: self.weather_batch_size)
+            max_workers (int): Concurrency limit (default: self.max_workers)
+
+        Returns:
+            tuple: (results, failures) - WeatherRecord rows, and (city, reason)
+                tuples for failed cities
+        """
+        return self.source('weather').fetch_batch(cities, chunk_size, max_workers)
+
+    def fetch_crypto_prices(self, coins=None, max_workers=None):
+        """
+        Fetch cryptocurrency prices from CoinGecko API (free, no key required).
+
+        Args:
+            coins (list): List of cryptocurrency IDs (default: the coins_file watchlist)
+            max_workers (int): Concurrency limit (default: self.max_workers)
+
+        Returns:
+            RecordBatch: CryptoRecord rows, or None if every request fails
+        """
+        return self.source('crypto').fetch(coins, max_workers)
+
+    def fetch_news(self, category="technology", country="us", incremental=True,
+                   page_size=10, max_pages=5):
+        """
+        Fetch latest news headlines from NewsAPI.org (requires NEWS_API_KEY).
+
+        Args:
+            category (str): News category (business, technology, science, etc.)
+            country (str): Country code (us, gb, ca, etc.)
+            incremental (bool): Only return new articles (pages back to the last one collected)
+            page_size (int): Articles per request
+            max_pages (int): Maximum number of pages per call (incremental mode)
+
+        Returns:
+            list: NewsRecord articles or None if request fails
+        """
+        return self.source('news').fetch_feed(category, country, incremental, page_size, max_pages)
+
+    def fetch_news_feeds(self, feeds, max_pages=1, max_workers=None):
+        """
+        Fetch many (category, country) news feeds concurrently within
+        the NewsAPI daily quota.
+
+        Args:
+            feeds (list): (category, country) tuples
+            max_pages (int): Maximum number of pages per feed
+            max_workers (int): Concurrency limit (default: self.max_workers)
+
+        Returns:
+            tuple: (articles, failures, skipped) - new articles, and lists
+                of (feed, reason) tuples for failed and skipped feeds
+        """
+        return self.source('news').fetch_feeds(feeds, max_pages, max_workers)
+
+    def run_weather_automation(self, cities=None, max_workers=None, batch=True):
+        """
+        Run weather data collection automation.
+        Cities are fetched concurrently and saved in one batch.
+
+        Args:
+            cities (list): List of cities to fetch weather for
+            max_workers (int): Concurrency limit (default: self.max_workers)
+            batch (bool): Fetch many cities per forecast request (default)
+                instead of one request per city
+        """
+        self.run_source('weather', cities=cities, max_workers=max_workers, batch=batch)
+
+    def run_crypto_automation(self):
+        """Run cryptocurrency price collection automation."""
+        self.run_source('crypto')
+
+    def run_news_automation(self, category="technology", feeds=None, max_workers=None):
+        """
+        Run news collection automation.
+
+        Args:
+            category (str): News category to fetch
+            feeds (list): (category, country) tuples to fetch concurrently
+                instead of a single category (see fetch_news_feeds)
+            max_workers (int): Concurrency limit for feeds (default: self.max_workers)
+        """
+        self.run_source('news', category=category, feeds=feeds, max_workers=max_workers)
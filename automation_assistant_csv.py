@@ -10,222 +10,169 @@ Author: Blessing Onyekanna
 Date: 2025
 """
 
-import requests
-import csv
-import json
-from datetime import datetime
-import time
+import argparse
+import atexit
 import os
+from functools import partial
 from dotenv import load_dotenv
+from assistant_base import AssistantBase
+from concurrency import RateLimiter
+from csv_rotation import COMPRESSIONS, ROTATE_PERIODS, RotatingCsvWriter
+from csv_writer import CsvWriter, CsvWriterPool
+from geocode_cache import GeocodeCache
+from http_client import HttpClient
+from json_stream import streaming_available
+from metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+from news_index import NewsIndex
+from records import as_rows
+from parquet_backend import ParquetStore, dataset_name
+from response_cache import ResponseCache
+from scheduler import add_daemon_arguments, run_daemon
+from sharding import SHARDS_FOLDER, merge_partitions, partition, run_shards, shard_folder
+from sqlite_store import DATASET_FOR_FILE, TimeSeriesStore
+from write_behind import WriteBehindQueue
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-class AutomationAssistant:
+class AutomationAssistant(AssistantBase):
     """
     Main class for automating data collection from various public APIs.
-    Supports weather data, cryptocurrency prices, and latest news.
+    Supports weather data, cryptocurrency prices, and latest news
+    (and any other source registered in sources.py).
     """
     
-    def __init__(self, data_folder="data"):
+    SINK = 'csv'
+    
+    def __init__(self, data_folder="data", max_workers=8, requests_per_second=5,
+                 weather_batch_size=100, http_client=None, cache_ttls=None,
+                 skip_unchanged=True, flush_rows=500, flush_interval=2.0, fsync='close',
+                 write_behind=True, write_queue_size=100, parquet=False,
+                 sqlite=False, news_daily_quota=100, news_quota_reserve=5,
+                 coins_file="coins.txt", stream_json=False, metrics=None, shards=1,
+                 rotate=None, rotate_mb=None, compress='gzip'):
         """
         Initialize the Automation Assistant.
         
         Args:
             data_folder (str): Folder name where CSV files will be saved
+            max_workers (int): Maximum number of concurrent API requests
+            requests_per_second (float): Rate limit per API host (a ceiling: hosts
+                that answer 429 are slowed down automatically)
+            weather_batch_size (int): Cities per Open-Meteo forecast request
+            http_client (HttpClient): Custom HTTP client/transport (default: pooled session)
+            cache_ttls (dict): Per-host {host: seconds} response cache TTLs
+            skip_unchanged (bool): Don't save data identical to the last save
+            flush_rows (int): Write buffered CSV rows once this many are waiting
+            flush_interval (float): Write buffered CSV rows at least this often (seconds)
+            fsync (str): When to fsync CSV files: 'never', 'flush' or 'close'
+            write_behind (bool): Save in a background thread instead of blocking fetches
+            write_queue_size (int): Pending saves allowed before fetchers have to wait
+            parquet (bool): Also keep a typed Parquet copy under data/parquet (needs pyarrow)
+            sqlite (bool): Also store records in an indexed SQLite database (data/timeseries.sqlite)
+            news_daily_quota (int): NewsAPI requests allowed per day (100 on the free plan)
+            news_quota_reserve (int): Requests a news fan-out leaves unused
+            coins_file (str): Watchlist of CoinGecko coin IDs (.txt or .json)
+            stream_json (bool): Parse large responses incrementally instead of
+                with response.json() (needs ijson; responses aren't cached)
+            metrics (Metrics): Metrics/tracing registry (default: disabled, no overhead)
+            shards (int): Split the weather and crypto runs across this many
+                processes (see sharding.py; default: 1, no sharding)
+            rotate (str): Write 'daily' or 'hourly' partitions, e.g.
+                data/crypto_prices/2026-10-16.csv, instead of one file per
+                dataset (see csv_rotation.py; default: None, one file)
+            rotate_mb (float): Also start a new partition file at this size
+            compress (str): Compress closed partitions with 'gzip' or 'zstd'
+                (needs zstandard), or None to keep them as plain CSV
         """
         self.data_folder = data_folder
+        self.max_workers = max_workers
+        # A custom http_client brings its own rate limiter
+        self.rate_limiter = getattr(http_client, 'rate_limiter', None) or RateLimiter(requests_per_second)
+        self.weather_batch_size = weather_batch_size
+        self.skip_unchanged = skip_unchanged
+        self.news_daily_quota = news_daily_quota
+        self.news_quota_reserve = news_quota_reserve
+        self.coins_file = coins_file
+        self.stream_json = stream_json and streaming_available()
+        self.metrics = metrics or NULL_METRICS
+        if stream_json and not self.stream_json:
+            print("⚠️  ijson is not installed, JSON streaming disabled (pip install ijson)")
+        self._sources = {}
+        self.shards = max(1, shards)
+        
+        # Settings every shard process is created with
+        self.shard_options = {
+            'max_workers': max_workers,
+            'requests_per_second': requests_per_second,
+            'weather_batch_size': weather_batch_size,
+            'cache_ttls': cache_ttls,
+            'skip_unchanged': skip_unchanged,
+            'flush_rows': flush_rows,
+            'flush_interval': flush_interval,
+            'fsync': fsync,
+            'parquet': parquet,
+            'sqlite': sqlite,
+            'coins_file': coins_file,
+            'stream_json': stream_json,
+        }
+        
         # Create data folder if it doesn't exist
         if not os.path.exists(data_folder):
             os.makedirs(data_folder)
             print(f"✓ Created '{data_folder}' folder for storing data")
-    
-    
-    def fetch_weather_data(self, city="London"):
-        """
-        Fetch current weather data from Open-Meteo API (free, no key required).
         
-        Args:
-            city (str): City name to get weather for
-            
-        Returns:
-            dict: Weather data or None if request fails
-        """
-        print(f"\n📡 Fetching weather data for {city}...")
+        # Keep CSV files open and buffer rows instead of reopening per save
+        writer_factory = CsvWriter
+        if rotate:
+            writer_factory = partial(RotatingCsvWriter, rotate=rotate, rotate_mb=rotate_mb,
+                                     compress=compress)
+        self.rotate = rotate
+        self.csv_writers = CsvWriterPool(
+            data_folder,
+            flush_rows=flush_rows,
+            flush_interval=flush_interval,
+            fsync=fsync,
+            writer_factory=writer_factory
+        )
         
-        # Using Open-Meteo free API (no key required for basic access)
-        url = f"https://api.open-meteo.com/v1/forecast"
+        # Optional columnar copy of every dataset for analytics
+        self.parquet_store = None
+        if parquet:
+            self.parquet_store = ParquetStore(os.path.join(data_folder, "parquet"))
         
-        # First, we need to geocode the city name
-        geocode_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1"
+        # Optional indexed, de-duplicated store for quick queries
+        self.sqlite_store = None
+        if sqlite:
+            self.sqlite_store = TimeSeriesStore(os.path.join(data_folder, "timeseries.sqlite"))
         
-        try:
-            # Get city coordinates
-            geo_response = requests.get(geocode_url, timeout=10)
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
-            
-            if not geo_data.get('results'):
-                print(f"❌ City '{city}' not found")
-                return None
-            
-            lat = geo_data['results'][0]['latitude']
-            lon = geo_data['results'][0]['longitude']
-            
-            # Get weather data
-            params = {
-                'latitude': lat,
-                'longitude': lon,
-                'current_weather': 'true',
-                'temperature_unit': 'celsius'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract and format the data
-            weather = data['current_weather']
-            result = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'city': city,
-                'temperature_celsius': weather['temperature'],
-                'windspeed_kmh': weather['windspeed'],
-                'weather_code': weather['weathercode'],
-                'latitude': lat,
-                'longitude': lon
-            }
-            
-            print(f"✓ Successfully fetched weather data for {city}")
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching weather data: {e}")
-            return None
-    
-    
-    def fetch_crypto_prices(self, coins=None):
-        """
-        Fetch cryptocurrency prices from CoinGecko API (free, no key required).
+        # City coordinates never change, so keep them on disk between runs
+        self.geocode_cache = GeocodeCache(os.path.join(data_folder, "geocode_cache.sqlite"))
         
-        Args:
-            coins (list): List of cryptocurrency IDs (default: bitcoin, ethereum, cardano)
-            
-        Returns:
-            list: List of crypto price data or None if request fails
-        """
-        if coins is None:
-            coins = ['bitcoin', 'ethereum', 'cardano']
+        # Articles already collected, so news runs only save new ones
+        self.news_index = NewsIndex(os.path.join(data_folder, "news_index.sqlite"))
         
-        print(f"\n📡 Fetching cryptocurrency prices for {', '.join(coins)}...")
+        # Cache API responses so unchanged payloads aren't downloaded again
+        self.response_cache = ResponseCache(os.path.join(data_folder, "http_cache.sqlite"), ttls=cache_ttls)
         
-        # CoinGecko free API endpoint
-        url = "https://api.coingecko.com/api/v3/simple/price"
+        # One pooled session (keep-alive + retries) shared by all fetchers
+        self.http = http_client or HttpClient(
+            pool_size=max_workers,
+            rate_limiter=self.rate_limiter,
+            cache=self.response_cache,
+            metrics=self.metrics
+        )
         
-        params = {
-            'ids': ','.join(coins),
-            'vs_currencies': 'usd',
-            'include_24hr_change': 'true',
-            'include_market_cap': 'true'
-        }
+        # Save in the background so a slow write never stalls the next fetch
+        self.write_queue = None
+        if write_behind:
+            self.write_queue = WriteBehindQueue(self.save_to_csv, maxsize=write_queue_size,
+                                                on_error=self._mark_failed)
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Format the data into a list of dictionaries
-            results = []
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            for coin_id, coin_data in data.items():
-                results.append({
-                    'timestamp': timestamp,
-                    'cryptocurrency': coin_id.title(),
-                    'price_usd': coin_data.get('usd', 0),
-                    'market_cap_usd': coin_data.get('usd_market_cap', 0),
-                    'change_24h_percent': coin_data.get('usd_24h_change', 0)
-                })
-            
-            print(f"✓ Successfully fetched prices for {len(results)} cryptocurrencies")
-            return results
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching crypto data: {e}")
-            return None
-    
-    
-    def fetch_news(self, category="technology", country="us"):
-        """
-        Fetch latest news headlines from NewsAPI.org.
-        Requires NEWS_API_KEY environment variable to be set.
-        
-        Get your free API key from https://newsapi.org/register
-        Then add it to your .env file: NEWS_API_KEY=your-key-here
-        
-        Args:
-            category (str): News category (business, technology, science, etc.)
-            country (str): Country code (us, gb, ca, etc.)
-            
-        Returns:
-            list: List of news articles or None if request fails
-        """
-        print(f"\n📡 Fetching latest {category} news from {country.upper()}...")
-        
-        # Get API key from environment variable
-        api_key = os.getenv('NEWS_API_KEY')
-        
-        if not api_key:
-            print("\n⚠️  NEWS_API_KEY not found!")
-            print("   To use the News API:")
-            print("   1. Get a free API key from https://newsapi.org/register")
-            print("   2. Create a .env file in your project folder")
-            print("   3. Add this line: NEWS_API_KEY=your-actual-key")
-            print("   4. Run the script again")
-            return None
-        
-        url = "https://newsapi.org/v2/top-headlines"
-        
-        params = {
-            'apiKey': api_key,
-            'category': category,
-            'country': country,
-            'pageSize': 10  # Get top 10 articles
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['status'] != 'ok':
-                print(f"❌ API returned error: {data.get('message', 'Unknown error')}")
-                print("   Check your API key is valid and not expired")
-                return None
-            
-            # Format the articles
-            results = []
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            for article in data['articles']:
-                results.append({
-                    'timestamp': timestamp,
-                    'title': article['title'],
-                    'source': article['source']['name'],
-                    'author': article.get('author', 'Unknown'),
-                    'published_at': article['publishedAt'],
-                    'url': article['url'],
-                    # NEW:
-                    'description': (article.get('description') or '')[:200]
-                })
-            
-            print(f"✓ Successfully fetched {len(results)} news articles")
-            return results
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching news data: {e}")
-            return None
+        # Make sure queued and buffered rows are written before the program exits
+        self._closed = False
+        atexit.register(self.close)
     
     
     def save_to_csv(self, data, filename):
@@ -233,99 +180,202 @@ class AutomationAssistant:
         Save data to a CSV file in the data folder.
         
         Args:
-            data (list or dict): Data to save (list of dicts or single dict)
+            data (list, record or RecordBatch): Data to save (records, dicts
+                or a single record/dict)
             filename (str): Name of the CSV file
         """
         if data is None:
             print("❌ No data to save")
             return
         
-        # Convert single dict to list for consistent processing
-        if isinstance(data, dict):
-            data = [data]
+        # Convert a single record to a list for consistent processing
+        data = as_rows(data)
         
         if not data:
             print("❌ Empty data list")
             return
         
-        filepath = os.path.join(self.data_folder, filename)
+        # Skip the write if the data hasn't changed since the last save
+        if self.skip_unchanged and self.response_cache.unchanged_since_last_save(filename, data):
+            print(f"ℹ️  Data unchanged since last save, skipping '{filename}'")
+            return
         
         try:
-            # Check if file exists to determine if we need to write headers
-            file_exists = os.path.exists(filepath)
-            
-            with open(filepath, 'a', newline='', encoding='utf-8') as csvfile:
-                # Get column names from the first data item
-                fieldnames = list(data[0].keys())
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                # Write header only if file is new
-                if not file_exists:
-                    writer.writeheader()
-                
-                # Write all data rows
-                writer.writerows(data)
-            
-            print(f"✓ Data saved to '{filepath}'")
-            print(f"  ({len(data)} record(s) added)")
+            with self.metrics.timer('save_seconds', target=filename):
+                # Rows are buffered and written by the file's persistent writer,
+                # which marks them saved once they are actually in the file
+                writer = self.csv_writers.get(filename)
+                writer.write_rows(data, partial(self._mark_saved, data, filename))
             
         except Exception as e:
+            self.metrics.inc('saves_total', target=filename, status='error')
+            self.metrics.event('save', target=filename, rows=len(data), status='error', error=str(e))
             print(f"❌ Error saving to CSV: {e}")
+            self._mark_failed(data, filename)
+            return
+        
+        # The rows belong to the CSV file now, whatever happens to the extra backends
+        self.metrics.inc('saves_total', target=filename, status='ok')
+        self.metrics.inc('saved_rows_total', len(data), target=filename)
+        self.metrics.event('save', target=filename, rows=len(data), status='ok')
+        
+        print(f"✓ Data saved to '{writer.path}'")
+        print(f"  ({len(data)} record(s) added)")
+        
+        if self.parquet_store is not None:
+            self._save_to_backend('Parquet', filename, data,
+                                  partial(self.parquet_store.write, dataset_name(filename)))
+        
+        if self.sqlite_store is not None and filename in DATASET_FOR_FILE:
+            self._save_to_backend('SQLite', filename, data,
+                                  partial(self.sqlite_store.upsert, DATASET_FOR_FILE[filename]))
+    
+    
+    def _save_to_backend(self, backend, filename, data, write):
+        """
+        Copy saved rows to an extra backend (Parquet or SQLite), reporting
+        its errors on their own.
+        
+        Args:
+            backend (str): Backend name for messages and metrics
+            filename (str): CSV file the rows were saved to
+            data (list or RecordBatch): The rows
+            write (callable): Called as write(data)
+        """
+        target = f"{backend.lower()}:{filename}"
+        try:
+            with self.metrics.timer('save_seconds', target=target):
+                write(data)
+        except Exception as e:
+            self.metrics.inc('saves_total', target=target, status='error')
+            self.metrics.event('save', target=target, rows=len(data), status='error', error=str(e))
+            print(f"❌ Error saving to {backend}: {e}")
+            return
+        self.metrics.inc('saves_total', target=target, status='ok')
     
     
-    def run_weather_automation(self, cities=None):
+    def save(self, data, target):
         """
-        Run weather data collection automation.
+        Save records to a CSV file (the sink used by run_source).
         
         Args:
-            cities (list): List of cities to fetch weather for
+            data (list, record or RecordBatch): Records to save
+            target (str): Name of the CSV file
         """
-        if cities is None:
-            cities = ["London", "New York", "Tokyo"]
-        
-        print("\n" + "="*60)
-        print("🌤️  WEATHER DATA AUTOMATION")
-        print("="*60)
-        
-        for city in cities:
-            weather_data = self.fetch_weather_data(city)
-            if weather_data:
-                self.save_to_csv(weather_data, "weather_data.csv")
-            time.sleep(1)  # Be nice to the API
+        self.save_to_csv(data, target)
     
     
-    def run_crypto_automation(self):
-        """Run cryptocurrency price collection automation."""
-        print("\n" + "="*60)
-        print("₿  CRYPTOCURRENCY AUTOMATION")
-        print("="*60)
-        
-        crypto_data = self.fetch_crypto_prices()
-        if crypto_data:
-            self.save_to_csv(crypto_data, "crypto_prices.csv")
+    def flush(self):
+        """Write all buffered CSV rows to disk now."""
+        self.csv_writers.flush()
     
     
-    def run_news_automation(self, category="technology"):
+    def _run_sharded(self, source, target, options):
         """
-        Run news collection automation.
+        Split a source's items into shards, collect each shard in its own
+        process, then merge the shards' new rows into the main CSV file.
         
         Args:
-            category (str): News category to fetch
+            source (Source): Source with a shard_option (e.g. 'cities')
+            target (str): Name of the CSV file
+            options (dict): fetch() options
         """
-        print("\n" + "="*60)
-        print("📰 NEWS AUTOMATION")
-        print("="*60)
+        options = dict(options)
+        items = options.pop(source.shard_option, None) or source.default_items()
         
-        news_data = self.fetch_news(category=category)
-        if news_data:
-            self.save_to_csv(news_data, "latest_news.csv")
+        tasks = [
+            {
+                'source': source.name,
+                'option': source.shard_option,
+                'items': items_of_shard,
+                'target': target,
+                'shard': shard,
+                'shards': self.shards,
+                'folder': shard_folder(self.data_folder, source.name, shard, self.shards),
+                'assistant_options': self.shard_options,
+                'fetch_options': options,
+            }
+            for shard, items_of_shard in enumerate(partition(items, self.shards))
+            if items_of_shard
+        ]
+        
+        print(f"\n🧩 Collecting {len(items)} {source.shard_option} in {len(tasks)} shard(s)...")
+        results, failures = run_shards(tasks, self.shards)
+        
+        for result in sorted(results, key=lambda result: result['shard']):
+            print(f"   Shard {result['shard'] + 1}/{self.shards}: {result['rows']} row(s) "
+                  f"from {result['items']} {source.shard_option}")
+        for task, reason in failures:
+            print(f"❌ Shard {task['shard'] + 1}/{self.shards} failed: {reason}")
+        
+        # Rows saved earlier in this process must come before the shards' rows
+        if self.write_queue is not None:
+            self.write_queue.join()
+        self.flush()
+        
+        # Rotated output goes through the dataset's writer (shards write single files)
+        writer = self.csv_writers.get(target) if self.rotate else None
+        try:
+            rows = merge_partitions(self.data_folder, source.name, target, self.shards, writer)
+            self.flush()
+        except Exception as e:
+            print(f"❌ Error merging shards into '{target}': {e}")
+            return
+        
+        self.metrics.inc('saved_rows_total', rows, target=target)
+        merged_path = writer.path if writer is not None else os.path.join(self.data_folder, target)
+        print(f"✓ Merged {rows} new record(s) into '{merged_path}'")
+        print(f"  (shard logs: {os.path.join(self.data_folder, SHARDS_FOLDER, source.name)})")
+    
+    
+    def close(self):
+        """
+        Flush pending writes and release network connections and local caches.
+        Call this once the assistant is no longer needed (safe to call twice).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self.write_queue is not None:
+            self.write_queue.close()
+            stats = self.write_queue.stats()
+            if stats['enqueued']:
+                print(f"📬 Background writes: {stats['written']} saved, {stats['failed']} failed, "
+                      f"max lag {stats['max_lag']:.2f}s, max queue depth {stats['max_depth']}")
+        
+        self.csv_writers.close()
+        if self.parquet_store is not None:
+            self.parquet_store.close()
+        if self.sqlite_store is not None:
+            self.sqlite_store.close()
+        self.http.close()
+        self.response_cache.close()
+        self.geocode_cache.close()
+        self.news_index.close()
+        self.metrics.close()
 
 
 def main():
     """
     Main function to run the automation assistant.
     Demonstrates all three API options.
+    
+    Run with --daemon to keep collecting data on a schedule instead.
     """
+    parser = argparse.ArgumentParser(description="Automation Assistant - CSV Version")
+    add_daemon_arguments(parser)
+    add_metrics_arguments(parser)
+    parser.add_argument('--shards', type=int, default=1,
+                        help="Collect weather and crypto data in this many processes (default: 1)")
+    parser.add_argument('--rotate', choices=tuple(ROTATE_PERIODS), default=None,
+                        help="Write daily or hourly CSV partitions instead of one file per dataset")
+    parser.add_argument('--rotate-mb', type=float, default=None,
+                        help="Also start a new partition once a file reaches this size")
+    parser.add_argument('--compress', choices=tuple(COMPRESSIONS) + ('none',), default='gzip',
+                        help="Compression of closed partitions (default: gzip)")
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("🤖 AUTOMATION ASSISTANT - CSV VERSION")
     print("="*60)
@@ -333,7 +383,17 @@ def main():
     print("and saves the results to organized CSV files.\n")
     
     # Initialize the assistant
-    assistant = AutomationAssistant()
+    assistant = AutomationAssistant(
+        metrics=metrics_from_args(args),
+        shards=args.shards,
+        rotate=args.rotate,
+        rotate_mb=args.rotate_mb,
+        compress=None if args.compress == 'none' else args.compress
+    )
+    
+    if args.daemon:
+        run_daemon(assistant, args)
+        return
     
     # Display menu
     print("\nChoose which automation to run:")
@@ -362,6 +422,9 @@ def main():
         print("\n❌ Invalid choice. Please run the script again.")
         return
     
+    # Write any buffered rows before reporting success
+    assistant.close()
+    
     print("\n" + "="*60)
     print("✅ AUTOMATION COMPLETED!")
     print("="*60)
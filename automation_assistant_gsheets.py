@@ -8,38 +8,218 @@ Author: Your Name
 Date: 2025
 """
 
-import requests
-import json
-from datetime import datetime
+import argparse
 import time
+import atexit
 import os
+import threading
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+from assistant_base import AssistantBase
+from concurrency import RateLimiter
+from csv_writer import SchemaMismatchError
+from geocode_cache import GeocodeCache
+from http_client import RETRY_STATUSES, HttpClient, parse_retry_after
+from json_stream import streaming_available
+from metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+from news_index import NewsIndex
+from records import as_rows, fields_of, iter_values
+from response_cache import ResponseCache
+from scheduler import add_daemon_arguments, run_daemon
+from sheets_spool import SheetsSpool, SpoolReplayer, new_row_ids
+from write_behind import WriteBehindQueue
 
+# Host label used for the Sheets API calls in metrics
+SHEETS_API_HOST = 'sheets.googleapis.com'
 
-class AutomationAssistantGSheets:
+# Last column of every tab: the row's ID, so a retried write can tell
+# which rows are already in the sheet (see sheets_spool.py)
+ROW_ID_COLUMN = 'row_id'
+
+
+def _a1_sheet(title):
+    """Quote a sheet name for an A1 range ('' escapes a quote)."""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def _column_letter(index):
+    """Get the A1 letter(s) of a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def _http_error():
+    """
+    Get googleapiclient's HttpError class.
+    
+    The Google client libraries take a noticeable part of a second to
+    import, so they are only loaded once Sheets is actually used. An
+    except clause is evaluated only when an exception is raised, so
+    `except _http_error()` costs nothing on the happy path.
+    """
+    from googleapiclient.errors import HttpError
+    return HttpError
+
+
+def _write_errors():
+    """
+    Get the exception classes of a failed Sheets write: API errors and
+    network errors (imported lazily, like _http_error).
+    """
+    from google.auth.exceptions import TransportError
+    from googleapiclient.errors import HttpError
+    from httplib2 import HttpLib2Error
+    return (HttpError, HttpLib2Error, TransportError, OSError)
+
+
+def _is_permanent(error):
+    """
+    Check whether a failed Sheets write would fail again however often it
+    is retried: an API error other than 429 (rate limited) and 5xx
+    (server trouble), e.g. 400 bad request or 403 no permission.
+    Network errors are temporary.
+    """
+    if not isinstance(error, _http_error()):
+        return False
+    status = int(error.resp.status)
+    return status != 429 and status < 500
+
+
+class AutomationAssistantGSheets(AssistantBase):
     """
     Main class for automating data collection from various public APIs
     and saving to Google Sheets.
     """
     
-    def __init__(self, credentials_file, spreadsheet_id):
+    SINK = 'sheets'
+    
+    def __init__(self, credentials_file, spreadsheet_id, max_workers=8, requests_per_second=5,
+                 weather_batch_size=100, data_folder="data", http_client=None,
+                 cache_ttls=None, skip_unchanged=True,
+                 write_behind=True, write_queue_size=100, news_daily_quota=100,
+                 news_quota_reserve=5, coins_file="coins.txt", stream_json=False,
+                 service=None, metrics=None, spool=True, spool_max_mb=100, replay_interval=30):
         """
         Initialize the Automation Assistant with Google Sheets integration.
         
         Args:
             credentials_file (str): Path to Google service account JSON file
             spreadsheet_id (str): Google Sheets spreadsheet ID
+            max_workers (int): Maximum number of concurrent API requests
+            requests_per_second (float): Rate limit per API host (a ceiling: hosts
+                that answer 429 are slowed down automatically)
+            weather_batch_size (int): Cities per Open-Meteo forecast request
+            data_folder (str): Folder for local caches (shared with the CSV version)
+            http_client (HttpClient): Custom HTTP client/transport (default: pooled session)
+            cache_ttls (dict): Per-host {host: seconds} response cache TTLs
+            skip_unchanged (bool): Don't save data identical to the last save
+            write_behind (bool): Save in a background thread instead of blocking fetches
+            write_queue_size (int): Pending saves allowed before fetchers have to wait
+            news_daily_quota (int): NewsAPI requests allowed per day (100 on the free plan)
+            news_quota_reserve (int): Requests a news fan-out leaves unused
+            coins_file (str): Watchlist of CoinGecko coin IDs (.txt or .json)
+            stream_json (bool): Parse large responses incrementally instead of
+                with response.json() (needs ijson; responses aren't cached)
+            service (Resource): Ready-made Sheets API client (skips authentication,
+                e.g. to use a custom transport). Otherwise the client is
+                created and authenticated on the first write
+            metrics (Metrics): Metrics/tracing registry (default: disabled, no overhead)
+            spool (bool): Keep rows that could not be written on disk
+                (data/sheets_spool) and write them once Sheets is reachable again
+            spool_max_mb (float): Disk space limit of the spool
+            replay_interval (float): Seconds between background attempts to
+                write spooled rows
         """
         # Load environment variables
         load_dotenv()  # ← ADD THIS LINE
         
+        # Checked before any thread is started or cleanup is registered.
+        # Connecting to Google is deferred until the first write, so the
+        # menu (and runs that never reach Sheets) start without that delay
+        if service is None and not os.path.exists(credentials_file):
+            raise FileNotFoundError(f"Credentials file not found: {credentials_file}")
+        self.credentials_file = credentials_file
+        self._service = service
+        self._service_lock = threading.Lock()
+        
         self.spreadsheet_id = spreadsheet_id
-        self.service = self._authenticate_google_sheets(credentials_file)
-        print("✓ Connected to Google Sheets successfully")
+        # The Sheets client is not thread-safe, so scheduled jobs take turns writing
+        self._sheets_lock = threading.Lock()
+        # Rows waiting for flush(), and cached tab ids/headers (loaded on first flush)
+        self._pending = []
+        self._sheet_ids = None
+        self._sheet_headers = {}
+        self.max_workers = max_workers
+        self.news_daily_quota = news_daily_quota
+        self.news_quota_reserve = news_quota_reserve
+        self.coins_file = coins_file
+        self.stream_json = stream_json and streaming_available()
+        self.metrics = metrics or NULL_METRICS
+        if stream_json and not self.stream_json:
+            print("⚠️  ijson is not installed, JSON streaming disabled (pip install ijson)")
+        self._sources = {}
+        # Shared by the API fetches and the Sheets writes (a custom
+        # http_client brings its own)
+        self.rate_limiter = getattr(http_client, 'rate_limiter', None) or RateLimiter(requests_per_second)
+        self.weather_batch_size = weather_batch_size
+        self.skip_unchanged = skip_unchanged
+        
+        self.data_folder = data_folder
+        if not os.path.exists(data_folder):
+            os.makedirs(data_folder)
+        self.geocode_cache = GeocodeCache(os.path.join(data_folder, "geocode_cache.sqlite"))
+        
+        # Articles already collected, so news runs only save new ones
+        self.news_index = NewsIndex(os.path.join(data_folder, "news_index.sqlite"))
+        self.response_cache = ResponseCache(os.path.join(data_folder, "http_cache.sqlite"), ttls=cache_ttls)
+        
+        # One pooled session (keep-alive + retries) shared by all fetchers
+        self.http = http_client or HttpClient(
+            pool_size=max_workers,
+            rate_limiter=self.rate_limiter,
+            cache=self.response_cache,
+            metrics=self.metrics
+        )
+        
+        # Failed writes are spooled to disk and replayed in the background
+        self.spool = None
+        self._replayer = None
+        if spool:
+            self.spool = SheetsSpool(os.path.join(data_folder, "sheets_spool"),
+                                     max_bytes=int(spool_max_mb * 1024 * 1024),
+                                     metrics=self.metrics)
+            if self.spool.rows:
+                print(f"📥 {self.spool.rows} row(s) from earlier runs are waiting in the Sheets spool")
+            self._replayer = SpoolReplayer(self.spool, self.replay_spool, interval=replay_interval)
+        
+        # Save in the background so a slow write never stalls the next fetch
+        self.write_queue = None
+        if write_behind:
+            self.write_queue = WriteBehindQueue(self.save_to_sheet, maxsize=write_queue_size,
+                                                on_error=self._mark_failed)
         
+        # Make sure queued and buffered rows are written before the program exits
+        self._closed = False
+        atexit.register(self.close)
+    
+    
+    @property
+    def service(self):
+        """
+        Google Sheets API client, created on first use and then reused
+        for every write (including all runs in daemon mode).
+        """
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    self._service = self._authenticate_google_sheets(self.credentials_file)
+                    print("✓ Connected to Google Sheets successfully")
+        return self._service
+    
+    
     def _authenticate_google_sheets(self, credentials_file):
         """
         Authenticate with Google Sheets API using service account.
@@ -51,17 +231,24 @@ class AutomationAssistantGSheets:
             Resource: Google Sheets API service object
         """
         try:
+            # Imported here: only needed once something is written to Sheets
+            from google.oauth2.service_account import Credentials
+            from googleapiclient.discovery import build
+            
             # Define the scopes
             SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
             
-            # Load credentials from the service account file
+            # Load credentials from the service account file (the access
+            # token itself is fetched and refreshed on the first request)
             creds = Credentials.from_service_account_file(
                 credentials_file, 
                 scopes=SCOPES
             )
             
-            # Build the service
-            service = build('sheets', 'v4', credentials=creds)
+            # Build the service from the discovery document bundled with the
+            # library instead of downloading it
+            service = build('sheets', 'v4', credentials=creds,
+                            static_discovery=True, cache_discovery=False)
             
             return service
             
@@ -70,333 +257,639 @@ class AutomationAssistantGSheets:
             raise
     
     
-    def fetch_weather_data(self, city="London"):
+    def save_to_sheet(self, data, sheet_name, flush=True):
         """
-        Fetch current weather data from Open-Meteo API (free, no key required).
+        Save data to a Google Sheet.
+        Creates a new sheet if it doesn't exist, appends if it does.
+        
+        Rows are queued and sent together by flush(), so saving to several
+        tabs costs a single API call.
         
         Args:
-            city (str): City name to get weather for
-            
-        Returns:
-            dict: Weather data or None if request fails
+            data (list or dict): Data to save
+            sheet_name (str): Name of the sheet tab
+            flush (bool): Send queued rows right away (False keeps them
+                queued until the next flush)
         """
-        print(f"\n📡 Fetching weather data for {city}...")
+        if data is None:
+            print("❌ No data to save")
+            return
         
-        url = f"https://api.open-meteo.com/v1/forecast"
-        geocode_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1"
+        # Convert a single record to a list
+        data = as_rows(data)
         
-        try:
-            # Get city coordinates
-            geo_response = requests.get(geocode_url, timeout=10)
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
-            
-            if not geo_data.get('results'):
-                print(f"❌ City '{city}' not found")
-                return None
-            
-            lat = geo_data['results'][0]['latitude']
-            lon = geo_data['results'][0]['longitude']
-            
-            # Get weather data
-            params = {
-                'latitude': lat,
-                'longitude': lon,
-                'current_weather': 'true',
-                'temperature_unit': 'celsius'
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            weather = data['current_weather']
-            result = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'city': city,
-                'temperature_celsius': weather['temperature'],
-                'windspeed_kmh': weather['windspeed'],
-                'weather_code': weather['weathercode'],
-                'latitude': lat,
-                'longitude': lon
-            }
-            
-            print(f"✓ Successfully fetched weather data for {city}")
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching weather data: {e}")
-            return None
+        if not data:
+            print("❌ Empty data list")
+            return
+        
+        # Skip the write if the data hasn't changed since the last save
+        if self.skip_unchanged and self.response_cache.unchanged_since_last_save(sheet_name, data):
+            print(f"ℹ️  Data unchanged since last save, skipping '{sheet_name}'")
+            return
+        
+        with self._sheets_lock:
+            # Row IDs are given once, so retries and replays can recognize the rows
+            self._pending.append((sheet_name, data, new_row_ids(len(data))))
+        
+        if flush:
+            self.flush()
     
     
-    def fetch_crypto_prices(self, coins=None):
+    def save(self, data, target):
         """
-        Fetch cryptocurrency prices from CoinGecko API (free, no key required).
+        Save records to a Sheets tab (the sink used by run_source).
         
         Args:
-            coins (list): List of cryptocurrency IDs
-            
-        Returns:
-            list: List of crypto price data or None if request fails
+            data (list, record or RecordBatch): Records to save
+            target (str): Name of the sheet tab
         """
-        if coins is None:
-            coins = ['bitcoin', 'ethereum', 'cardano']
+        self.save_to_sheet(data, target)
+    
+    
+    def flush(self):
+        """
+        Send all queued rows to Google Sheets in one batchUpdate call.
+        Missing tabs are created (with their header row) in the same call.
         
-        print(f"\n📡 Fetching cryptocurrency prices for {', '.join(coins)}...")
+        If the write fails, the rows are spooled to disk and written later
+        (see sheets_spool.py) instead of being lost.
+        """
+        # The Sheets client is shared with other scheduled jobs
+        with self._sheets_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            
+            start = time.perf_counter()
+            try:
+                # Spooled rows go first so every tab stays in order; while they
+                # can't be written, new rows join them without another API call
+                if self.spool is not None and self.spool.rows and not self._replay_spool():
+                    rows_by_sheet = None
+                else:
+                    rows_by_sheet, rejected = self._send_with_retries(pending)
+                
+            except Exception as e:
+                # Not only API and network errors: expired credentials or a
+                # failed service build must not lose the batch either
+                for sheet_name in dict.fromkeys(sheet_name for sheet_name, _, _ in pending):
+                    self.metrics.inc('saves_total', target=sheet_name, status='error')
+                self.metrics.event('save', targets=len(pending), status='error', error=str(e))
+                print(f"❌ Error saving to Google Sheets: {e}")
+                if self.spool is not None:
+                    self._spool_rows(pending)
+                else:
+                    for sheet_name, data, _ in pending:
+                        self._mark_failed(data, sheet_name)
+                return
+            finally:
+                self.metrics.observe('save_seconds', time.perf_counter() - start, target='spreadsheet')
+            
+            if rows_by_sheet is None:
+                self._spool_rows(pending)
+                return
         
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': ','.join(coins),
-            'vs_currencies': 'usd',
-            'include_24hr_change': 'true',
-            'include_market_cap': 'true'
-        }
+        for index, (sheet_name, data, _) in enumerate(pending):
+            if index in rejected:
+                self.metrics.inc('saves_total', target=sheet_name, status='error')
+                self.metrics.event('save', target=sheet_name, rows=len(data), status='error',
+                                   error=str(rejected[index]))
+                print(f"❌ Error saving to Google Sheets: {rejected[index]}")
+                self._mark_failed(data, sheet_name)
+            else:
+                self._mark_saved(data, sheet_name)
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            results = []
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for sheet_name, saves in rows_by_sheet.items():
+            count = sum(len(data) for data in saves)
+            self.metrics.inc('saves_total', target=sheet_name, status='ok')
+            self.metrics.inc('saved_rows_total', count, target=sheet_name)
+            self.metrics.event('save', target=sheet_name, rows=count, status='ok')
+            print(f"✓ Added {count} row(s) to '{sheet_name}' in Google Sheets")
+    
+    
+    def _send_rows(self, pending):
+        """
+        Write (sheet name, data, row IDs) saves in one batchUpdate call
+        (lock must be held).
+        
+        Every row is written with its ID in the tab's row_id column. Saves
+        whose columns don't match their tab's header row are left out (and
+        returned as rejected) instead of being written misaligned.
+        
+        Args:
+            pending (list): (sheet name, records, row IDs) tuples, in save order
             
-            for coin_id, coin_data in data.items():
-                results.append({
-                    'timestamp': timestamp,
-                    'cryptocurrency': coin_id.title(),
-                    'price_usd': coin_data.get('usd', 0),
-                    'market_cap_usd': coin_data.get('usd_market_cap', 0),
-                    'change_24h_percent': coin_data.get('usd_24h_change', 0)
-                })
+        Returns:
+            tuple: (rows_by_sheet, rejected) - {sheet name: [records, ...]}
+                of the rows written, and {index in pending: SchemaMismatchError}
+        """
+        rejected = {}
+        try:
+            if self._sheet_ids is None:
+                self._load_sheet_metadata()
+            
+            # Group saves per tab, keeping the order they were saved in
+            # (saves emptied by _drop_written have nothing left to write)
+            saves_by_sheet = {}
+            for index, (sheet_name, data, ids) in enumerate(pending):
+                if len(data):
+                    saves_by_sheet.setdefault(sheet_name, []).append((index, data, ids))
+            
+            requests_body = []
+            new_sheets = {}
+            new_headers = {}
+            rows_by_sheet = {}
+            # IDs for new tabs: past every existing tab and every tab added in this batch
+            next_sheet_id = max(self._sheet_ids.values(), default=0) + 1
+            
+            for sheet_name, saves in saves_by_sheet.items():
+                sheet_id = self._sheet_ids.get(sheet_name)
+                headers = self._sheet_headers.get(sheet_name) if sheet_id is not None else None
+                rows = []
+                header_request = None
+                
+                if not headers:
+                    # New (or empty) tab: the first save's columns become the header row
+                    headers = list(fields_of(saves[0][1])) + [ROW_ID_COLUMN]
+                    new_headers[sheet_name] = headers
+                    rows.append(headers)
+                elif ROW_ID_COLUMN not in headers:
+                    # Tab written by an older version: add the ID column to its header
+                    header_request = self._header_cell_request(sheet_id, len(headers), ROW_ID_COLUMN)
+                    headers = headers + [ROW_ID_COLUMN]
+                    new_headers[sheet_name] = headers
+                
+                for index, data, ids in saves:
+                    try:
+                        rows.extend(self._row_values(data, ids, headers, sheet_name))
+                    except SchemaMismatchError as e:
+                        rejected[index] = e
+                        continue
+                    rows_by_sheet.setdefault(sheet_name, []).append(data)
+                
+                if sheet_name not in rows_by_sheet:
+                    continue
+                
+                # Create sheet if it doesn't exist, with headers as the first row
+                if sheet_id is None:
+                    sheet_id = next_sheet_id
+                    next_sheet_id += 1
+                    new_sheets[sheet_name] = sheet_id
+                    requests_body.append({
+                        'addSheet': {
+                            'properties': {
+                                'sheetId': sheet_id,
+                                'title': sheet_name
+                            }
+                        }
+                    })
+                if header_request is not None:
+                    requests_body.append(header_request)
+                requests_body.append(self._append_cells_request(sheet_id, rows))
             
-            print(f"✓ Successfully fetched prices for {len(results)} cryptocurrencies")
-            return results
+            if requests_body:
+                self._batch_update(requests_body)
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching crypto data: {e}")
-            return None
+        except _write_errors():
+            # Tabs may have been changed by hand; reload them next time
+            self._sheet_ids = None
+            raise
+        
+        for sheet_name, sheet_id in new_sheets.items():
+            self._sheet_ids[sheet_name] = sheet_id
+            print(f"✓ Created new sheet: '{sheet_name}'")
+        for sheet_name, headers in new_headers.items():
+            if sheet_name in rows_by_sheet:
+                self._sheet_headers[sheet_name] = headers
+        
+        return rows_by_sheet, rejected
     
     
-    def fetch_news(self, category="technology", country="us"):
+    def _send_with_retries(self, pending):
         """
-        Fetch latest news headlines from NewsAPI.org (requires free API key).
+        Write saves with _send_rows, retrying temporary errors (lock must
+        be held). The write may have been applied even though it failed
+        (e.g. a lost response), so before every retry the rows already in
+        the sheet are left out.
+        
+        Returns:
+            tuple: Same as _send_rows
+        """
+        attempt = 0
+        written = None
+        while True:
+            try:
+                saves = pending if written is None else self._drop_written(pending, written)
+                return self._send_rows(saves)
+            except _write_errors() as e:
+                if _is_permanent(e) or attempt >= self.http.max_retries:
+                    raise
+                written = {}
+                self.metrics.inc('http_retries_total', host=SHEETS_API_HOST, reason=type(e).__name__)
+                time.sleep(self.http.backoff(attempt))
+                attempt += 1
+    
+    
+    def _drop_written(self, pending, written):
+        """
+        Leave out the rows whose IDs are already in their tab (lock must be held).
         
         Args:
-            category (str): News category
-            country (str): Country code
+            pending (list): (sheet name, records, row IDs) tuples
+            written (dict): {sheet name: set of row IDs} already read; tabs
+                missing from it are read now and added
             
         Returns:
-            list: List of news articles or None if request fails
+            list: The saves without those rows, in the same order (a save
+                may end up empty)
         """
-        print(f"\n📡 Fetching latest {category} news from {country.upper()}...")
+        missing = [name for name in dict.fromkeys(name for name, _, _ in pending) if name not in written]
+        if missing:
+            written.update(self._written_row_ids(missing))
         
-        # Get API key from environment variable
-        api_key = os.getenv('NEWS_API_KEY')
-
-        if not api_key:
-            print("⚠️  NEWS_API_KEY not found!")
-            print("   To use the News API:")
-            print("   1. Get a free API key from https://newsapi.org/register")
-            print("   2. Create a .env file in your project folder")
-            print("   3. Add this line: NEWS_API_KEY=your-actual-key")
-            print("   4. Run the script again")
-            return None
-        
-        url = "https://newsapi.org/v2/top-headlines"
-        params = {
-            'apiKey': api_key,
-            'category': category,
-            'country': country,
-            'pageSize': 10
-        }
+        result = []
+        for sheet_name, data, ids in pending:
+            present = written[sheet_name]
+            if present and any(id_ in present for id_ in ids):
+                kept = [(row, id_) for row, id_ in zip(data, ids) if id_ not in present]
+                skipped = len(ids) - len(kept)
+                self.metrics.inc('duplicate_rows_skipped_total', skipped, target=sheet_name)
+                print(f"ℹ️  {skipped} row(s) are already in '{sheet_name}', not writing them again")
+                data = [row for row, _ in kept]
+                ids = [id_ for _, id_ in kept]
+            result.append((sheet_name, data, ids))
+        return result
+    
+    
+    def _written_row_ids(self, sheet_names):
+        """
+        Read the row IDs already in some tabs (lock must be held).
         
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data['status'] != 'ok':
-                print(f"❌ API returned error: {data.get('message', 'Unknown error')}")
-                return None
-            
-            results = []
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            for article in data['articles']:
-                results.append({
-                    'timestamp': timestamp,
-                    'title': article['title'],
-                    'source': article['source']['name'],
-                    'author': article.get('author', 'Unknown'),
-                    'published_at': article['publishedAt'],
-                    'url': article['url'],
-                    'description': article.get('description', '')[:200]
-                })
-            
-            print(f"✓ Successfully fetched {len(results)} news articles")
-            return results
+        Args:
+            sheet_names (list): Tab names
             
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching news data: {e}")
-            return None
+        Returns:
+            dict: {sheet name: set of row IDs} (empty for missing tabs)
+        """
+        if self._sheet_ids is None:
+            self._load_sheet_metadata()
+        
+        written = {sheet_name: set() for sheet_name in sheet_names}
+        ranges, titles = [], []
+        for sheet_name in sheet_names:
+            headers = self._sheet_headers.get(sheet_name) or []
+            if sheet_name in self._sheet_ids and ROW_ID_COLUMN in headers:
+                column = _column_letter(headers.index(ROW_ID_COLUMN))
+                ranges.append(f"{_a1_sheet(sheet_name)}!{column}2:{column}")
+                titles.append(sheet_name)
+        
+        if ranges:
+            result = self._execute('batchGet', self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=ranges,
+                majorDimension='COLUMNS'
+            ))
+            for sheet_name, value_range in zip(titles, result.get('valueRanges', [])):
+                for column in value_range.get('values', []):
+                    written[sheet_name].update(column)
+        return written
+    
     
+    def _spool_rows(self, pending):
+        """Keep saves that could not be written in the spool (lock must be held)."""
+        count = 0
+        for sheet_name, data, ids in pending:
+            count += self.spool.append(sheet_name, data, ids)
+            # They will be written, so identical data isn't spooled again
+            self._mark_saved(data, sheet_name)
+        print(f"📥 Spooled {count} row(s) to '{self.spool.folder}'; "
+              f"they'll be written once Google Sheets is reachable again")
     
-    def save_to_sheet(self, data, sheet_name):
+    
+    def replay_spool(self):
         """
-        Save data to a Google Sheet.
-        Creates a new sheet if it doesn't exist, appends if it does.
+        Write spooled rows to Google Sheets now (the background replayer
+        calls this periodically).
+        
+        Returns:
+            bool: True if the spool is empty afterwards
+        """
+        if self.spool is None:
+            return True
+        with self._sheets_lock:
+            return self._replay_spool()
+    
+    
+    def _replay_spool(self, batch_rows=5000):
+        """
+        Write spooled rows in large batches until the spool is empty or
+        Sheets is unavailable (lock must be held). Rows already in the
+        sheet are skipped, and rows Sheets rejects for good are moved to
+        the spool's dead-letter file.
         
         Args:
-            data (list or dict): Data to save
-            sheet_name (str): Name of the sheet tab
+            batch_rows (int): Rows per batchUpdate call
+            
+        Returns:
+            bool: True if the spool is empty afterwards
         """
-        if data is None:
-            print("❌ No data to save")
-            return
+        # Row IDs in each tab, read once per replay and kept up to date
+        written = {}
+        while True:
+            entries = self.spool.pending(batch_rows)
+            if not entries:
+                return True
+            
+            try:
+                saves = self._drop_written(self._spooled_saves(entries), written)
+                rows_by_sheet, rejected = self._send_rows(saves)
+            except _write_errors() as e:
+                written.clear()
+                if not _is_permanent(e):
+                    self._report_unavailable(e)
+                    return False
+                # Some save in the batch was rejected: send them one at a
+                # time so only the rejected ones are set aside
+                if not self._replay_entries(entries, written):
+                    return False
+                continue
+            
+            # Recorded right away, so a later replay skips these rows
+            self._ack_replayed(entries, rejected, saves, written)
+            self._count_replayed(rows_by_sheet)
+    
+    
+    def _replay_entries(self, entries, written):
+        """
+        Write spooled entries one at a time, dead-lettering those that fail
+        with a permanent error (lock must be held).
+        
+        Returns:
+            bool: False if Sheets became unavailable
+        """
+        for entry in entries:
+            try:
+                saves = self._drop_written(self._spooled_saves([entry]), written)
+                rows_by_sheet, rejected = self._send_rows(saves)
+            except _write_errors() as e:
+                written.clear()
+                if not _is_permanent(e):
+                    self._report_unavailable(e)
+                    return False
+                self.spool.dead_letter([entry], e)
+                continue
+            self._ack_replayed([entry], rejected, saves, written)
+            self._count_replayed(rows_by_sheet)
+        return True
+    
+    
+    def _ack_replayed(self, entries, rejected, saves, written):
+        """
+        Remove replayed entries from the spool: written ones are acknowledged,
+        ones whose columns don't match their tab are dead-lettered.
         
-        # Convert single dict to list
-        if isinstance(data, dict):
-            data = [data]
+        Args:
+            entries (list): Spool entries
+            rejected (dict): {index in entries: SchemaMismatchError}
+            saves (list): The (sheet name, records, row IDs) saves sent
+            written (dict): Row IDs known to be in each tab, updated here
+        """
+        for index, error in rejected.items():
+            self.spool.dead_letter([entries[index]], error)
+        self.spool.ack([entry for index, entry in enumerate(entries) if index not in rejected])
+        for index, (sheet_name, _, ids) in enumerate(saves):
+            if index not in rejected:
+                written.setdefault(sheet_name, set()).update(ids)
+    
+    
+    @staticmethod
+    def _spooled_saves(entries):
+        """Turn spool entries back into (sheet name, records, row IDs) saves."""
+        return [
+            (entry['sheet'],
+             [dict(zip(entry['fields'], values)) for _, values in entry['rows']],
+             [id_ for id_, _ in entry['rows']])
+            for entry in entries
+        ]
+    
+    
+    def _report_unavailable(self, error):
+        """Log a replay that failed because Sheets can't be reached right now."""
+        print(f"⚠️  Google Sheets is still unavailable "
+              f"({self.spool.rows} spooled row(s) waiting): {error}")
+    
+    
+    def _count_replayed(self, rows_by_sheet):
+        """Record the metrics and log lines of replayed rows."""
+        for sheet_name, saves in rows_by_sheet.items():
+            count = sum(len(data) for data in saves)
+            self.metrics.inc('replayed_rows_total', count, target=sheet_name)
+            self.metrics.inc('saved_rows_total', count, target=sheet_name)
+            print(f"✓ Replayed {count} spooled row(s) to '{sheet_name}' in Google Sheets")
+    
+    
+    def _load_sheet_metadata(self):
+        """
+        Load the tab ids and header rows of the spreadsheet (lock must be held).
+        This costs two API calls and is cached until a write fails.
+        """
+        spreadsheet = self._execute('get', self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id,
+            fields='sheets.properties(sheetId,title)'
+        ))
         
-        if not data:
-            print("❌ Empty data list")
-            return
+        sheet_ids = {}
+        for sheet in spreadsheet.get('sheets', []):
+            sheet_ids[sheet['properties']['title']] = sheet['properties']['sheetId']
         
-        try:
-            # Get existing sheets
-            spreadsheet = self.service.spreadsheets().get(
-                spreadsheetId=self.spreadsheet_id
-            ).execute()
-            
-            existing_sheets = [sheet['properties']['title'] 
-                             for sheet in spreadsheet.get('sheets', [])]
-            
-            # Create sheet if it doesn't exist
-            if sheet_name not in existing_sheets:
-                self._create_sheet(sheet_name)
-                # Add headers
-                headers = list(data[0].keys())
-                self._write_to_sheet(sheet_name, [headers], "A1")
-                print(f"✓ Created new sheet: '{sheet_name}'")
-            
-            # Prepare data rows
-            rows = []
-            for item in data:
-                # Ensure all values are strings or numbers
-                row = [str(v) if v is not None else '' for v in item.values()]
-                rows.append(row)
-            
-            # Append data
-            self._append_to_sheet(sheet_name, rows)
-            
-            print(f"✓ Added {len(rows)} row(s) to '{sheet_name}' in Google Sheets")
+        sheet_headers = {}
+        if sheet_ids:
+            ranges = [f"{_a1_sheet(title)}!1:1" for title in sheet_ids]
+            result = self._execute('batchGet', self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=ranges
+            ))
             
-        except HttpError as e:
-            print(f"❌ Error saving to Google Sheets: {e}")
+            for title, value_range in zip(sheet_ids, result.get('valueRanges', [])):
+                values = value_range.get('values', [])
+                sheet_headers[title] = values[0] if values else []
+        
+        self._sheet_ids = sheet_ids
+        self._sheet_headers = sheet_headers
     
     
-    def _create_sheet(self, sheet_name):
-        """Create a new sheet in the spreadsheet."""
-        try:
-            request_body = {
-                'requests': [{
-                    'addSheet': {
-                        'properties': {
-                            'title': sheet_name
-                        }
-                    }
-                }]
+    @staticmethod
+    def _row_values(data, ids, headers, sheet_name):
+        """
+        Get the value lists of the records from one save, in the tab's
+        header order, with each row's ID in the row_id column.
+        
+        Raises:
+            SchemaMismatchError: If the records have different columns
+                than the tab's header row
+        """
+        fields = set(fields_of(data))
+        columns = [name for name in headers if name != ROW_ID_COLUMN]
+        if set(columns) != fields:
+            missing = sorted(set(columns) - fields)
+            extra = sorted(fields - set(columns))
+            raise SchemaMismatchError(
+                f"Columns don't match header of sheet '{sheet_name}' "
+                f"(missing: {missing}, unexpected: {extra})"
+            )
+        position = headers.index(ROW_ID_COLUMN)
+        rows = []
+        for values, id_ in zip(iter_values(data, columns), ids):
+            values = list(values)
+            values.insert(position, id_)
+            rows.append(values)
+        return rows
+    
+    
+    @classmethod
+    def _header_cell_request(cls, sheet_id, column, name):
+        """Build an updateCells request that sets one cell of the header row."""
+        return {
+            'updateCells': {
+                'start': {'sheetId': sheet_id, 'rowIndex': 0, 'columnIndex': column},
+                'rows': [{'values': [cls._cell(name)]}],
+                'fields': 'userEnteredValue'
             }
-            
-            self.service.spreadsheets().batchUpdate(
-                spreadsheetId=self.spreadsheet_id,
-                body=request_body
-            ).execute()
-            
-        except HttpError as e:
-            print(f"❌ Error creating sheet: {e}")
-            raise
+        }
     
     
-    def _write_to_sheet(self, sheet_name, values, range_start):
-        """Write values to a specific range in the sheet."""
-        try:
-            range_name = f"{sheet_name}!{range_start}"
-            body = {'values': values}
-            
-            self.service.spreadsheets().values().update(
-                spreadsheetId=self.spreadsheet_id,
-                range=range_name,
-                valueInputOption='RAW',
-                body=body
-            ).execute()
-            
-        except HttpError as e:
-            print(f"❌ Error writing to sheet: {e}")
-            raise
+    @staticmethod
+    def _cell(value):
+        """Convert one value to a cell: numbers stay numbers, the rest is plain text."""
+        if value is None:
+            return {'userEnteredValue': {'stringValue': ''}}
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return {'userEnteredValue': {'numberValue': value}}
+        return {'userEnteredValue': {'stringValue': str(value)}}
+    
+    
+    @classmethod
+    def _append_cells_request(cls, sheet_id, rows):
+        """Build an appendCells request that adds rows of values (like RAW input)."""
+        cell = cls._cell
+        return {
+            'appendCells': {
+                'sheetId': sheet_id,
+                'rows': [{'values': [cell(value) for value in row]} for row in rows],
+                'fields': 'userEnteredValue'
+            }
+        }
     
     
-    def _append_to_sheet(self, sheet_name, values):
-        """Append values to the end of the sheet."""
+    def _batch_update(self, requests_body):
+        """
+        Send several spreadsheet requests in a single batchUpdate call.
+        
+        Appending rows isn't idempotent, so only 429s (never applied) are
+        retried here; callers retry other failures after checking which
+        rows made it (see _send_with_retries).
+        """
         try:
-            range_name = f"{sheet_name}!A:A"
-            body = {'values': values}
-            
-            self.service.spreadsheets().values().append(
+            self._execute('batchUpdate', self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
-                range=range_name,
-                valueInputOption='RAW',
-                insertDataOption='INSERT_ROWS',
-                body=body
-            ).execute()
+                body={'requests': requests_body}
+            ), idempotent=False)
             
-        except HttpError as e:
-            print(f"❌ Error appending to sheet: {e}")
+        except _http_error() as e:
+            print(f"❌ Error updating sheet: {e}")
             raise
     
     
-    def run_weather_automation(self, cities=None):
-        """Run weather data collection automation."""
-        if cities is None:
-            cities = ["London", "New York", "Tokyo"]
-        
-        print("\n" + "="*60)
-        print("🌤️  WEATHER DATA AUTOMATION")
-        print("="*60)
+    def _execute(self, method, request, idempotent=True):
+        """
+        Run a Sheets API request through the rate limiter, retrying
+        rate-limited (429) and temporary (5xx) errors.
         
-        for city in cities:
-            weather_data = self.fetch_weather_data(city)
-            if weather_data:
-                self.save_to_sheet(weather_data, "Weather Data")
-            time.sleep(1)
+        Args:
+            method (str): API method name for the log event (e.g. "batchUpdate")
+            request (HttpRequest): Request built by the Sheets client
+            idempotent (bool): False for requests that mustn't be sent twice
+                (only 429s, which Sheets never applied, are retried then)
+            
+        Returns:
+            dict: The API response
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.wait(SHEETS_API_HOST)
+            start = time.perf_counter()
+            try:
+                response = request.execute()
+            except _http_error() as e:
+                status = e.resp.status
+                retry_after = parse_retry_after(e.resp.get('retry-after'))
+                self._record_call(method, status, start)
+                self.rate_limiter.feedback(SHEETS_API_HOST, status, retry_after)
+                retryable = RETRY_STATUSES if idempotent else (429,)
+                if status not in retryable or attempt >= self.http.max_retries:
+                    raise
+                self.metrics.inc('http_retries_total', host=SHEETS_API_HOST, reason=status)
+                time.sleep(self.http.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            except Exception:
+                self._record_call(method, 'error', start)
+                raise
+            
+            self._record_call(method, 200, start)
+            self.rate_limiter.feedback(SHEETS_API_HOST, 200)
+            return response
     
     
-    def run_crypto_automation(self):
-        """Run cryptocurrency price collection automation."""
-        print("\n" + "="*60)
-        print("₿  CRYPTOCURRENCY AUTOMATION")
-        print("="*60)
-        
-        crypto_data = self.fetch_crypto_prices()
-        if crypto_data:
-            self.save_to_sheet(crypto_data, "Crypto Prices")
+    def _record_call(self, method, status, start):
+        """Record the metrics and log event of one Sheets API call."""
+        if not self.metrics.enabled:
+            return
+        seconds = time.perf_counter() - start
+        self.metrics.observe('http_request_seconds', seconds, host=SHEETS_API_HOST)
+        self.metrics.inc('http_requests_total', host=SHEETS_API_HOST, status=status)
+        self.metrics.event('http_request', host=SHEETS_API_HOST, method=method,
+                           status=status, seconds=round(seconds, 4))
     
     
-    def run_news_automation(self, category="technology"):
-        """Run news collection automation."""
-        print("\n" + "="*60)
-        print("📰 NEWS AUTOMATION")
-        print("="*60)
+    def close(self):
+        """
+        Flush queued rows and release network connections and local caches.
+        Call this once the assistant is no longer needed (safe to call twice).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        if self.write_queue is not None:
+            self.write_queue.close()
+            stats = self.write_queue.stats()
+            if stats['enqueued']:
+                print(f"📬 Background writes: {stats['written']} saved, {stats['failed']} failed, "
+                      f"max lag {stats['max_lag']:.2f}s, max queue depth {stats['max_depth']}")
         
-        news_data = self.fetch_news(category=category)
-        if news_data:
-            self.save_to_sheet(news_data, "Latest News")
+        if self._replayer is not None:
+            self._replayer.close()
+        self.flush()
+        if self.spool is not None and self.spool.rows:
+            print(f"📥 {self.spool.rows} row(s) remain in the Sheets spool and will be written by the next run")
+        self.http.close()
+        self.response_cache.close()
+        self.geocode_cache.close()
+        self.news_index.close()
+        self.metrics.close()
 
 
 def main():
     """
     Main function to run the automation assistant with Google Sheets.
+    Run with --daemon to keep collecting data on a schedule instead.
     """
+    parser = argparse.ArgumentParser(description="Automation Assistant - Google Sheets Version")
+    add_daemon_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    
     print("\n" + "="*60)
     print("🤖 AUTOMATION ASSISTANT - GOOGLE SHEETS VERSION")
     print("="*60)
@@ -419,7 +912,13 @@ def main():
     
     try:
         # Initialize the assistant
-        assistant = AutomationAssistantGSheets(CREDENTIALS_FILE, SPREADSHEET_ID)
+        assistant = AutomationAssistantGSheets(CREDENTIALS_FILE, SPREADSHEET_ID,
+                                               metrics=metrics_from_args(args))
+        
+        if args.daemon:
+            # One warm process: the Sheets service is built only once
+            run_daemon(assistant, args)
+            return
         
         # Display menu
         print("\nChoose which automation to run:")
@@ -448,6 +947,9 @@ def main():
             print("\n❌ Invalid choice. Please run the script again.")
             return
         
+        # Write any buffered rows before reporting success
+        assistant.close()
+        
         print("\n" + "="*60)
         print("✅ AUTOMATION COMPLETED!")
         print("="*60)
@@ -0,0 +1,304 @@
+"""
+Benchmark Suite
+===============
+Repeatable end-to-end benchmarks of the weather, crypto and news
+automations, for both the CSV and Google Sheets versions.
+
+Every run talks to the local mock server (mock_api.py) instead of the
+real APIs, with configurable latency and error rate, so results can be
+compared between commits without network noise or API quotas. Each
+automation runs in its own fresh process with an empty data folder and
+reports:
+
+- records/sec: rows saved per second of wall time (fetch + save)
+- p50 / p99: latency of the individual API calls (ms)
+- calls: API requests per run (including retries and Sheets calls)
+- peak RSS: maximum resident memory of the process (MB)
+
+Usage:
+
+    python benchmark.py                        # all automations, CSV + Sheets
+    python benchmark.py --only crypto --coins 5000 --latency 0.05
+    python benchmark.py --error-rate 0.05 --runs 3 --json results.json
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from mock_api import MockAPIServer, mock_session
+
+
+AUTOMATIONS = ('weather', 'crypto', 'news')
+VERSIONS = ('csv', 'sheets')
+
+
+class _CallLog:
+    """Thread-safe log of (host, seconds, status) for every API call."""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, host, seconds, status):
+        with self._lock:
+            self.calls.append((host, seconds, status))
+
+
+def _percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _sheets_service(base_url, call_log):
+    """Build a Sheets API client that sends its requests to the mock server."""
+    import httplib2
+    from googleapiclient.discovery import build
+
+    class TimedHttp(httplib2.Http):
+        def request(self, uri, *args, **kwargs):
+            start = time.perf_counter()
+            response, content = super().request(uri, *args, **kwargs)
+            call_log('sheets.googleapis.com', time.perf_counter() - start, response.status)
+            return response, content
+
+    return build(
+        'sheets', 'v4',
+        http=TimedHttp(),
+        client_options={'api_endpoint': f"{base_url}/sheets.googleapis.com/"},
+        static_discovery=True
+    )
+
+
+def _make_assistant(version, base_url, folder, call_log, options):
+    """Create an assistant wired to the mock server."""
+    from concurrency import RateLimiter
+    from http_client import HttpClient
+
+    # No client-side throttling: the benchmark measures our code, not the
+    # politeness delays meant for the real APIs
+    http_client = HttpClient(
+        pool_size=options['max_workers'],
+        backoff_base=0.05,
+        rate_limiter=RateLimiter(0, host_rates={}),
+        session=mock_session(base_url, call_log, pool_size=options['max_workers'])
+    )
+
+    common = dict(
+        max_workers=options['max_workers'],
+        http_client=http_client,
+        skip_unchanged=False,
+        news_daily_quota=1_000_000,
+        coins_file=os.path.join(folder, 'coins.txt'),
+        stream_json=options['stream_json']
+    )
+
+    if version == 'csv':
+        from automation_assistant_csv import AutomationAssistant
+        return AutomationAssistant(data_folder=folder, **common)
+
+    from automation_assistant_gsheets import AutomationAssistantGSheets
+    return AutomationAssistantGSheets(
+        None, 'benchmark-spreadsheet',
+        data_folder=folder,
+        service=_sheets_service(base_url, call_log),
+        **common
+    )
+
+
+def _run_scenario(version, automation, base_url, options):
+    """
+    Run one automation once (in a fresh process) and measure it.
+
+    Returns:
+        dict: records, seconds, latencies (seconds), calls, errors, peak_rss_mb
+    """
+    os.environ['NEWS_API_KEY'] = 'benchmark'
+    call_log = _CallLog()
+
+    with tempfile.TemporaryDirectory() as folder:
+        with open(os.path.join(folder, 'coins.txt'), 'w', encoding='utf-8') as f:
+            f.writelines(f"coin-{i}\n" for i in range(options['coins']))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assistant = _make_assistant(version, base_url, folder, call_log, options)
+
+            start = time.perf_counter()
+            if automation == 'weather':
+                cities = [f"City {i}" for i in range(options['cities'])]
+                assistant.run_weather_automation(cities=cities)
+            elif automation == 'crypto':
+                assistant.run_crypto_automation()
+            else:
+                feeds = [(f"topic{i}", 'us') for i in range(options['feeds'])]
+                assistant.run_news_automation(feeds=feeds)
+
+            # Saves happen in the background; they count towards the run
+            assistant.write_queue.join()
+            if version == 'sheets':
+                assistant.flush()
+            elapsed = time.perf_counter() - start
+
+            records = assistant.write_queue.stats()['rows_written']
+            assistant.close()
+
+    if options['verbose']:
+        print(output.getvalue())
+
+    return {
+        'records': records,
+        'seconds': elapsed,
+        'latencies': [seconds for _, seconds, _ in call_log.calls],
+        'calls': len(call_log.calls),
+        'errors': sum(1 for _, _, status in call_log.calls if status >= 400),
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+
+def run_benchmarks(versions=VERSIONS, automations=AUTOMATIONS, runs=1, latency=0.0,
+                   jitter=0.0, error_rate=0.0, seed=42, **options):
+    """
+    Run every (version, automation) scenario against a fresh mock server.
+
+    Args:
+        versions (tuple): 'csv' and/or 'sheets'
+        automations (tuple): 'weather', 'crypto' and/or 'news'
+        runs (int): Runs per scenario (latencies are pooled, rates averaged)
+        latency (float): Seconds the mock server adds to every response
+        jitter (float): Up to this many random extra seconds per response
+        error_rate (float): Share of mock responses that fail with HTTP 503
+        seed (int): Random seed of the mock server
+        **options: cities, coins, feeds, max_workers, stream_json, verbose
+
+    Returns:
+        list: One result dict per scenario
+    """
+    options = {
+        'cities': 200, 'coins': 2000, 'feeds': 10, 'max_workers': 8,
+        'stream_json': False, 'verbose': False, **options
+    }
+
+    server = MockAPIServer(latency=latency, jitter=jitter, error_rate=error_rate, seed=seed).start()
+    # A new interpreter per run, so peak RSS belongs to that automation alone
+    context = multiprocessing.get_context('spawn')
+    results = []
+
+    try:
+        for version in versions:
+            for automation in automations:
+                measured = []
+                for _ in range(runs):
+                    with context.Pool(1) as pool:
+                        measured.append(pool.apply(
+                            _run_scenario, (version, automation, server.url, options)
+                        ))
+
+                latencies = [seconds for run in measured for seconds in run['latencies']]
+                rss = [run['peak_rss_mb'] for run in measured if run['peak_rss_mb'] is not None]
+                results.append({
+                    'version': version,
+                    'automation': automation,
+                    'runs': runs,
+                    'records': statistics.mean(run['records'] for run in measured),
+                    'records_per_sec': statistics.mean(
+                        run['records'] / run['seconds'] for run in measured
+                    ),
+                    'p50_ms': _percentile(latencies, 50) and _percentile(latencies, 50) * 1000,
+                    'p99_ms': _percentile(latencies, 99) and _percentile(latencies, 99) * 1000,
+                    'calls': statistics.mean(run['calls'] for run in measured),
+                    'errors': statistics.mean(run['errors'] for run in measured),
+                    'peak_rss_mb': max(rss) if rss else None
+                })
+    finally:
+        server.stop()
+
+    return results
+
+
+def print_results(results):
+    """Print benchmark results as a table."""
+    def number(value, digits):
+        return '-' if value is None else f"{value:.{digits}f}"
+
+    print(f"{'Scenario':<16}{'records':>9}{'records/s':>12}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'calls':>8}{'errors':>8}{'peak RSS MB':>13}")
+    for result in results:
+        name = f"{result['version']}/{result['automation']}"
+        print(f"{name:<16}{result['records']:>9.0f}{result['records_per_sec']:>12.1f}"
+              f"{number(result['p50_ms'], 1):>9}{number(result['p99_ms'], 1):>9}"
+              f"{result['calls']:>8.0f}{result['errors']:>8.0f}"
+              f"{number(result['peak_rss_mb'], 1):>13}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the automations against a local mock API")
+    parser.add_argument('--only', nargs='+', choices=AUTOMATIONS, default=list(AUTOMATIONS),
+                        help="Automations to run (default: all)")
+    parser.add_argument('--versions', nargs='+', choices=VERSIONS, default=list(VERSIONS),
+                        help="Versions to run (default: csv sheets)")
+    parser.add_argument('--runs', type=int, default=1, help="Runs per scenario (default: 1)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to each mock response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra seconds per mock response")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Share of mock responses failing with HTTP 503 (0-1)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed of the mock server")
+    parser.add_argument('--cities', type=int, default=200, help="Cities in the weather run (default: 200)")
+    parser.add_argument('--coins', type=int, default=2000, help="Coins in the crypto run (default: 2000)")
+    parser.add_argument('--feeds', type=int, default=10, help="News feeds in the news run (default: 10)")
+    parser.add_argument('--max-workers', type=int, default=8, help="Concurrent requests (default: 8)")
+    parser.add_argument('--stream-json', action='store_true', help="Parse responses incrementally (needs ijson)")
+    parser.add_argument('--json', metavar='FILE', help="Also write the results to a JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Show the automations' own output")
+    args = parser.parse_args()
+
+    results = run_benchmarks(
+        versions=tuple(args.versions),
+        automations=tuple(args.only),
+        runs=args.runs,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        cities=args.cities,
+        coins=args.coins,
+        feeds=args.feeds,
+        max_workers=args.max_workers,
+        stream_json=args.stream_json,
+        verbose=args.verbose
+    )
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results saved to {args.json}")
@@ -0,0 +1,80 @@
+"""
+Coin Watchlist
+==============
+Loads the list of cryptocurrencies to track from a config file and
+splits it into requests that CoinGecko accepts, for both the CSV and
+Google Sheets versions.
+
+The watchlist is a text file with one CoinGecko coin ID per line
+(blank lines and # comments are ignored), or a JSON file containing a
+list of IDs. IDs are listed at https://api.coingecko.com/api/v3/coins/list
+
+Thousands of IDs don't fit in one URL, so they are split into chunks
+whose (URL-encoded) `ids=` value stays below a safe length.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import json
+import os
+from urllib.parse import quote
+
+
+DEFAULT_COINS = ['bitcoin', 'ethereum', 'cardano']
+
+# Most servers and proxies reject URLs longer than ~2000 characters;
+# this leaves room for the rest of the URL and the other parameters
+MAX_IDS_LENGTH = 1500
+
+
+def load_coins(path):
+    """
+    Load coin IDs from a watchlist file.
+
+    Args:
+        path (str): Path of a .txt (one ID per line) or .json (list) file
+
+    Returns:
+        list: Unique coin IDs in file order (DEFAULT_COINS if the file doesn't exist)
+    """
+    if not path or not os.path.exists(path):
+        return list(DEFAULT_COINS)
+
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            coins = json.load(f)
+        else:
+            coins = [line.split('#', 1)[0] for line in f]
+
+    coins = [str(coin).strip().lower() for coin in coins]
+    return list(dict.fromkeys(coin for coin in coins if coin))
+
+
+def url_safe_chunks(coins, max_length=MAX_IDS_LENGTH):
+    """
+    Split coin IDs into chunks whose URL-encoded, comma-joined length
+    stays within `max_length` characters.
+
+    Args:
+        coins (list): Coin IDs
+        max_length (int): Maximum encoded length of one chunk's `ids` value
+
+    Returns:
+        list: List of chunks (lists of coin IDs)
+    """
+    separator = len(quote(','))
+    chunks = []
+    chunk, length = [], 0
+
+    for coin in coins:
+        size = len(quote(coin, safe=''))
+        if chunk and length + separator + size > max_length:
+            chunks.append(chunk)
+            chunk, length = [], 0
+        length += size + (separator if chunk else 0)
+        chunk.append(coin)
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
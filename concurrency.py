@@ -0,0 +1,251 @@
+"""
+Concurrency Helpers
+===================
+Shared helpers used by both the CSV and Google Sheets versions to collect
+data for many items (cities, coins, ...) at the same time without
+overloading the public APIs.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+
+# Hosts with a different limit than the default (requests per second).
+# CoinGecko's free API allows roughly 30 calls per minute, the Google
+# Sheets API 60 requests per minute per user.
+DEFAULT_HOST_RATES = {
+    'api.coingecko.com': 0.5,
+    'sheets.googleapis.com': 1.0,
+}
+
+# Responses that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+
+class _Bucket:
+    """Token bucket of one host (only used under the RateLimiter's lock)."""
+
+    __slots__ = ('max_rate', 'rate', 'tokens', 'updated', 'last_decrease')
+
+    def __init__(self, rate, burst, now):
+        self.max_rate = rate     # Configured rate, never exceeded
+        self.rate = rate         # Current (adapted) rate
+        self.tokens = burst      # Negative while requests are queued
+        self.updated = now
+        self.last_decrease = float('-inf')
+
+
+class RateLimiter:
+    """
+    Thread-safe, adaptive per-host rate limiter.
+
+    Every host (e.g. the geocoding API, the forecast API, the Sheets API)
+    has its own token bucket, refilled at `requests_per_second` or at the
+    host's own rate (see DEFAULT_HOST_RATES). Callers report each
+    response with feedback(), and the rate adapts AIMD-style:
+
+    - a 429/503 response halves the host's rate (at most once per request
+      interval, so a burst of parallel 429s counts once) and a Retry-After
+      header pauses the whole host for that long
+    - every successful response adds back a small step of the configured
+      rate, which is the ceiling
+
+    So the configured rates can be set close to the APIs' published limits:
+    if they turn out to be too high, the limiter backs off by itself.
+    """
+
+    def __init__(self, requests_per_second=5, host_rates=None, burst=1, adaptive=True,
+                 increase=0.05, decrease=0.5, min_rate=0.01):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            requests_per_second (float): Max requests per host per second
+                (0 or None disables limiting)
+            host_rates (dict): Per-host {host: requests_per_second} overrides
+                (default: DEFAULT_HOST_RATES)
+            burst (int): Requests a host may receive back to back after an idle period
+            adaptive (bool): Lower and raise rates from feedback() (Retry-After
+                pauses apply either way)
+            increase (float): Share of the configured rate added back per successful response
+            decrease (float): Factor the rate is multiplied by when throttled
+            min_rate (float): Lowest rate a host is slowed down to (requests per second)
+        """
+        self.default_rate = requests_per_second or 0
+        self.host_rates = dict(DEFAULT_HOST_RATES if host_rates is None else host_rates)
+        self.burst = burst
+        self.adaptive = adaptive
+        self.increase = increase
+        self.decrease = decrease
+        self.min_rate = min_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(url):
+        """Host of a URL (a bare host name is returned as it is)."""
+        return urlparse(url).netloc or url
+
+    def _bucket(self, host, now):
+        """Get (or create) a host's bucket; None if the host isn't limited."""
+        if host in self._buckets:
+            return self._buckets[host]
+        rate = self.host_rates.get(host, self.default_rate)
+        bucket = self._buckets[host] = _Bucket(rate, self.burst, now) if rate else None
+        return bucket
+
+    def _refill(self, bucket, now):
+        """Add the tokens earned since the bucket was last updated."""
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+
+    def split(self, parts):
+        """
+        Keep only a 1/parts share of every rate, for a limiter that is one
+        of `parts` processes calling the same APIs (see sharding.py).
+
+        Args:
+            parts (int): Number of processes sharing the rate limits
+        """
+        with self._lock:
+            self.default_rate /= parts
+            self.host_rates = {host: rate / parts for host, rate in self.host_rates.items()}
+            for bucket in self._buckets.values():
+                if bucket is not None:
+                    bucket.max_rate /= parts
+                    bucket.rate /= parts
+
+    def wait(self, url):
+        """
+        Block until a request to the host of `url` is allowed.
+
+        Args:
+            url (str): URL that is about to be requested (or a bare host name)
+        """
+        host = self._host(url)
+
+        # Take a token (going into debt if there is none), then sleep outside the lock
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            if bucket is None:
+                return
+            self._refill(bucket, now)
+            bucket.tokens -= 1
+            delay = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def feedback(self, url, status, retry_after=None):
+        """
+        Adapt the host's rate to the outcome of a request.
+
+        Args:
+            url (str): URL that was requested (or a bare host name)
+            status (int): HTTP status code of the response
+            retry_after (float): Seconds from the Retry-After header, if any
+        """
+        host = self._host(url)
+        throttled = status in THROTTLE_STATUSES
+
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            if bucket is None:
+                return
+            self._refill(bucket, now)
+
+            if not throttled:
+                if self.adaptive and status < 400 and bucket.rate < bucket.max_rate:
+                    bucket.rate = min(bucket.max_rate,
+                                      bucket.rate + self.increase * bucket.max_rate)
+                return
+
+            slowed = False
+            if self.adaptive and now - bucket.last_decrease >= 1.0 / bucket.rate:
+                bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                bucket.last_decrease = now
+                slowed = True
+            if retry_after:
+                # Nobody gets a token until the Retry-After period is over
+                bucket.tokens = min(bucket.tokens, -retry_after * bucket.rate)
+            rate = bucket.rate
+
+        if slowed:
+            print(f"⚠️  {host} is rate limiting (HTTP {status}), slowing down to {rate:.2f} requests/s")
+
+    def rates(self):
+        """
+        Get the current rate of every host used so far.
+
+        Returns:
+            dict: {host: requests per second} (limited hosts only)
+        """
+        with self._lock:
+            return {host: bucket.rate for host, bucket in self._buckets.items() if bucket is not None}
+
+
+def fetch_all(fetch, items, max_workers=8):
+    """
+    Call `fetch(item)` for every item on a bounded thread pool.
+
+    A failing item never stops the rest of the run: exceptions and
+    None results are collected as failures instead.
+
+    Args:
+        fetch (callable): Function that fetches data for one item
+        items (list): Items to fetch (e.g. city names)
+        max_workers (int): Maximum number of concurrent fetches
+
+    Returns:
+        tuple: (results, failures) - results in input order, and a list
+            of (item, reason) tuples for the items that failed
+    """
+    items = list(items)
+    if not items:
+        return [], []
+
+    results = [None] * len(items)
+    errors = {}
+    workers = max(1, min(max_workers or 1, len(items)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch, item): index for index, item in enumerate(items)}
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors[index] = str(e)
+                continue
+
+            if result is None:
+                errors[index] = "no data returned"
+            else:
+                results[index] = result
+
+    failures = [(items[index], errors[index]) for index in sorted(errors)]
+    return [r for r in results if r is not None], failures
+
+
+def chunked(items, size):
+    """
+    Split a list into consecutive chunks of at most `size` items.
+
+    Args:
+        items (list): Items to split
+        size (int): Maximum chunk size
+
+    Returns:
+        list: List of chunks (lists)
+    """
+    items = list(items)
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
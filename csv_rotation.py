@@ -0,0 +1,377 @@
+"""
+CSV Rotation
+============
+Rolling CSV output for the CSV version. Instead of appending to one
+ever-growing file, each dataset gets a folder of time partitions:
+
+    data/crypto_prices/2026-10-16.csv        rotate='daily'
+    data/crypto_prices/2026-10-16T13.csv     rotate='hourly'
+    data/crypto_prices/2026-10-16.1.csv      next part, once rotate_mb is reached
+
+Rows go to the partition of their own timestamp. Once a partition is
+closed it is compressed in a background thread (gzip, or zstd if the
+zstandard package is installed), and manifest.json in the folder lists
+every segment with its row count and first/last timestamp, so readers
+can open just the files they need:
+
+    for path in find_segments("data/crypto_prices", start="2026-10-16 00:00:00"):
+        with open_segment(path) as f:
+            rows = list(csv.DictReader(f))
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from csv_writer import CsvWriter
+from records import RecordBatch, is_record
+from serialization import timestamp_now
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+
+# Length of the 'YYYY-MM-DD HH:MM:SS' prefix that names a partition
+ROTATE_PERIODS = {'daily': 10, 'hourly': 13}
+
+# File extension of each compression method
+COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+
+MANIFEST_FILE = "manifest.json"
+ZSTD_LEVEL = 10
+
+
+def _row_timestamp(row):
+    """Collection timestamp of a record or dict (now if it has none)."""
+    if is_record(row):
+        timestamp = getattr(row, 'timestamp', None)
+    else:
+        timestamp = row.get('timestamp')
+    return str(timestamp) if timestamp else timestamp_now()
+
+
+def load_manifest(folder):
+    """
+    Read the manifest of a rotated dataset.
+
+    Args:
+        folder (str): Dataset folder (e.g. data/crypto_prices)
+
+    Returns:
+        dict: {'segments': [...]} (empty if there is no manifest yet)
+    """
+    path = os.path.join(folder, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {'segments': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_segments(folder, start=None, end=None):
+    """
+    Get the segment files that may hold rows between two timestamps.
+
+    Args:
+        folder (str): Dataset folder (e.g. data/crypto_prices)
+        start (str): Earliest timestamp wanted ('YYYY-MM-DD HH:MM:SS', default: no limit)
+        end (str): Latest timestamp wanted (default: no limit)
+
+    Returns:
+        list: Segment paths, oldest first
+    """
+    paths = []
+    for segment in load_manifest(folder)['segments']:
+        if not segment['rows']:
+            continue
+        if start is not None and segment['max_timestamp'] < start:
+            continue
+        if end is not None and segment['min_timestamp'] > end:
+            continue
+        paths.append(os.path.join(folder, segment['file']))
+    return paths
+
+
+def open_segment(path):
+    """
+    Open a segment (plain, .gz or .zst) for reading as CSV text.
+
+    Args:
+        path (str): Segment path
+
+    Returns:
+        file: Text file object
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is needed to read '{path}' (pip install zstandard)")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(raw, newline='', encoding='utf-8')
+    return open(path, newline='', encoding='utf-8')
+
+
+class RotatingCsvWriter:
+    """
+    Drop-in replacement for CsvWriter that writes time partitions.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, path, flush_rows=500, flush_interval=2.0, fsync='close',
+                 rotate='daily', rotate_mb=None, compress='gzip'):
+        """
+        Initialize the writer (files are opened on the first write).
+
+        Args:
+            path (str): Path the dataset would have without rotation
+                (data/crypto_prices.csv -> folder data/crypto_prices)
+            flush_rows (int): Flush once this many rows are buffered
+            flush_interval (float): Flush rows older than this many seconds
+            fsync (str): 'never', 'flush' (after every flush) or 'close'
+            rotate (str): Partition period: 'daily' or 'hourly'
+            rotate_mb (float): Also start a new part once a segment reaches this size
+            compress (str): Compression of closed segments: 'gzip', 'zstd' or None
+        """
+        if rotate not in ROTATE_PERIODS:
+            raise ValueError(f"rotate must be one of {tuple(ROTATE_PERIODS)}, got '{rotate}'")
+        if compress is not None and compress not in COMPRESSIONS:
+            raise ValueError(f"compress must be one of {tuple(COMPRESSIONS)} or None, got '{compress}'")
+        if compress == 'zstd' and zstandard is None:
+            print("⚠️  zstandard is not installed, compressing with gzip instead (pip install zstandard)")
+            compress = 'gzip'
+
+        self.folder = os.path.splitext(path)[0]
+        self.path = self.folder  # Path of the active segment once there is one
+        self.rotate = rotate
+        self.rotate_bytes = rotate_mb * 1024 * 1024 if rotate_mb else None
+        self.compress = compress
+        self.header = None
+        self._writer_options = {
+            'flush_rows': flush_rows,
+            'flush_interval': flush_interval,
+            'fsync': fsync,
+        }
+
+        os.makedirs(self.folder, exist_ok=True)
+        self._manifest = load_manifest(self.folder)
+        self._segment = None   # Manifest entry of the active segment
+        self._writer = None    # CsvWriter of the active segment
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._compressor = None
+
+        # Finish compressions interrupted by a crash or an earlier exit
+        for segment in self._manifest['segments']:
+            if not segment['sealed']:
+                continue
+            plain_path = os.path.join(self.folder, segment['csv_file'])
+            if segment['compression'] and os.path.exists(plain_path):
+                os.remove(plain_path)
+            elif not segment['compression'] and self.compress:
+                self._compress_later(segment)
+
+    def _groups(self, rows):
+        """Split rows into runs of the same partition: (period, rows, min, max)."""
+        length = ROTATE_PERIODS[self.rotate]
+        if isinstance(rows, RecordBatch):
+            if len(rows):
+                yield rows.timestamp[:length], rows, rows.timestamp, rows.timestamp
+            return
+
+        group, period, first, last = [], None, None, None
+        for row in rows:
+            timestamp = _row_timestamp(row)
+            row_period = timestamp[:length]
+            if row_period != period and group:
+                yield period, group, first, last
+                group, first, last = [], None, None
+            period = row_period
+            group.append(row)
+            first = timestamp if first is None else min(first, timestamp)
+            last = timestamp if last is None else max(last, timestamp)
+        if group:
+            yield period, group, first, last
+
+    def write_rows(self, rows, on_flushed=None):
+        """
+        Buffer rows for writing, starting new segments as needed.
+
+        Args:
+            rows (list or RecordBatch): Records or dicts (fields must match
+                the dataset's header)
+            on_flushed (callable): Called without arguments once the rows
+                are written (see CsvWriter.write_rows)
+
+        Raises:
+            SchemaMismatchError: If a row has different columns than the dataset
+        """
+        with self._lock:
+            groups = list(self._groups(rows))
+            if not groups and on_flushed is not None:
+                on_flushed()
+            for index, (period, group, first, last) in enumerate(groups):
+                # Rows of an earlier period (e.g. after the clock went back)
+                # stay in the active segment; its min/max timestamps cover them
+                if self._segment is None:
+                    self._resume(period)
+                elif period > self._segment['period']:
+                    self._seal()
+                    self._open_segment(period)
+                elif self.rotate_bytes and self._segment_size() >= self.rotate_bytes:
+                    current = self._segment['period']
+                    self._seal()
+                    self._open_segment(current)
+
+                # Segments are written in order, so once the last group is
+                # written all of them are
+                last_group = index == len(groups) - 1
+                self._writer.write_rows(group, on_flushed if last_group else None)
+                self.header = self._writer.header
+
+                segment = self._segment
+                segment['rows'] += len(group)
+                if segment['min_timestamp'] is None or first < segment['min_timestamp']:
+                    segment['min_timestamp'] = first
+                if segment['max_timestamp'] is None or last > segment['max_timestamp']:
+                    segment['max_timestamp'] = last
+                self._dirty = True
+
+    def _segment_size(self):
+        """Size of the active segment on disk (lock must be held)."""
+        path = os.path.join(self.folder, self._segment['file'])
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def _resume(self, period):
+        """
+        Continue the last open segment if it is the same period, or seal it
+        and start a new one (lock must be held).
+        """
+        segments = self._manifest['segments']
+        last = segments[-1] if segments else None
+        if last is not None and not last['sealed']:
+            if last['period'] >= period:
+                self._segment = last
+                self._writer = CsvWriter(os.path.join(self.folder, last['file']), **self._writer_options)
+                self.path = self._writer.path
+                return
+            self._segment = last
+            self._seal()
+        self._open_segment(period)
+
+    def _open_segment(self, period):
+        """Start a new segment for a period (lock must be held)."""
+        part = sum(1 for segment in self._manifest['segments'] if segment['period'] == period)
+        name = period.replace(' ', 'T') + (f".{part}" if part else "") + ".csv"
+        self._segment = {
+            'file': name,
+            'csv_file': name,
+            'period': period,
+            'part': part,
+            'rows': 0,
+            'min_timestamp': None,
+            'max_timestamp': None,
+            'sealed': False,
+            'compression': None,
+            'bytes': 0,
+        }
+        self._manifest['segments'].append(self._segment)
+        self._writer = CsvWriter(os.path.join(self.folder, name), **self._writer_options)
+        self.path = self._writer.path
+        self._save_manifest()
+
+    def _seal(self):
+        """Close the active segment and queue it for compression (lock must be held)."""
+        if self._writer is not None:
+            self._writer.close()
+        segment = self._segment
+        segment['sealed'] = True
+        segment['bytes'] = self._segment_size()
+        self._segment = None
+        self._writer = None
+        self._save_manifest()
+        if self.compress:
+            self._compress_later(segment)
+
+    def _compress_later(self, segment):
+        """Compress a sealed segment on the background thread."""
+        if self._compressor is None:
+            self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-compress")
+        self._compressor.submit(self._compress, segment)
+
+    def _compress(self, segment):
+        """Compress one sealed segment, then point the manifest to the new file."""
+        source = os.path.join(self.folder, segment['csv_file'])
+        target = source + COMPRESSIONS[self.compress]
+        temp_path = target + ".tmp"
+        try:
+            with open(source, 'rb') as src, open(temp_path, 'wb') as raw:
+                if self.compress == 'zstd':
+                    zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(src, raw)
+                else:
+                    with gzip.GzipFile(filename=segment['csv_file'], mode='wb',
+                                       fileobj=raw, mtime=0) as dst:
+                        shutil.copyfileobj(src, dst, 1024 * 1024)
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temp_path, target)
+        except OSError as e:
+            print(f"⚠️  Could not compress '{source}': {e}")
+            return
+
+        with self._lock:
+            segment['file'] = os.path.basename(target)
+            segment['compression'] = self.compress
+            segment['bytes'] = os.path.getsize(target)
+            self._save_manifest()
+        os.remove(source)
+
+    def _save_manifest(self):
+        """Replace manifest.json atomically (lock must be held)."""
+        path = os.path.join(self.folder, MANIFEST_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(temp_path, path)
+        self._dirty = False
+
+    def flush(self, only_if_due=False):
+        """
+        Write buffered rows to disk and update the manifest.
+
+        Args:
+            only_if_due (bool): Only flush if the flush interval has passed
+        """
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush(only_if_due=only_if_due)
+            if self._dirty:
+                self._save_manifest()
+
+    def close(self):
+        """
+        Flush remaining rows, close the active segment (it is continued by
+        the next run in the same period) and wait for compressions.
+        """
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._segment['bytes'] = self._segment_size()
+                self._writer = None
+                self._segment = None
+                self._dirty = True
+            if self._dirty:
+                self._save_manifest()
+            compressor, self._compressor = self._compressor, None
+
+        # Outside the lock: compression jobs take it to update the manifest
+        if compressor is not None:
+            compressor.shutdown(wait=True)
@@ -0,0 +1,296 @@
+"""
+Buffered CSV Writer
+===================
+Persistent, buffered CSV writers used by the CSV version.
+
+Opening a file, checking for headers and building a DictWriter for every
+single save is slow when saving often. Instead, each output file gets one
+CsvWriter that:
+
+- keeps the file handle open and remembers the header
+- buffers rows and flushes them when enough rows are waiting, when the
+  flush interval has passed, or at shutdown
+- checks every row against the file's header, so a change in columns
+  raises an error instead of silently misaligning the data
+- calls back once a save's rows are actually written (not just buffered),
+  so callers only treat them as saved when they are in the file
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import csv
+import os
+import threading
+import time
+
+from records import RecordBatch, is_record, iter_values, row_values
+
+
+# When to call os.fsync() so data survives a power loss
+FSYNC_POLICIES = ('never', 'flush', 'close')
+
+
+class SchemaMismatchError(ValueError):
+    """Raised when a row's columns don't match the CSV file's header."""
+
+
+class CsvWriter:
+    """
+    Buffered writer for one CSV file. Safe to use from multiple threads.
+    """
+
+    def __init__(self, path, flush_rows=500, flush_interval=2.0, fsync='close'):
+        """
+        Initialize the writer (the file is opened on the first write).
+
+        Args:
+            path (str): Path of the CSV file
+            flush_rows (int): Flush once this many rows are buffered
+            flush_interval (float): Flush rows older than this many seconds
+            fsync (str): 'never', 'flush' (after every flush) or 'close'
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got '{fsync}'")
+
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self.header = None
+        self._header_keys = None
+        self._header_fields = None
+        self._file = None
+        self._writer = None
+        self._buffer = []
+        self._on_flushed = []  # Callbacks of the buffered saves
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _open(self, fieldnames):
+        """Open the file and load (or write) its header (lock must be held)."""
+        header = None
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, newline='', encoding='utf-8') as existing:
+                header = next(csv.reader(existing), None)
+
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+
+        if header is None:
+            # New file: the first row decides the column order
+            header = list(fieldnames)
+            self._writer.writerow(header)
+
+        self.header = header
+        self._header_keys = set(header)
+        self._header_fields = tuple(header)
+
+    def write_rows(self, rows, on_flushed=None):
+        """
+        Buffer rows for writing.
+
+        Args:
+            rows (list or RecordBatch): Records or dicts (fields must match
+                the file's header)
+            on_flushed (callable): Called without arguments once the rows
+                are written to the file (possibly from the background flusher)
+
+        Raises:
+            SchemaMismatchError: If a row has different columns than the file
+        """
+        flushed = []
+        with self._lock:
+            if isinstance(rows, RecordBatch):
+                # All records of a batch share one type: check it once
+                if self._file is None:
+                    self._open(rows.fields)
+                self._check_columns(rows.fields)
+                converted = list(iter_values(rows, self._header_fields))
+            else:
+                if self._file is None:
+                    first = rows[0]
+                    self._open(first._fields if is_record(first) else first.keys())
+
+                converted = []
+                checked_fields = None
+                for row in rows:
+                    if is_record(row):
+                        # Records of one type share their _fields tuple
+                        if row._fields is not checked_fields:
+                            self._check_columns(row._fields)
+                            checked_fields = row._fields
+                    elif row.keys() != self._header_keys:
+                        self._check_columns(row.keys())
+                    converted.append(row_values(row, self._header_fields))
+
+            self._buffer.extend(converted)
+            if on_flushed is not None:
+                self._on_flushed.append(on_flushed)
+
+            if (len(self._buffer) >= self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                flushed = self._flush()
+
+        # Outside the lock: callbacks may take their own locks
+        self._run_callbacks(flushed)
+
+    def _check_columns(self, columns):
+        """Raise SchemaMismatchError unless the columns match the header."""
+        keys = set(columns)
+        if keys != self._header_keys:
+            missing = sorted(self._header_keys - keys)
+            extra = sorted(keys - self._header_keys)
+            raise SchemaMismatchError(
+                f"Columns don't match header of '{self.path}' "
+                f"(missing: {missing}, unexpected: {extra})"
+            )
+
+    def _flush(self):
+        """
+        Write buffered rows to disk (lock must be held).
+
+        Returns:
+            list: on_flushed callbacks of the rows just written, to be run
+                with _run_callbacks once the lock is released
+        """
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self._buffer = []
+
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync == 'flush':
+                os.fsync(self._file.fileno())
+
+        self._last_flush = time.monotonic()
+        flushed, self._on_flushed = self._on_flushed, []
+        return flushed
+
+    def _run_callbacks(self, callbacks):
+        """Run on_flushed callbacks; an error in one doesn't stop the others."""
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Error after writing rows to '{self.path}': {e}")
+
+    def flush(self, only_if_due=False):
+        """
+        Write buffered rows to disk.
+
+        Args:
+            only_if_due (bool): Only flush if the flush interval has passed
+        """
+        with self._lock:
+            if only_if_due and time.monotonic() - self._last_flush < self.flush_interval:
+                return
+            flushed = self._flush()
+        self._run_callbacks(flushed)
+
+    def close(self):
+        """Flush remaining rows and close the file."""
+        with self._lock:
+            if self._file is None:
+                return
+            flushed = self._flush()
+            if self.fsync != 'never':
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+            self._writer = None
+        self._run_callbacks(flushed)
+
+
+class CsvWriterPool:
+    """
+    One CsvWriter per file in a folder, plus a background thread that
+    flushes rows that have waited longer than the flush interval.
+    """
+
+    def __init__(self, folder, flush_rows=500, flush_interval=2.0, fsync='close',
+                 writer_factory=CsvWriter):
+        """
+        Initialize the pool.
+
+        Args:
+            folder (str): Folder containing the CSV files
+            flush_rows (int): Flush once this many rows are buffered
+            flush_interval (float): Flush rows older than this many seconds
+            fsync (str): 'never', 'flush' (after every flush) or 'close'
+            writer_factory (callable): Writer class, called like CsvWriter
+                (e.g. a configured RotatingCsvWriter, see csv_rotation.py)
+        """
+        self.folder = folder
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.writer_factory = writer_factory
+
+        self._writers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def get(self, filename):
+        """
+        Get the writer for a file, creating it on first use.
+
+        Args:
+            filename (str): CSV file name inside the folder
+
+        Returns:
+            CsvWriter: The file's writer (or the writer_factory's)
+        """
+        with self._lock:
+            writer = self._writers.get(filename)
+            if writer is None:
+                writer = self.writer_factory(
+                    os.path.join(self.folder, filename),
+                    flush_rows=self.flush_rows,
+                    flush_interval=self.flush_interval,
+                    fsync=self.fsync
+                )
+                self._writers[filename] = writer
+
+            if self._flusher is None:
+                self._stop = threading.Event()
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, args=(self._stop,), daemon=True
+                )
+                self._flusher.start()
+
+            return writer
+
+    def _flush_loop(self, stop):
+        """
+        Background loop flushing writers whose interval has passed. A failed
+        flush is reported and retried next time (the rows stay buffered);
+        it must not end the loop.
+        """
+        while not stop.wait(self.flush_interval):
+            with self._lock:
+                writers = list(self._writers.values())
+            for writer in writers:
+                try:
+                    writer.flush(only_if_due=True)
+                except Exception as e:
+                    print(f"❌ Error flushing '{writer.path}': {e}")
+
+    def flush(self):
+        """Flush every writer now."""
+        with self._lock:
+            writers = list(self._writers.values())
+        for writer in writers:
+            writer.flush()
+
+    def close(self):
+        """Stop the background flusher and close every writer."""
+        with self._lock:
+            self._stop.set()
+            self._flusher = None
+            writers = list(self._writers.values())
+            self._writers.clear()
+        for writer in writers:
+            writer.close()
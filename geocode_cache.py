@@ -0,0 +1,184 @@
+"""
+Geocode Cache
+=============
+Persistent cache of city coordinates shared by the CSV and Google Sheets
+versions. City coordinates never change, so after the first lookup we can
+skip the geocoding API entirely.
+
+Lookups go through a small in-process LRU first, then an SQLite file on disk.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_city(city):
+    """
+    Normalize a city name so "new york", " New  York " and "NEW YORK"
+    share one cache entry.
+
+    Args:
+        city (str): City name as typed by the user
+
+    Returns:
+        str: Normalized cache key
+    """
+    return " ".join(city.split()).casefold()
+
+
+class GeocodeCache:
+    """
+    Two-level (memory + SQLite) cache mapping city names to coordinates.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, path, max_entries=1024, ttl=None):
+        """
+        Initialize the geocode cache.
+
+        Args:
+            path (str): Path of the SQLite cache file
+            max_entries (int): Size of the in-memory LRU
+            ttl (float): Seconds before an entry expires (None = never)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " city TEXT PRIMARY KEY,"
+            " latitude REAL NOT NULL,"
+            " longitude REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _expired(self, updated_at):
+        """Check whether an entry written at `updated_at` is past its TTL."""
+        return self.ttl is not None and time.time() - updated_at > self.ttl
+
+    def _remember(self, key, entry):
+        """Put an entry in the in-memory LRU, evicting the oldest if full."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, city):
+        """
+        Look up the coordinates of a city.
+
+        Args:
+            city (str): City name
+
+        Returns:
+            tuple: (latitude, longitude) or None on a cache miss
+        """
+        key = normalize_city(city)
+
+        with self._lock:
+            entry = self._memory.get(key)
+
+            if entry is None:
+                row = self._db.execute(
+                    "SELECT latitude, longitude, updated_at FROM geocode WHERE city = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = row
+                    self._remember(key, entry)
+            else:
+                self._memory.move_to_end(key)
+
+            if entry is not None and self._expired(entry[2]):
+                self._delete(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def set(self, city, latitude, longitude):
+        """
+        Store the coordinates of a city.
+
+        Args:
+            city (str): City name
+            latitude (float): Latitude
+            longitude (float): Longitude
+        """
+        key = normalize_city(city)
+        entry = (latitude, longitude, time.time())
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geocode (city, latitude, longitude, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key,) + entry
+            )
+            self._db.commit()
+            self._remember(key, entry)
+
+    def _delete(self, key):
+        """Remove one entry from memory and disk (lock must be held)."""
+        self._memory.pop(key, None)
+        self._db.execute("DELETE FROM geocode WHERE city = ?", (key,))
+        self._db.commit()
+
+    def invalidate(self, city=None):
+        """
+        Remove a city from the cache, or clear the whole cache.
+
+        Args:
+            city (str): City to forget (None clears everything)
+        """
+        with self._lock:
+            if city is None:
+                self._memory.clear()
+                self._db.execute("DELETE FROM geocode")
+                self._db.commit()
+            else:
+                self._delete(normalize_city(city))
+
+    def stats(self):
+        """
+        Get cache hit/miss counters.
+
+        Returns:
+            dict: hits, misses, hit_rate and number of entries on disk
+        """
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': size
+        }
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,273 @@
+"""
+HTTP Client
+===========
+Shared HTTP client used by every fetcher in the CSV and Google Sheets
+versions.
+
+- One pooled requests.Session, so connections (TCP + TLS) are reused
+- Automatic retries with exponential backoff and jitter on 429/5xx
+  responses and network errors, honoring the Retry-After header
+- Separate connect/read timeouts for each API host
+- Optional response cache with conditional (ETag / Last-Modified) requests
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from metrics import NULL_METRICS
+from response_cache import cache_key
+
+
+# Status codes worth retrying: rate limited or temporary server problems
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# (connect timeout, read timeout) in seconds, per API host
+DEFAULT_TIMEOUTS = {
+    'geocoding-api.open-meteo.com': (3.05, 10),
+    'api.open-meteo.com': (3.05, 20),
+    'api.coingecko.com': (3.05, 15),
+    'newsapi.org': (3.05, 15),
+}
+DEFAULT_TIMEOUT = (5, 10)
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header (either seconds or an HTTP date).
+
+    Args:
+        value (str): Header value
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing/invalid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with retry/backoff and per-host timeouts.
+    Safe to share between the worker threads of one assistant.
+    """
+
+    def __init__(self, pool_size=10, max_retries=3, backoff_base=0.5, backoff_max=30,
+                 timeouts=None, rate_limiter=None, session=None, cache=None, metrics=None):
+        """
+        Initialize the HTTP client.
+
+        Args:
+            pool_size (int): Max keep-alive connections per host
+            max_retries (int): Retries after the first attempt (0 disables retrying)
+            backoff_base (float): First backoff delay in seconds (doubles each retry)
+            backoff_max (float): Upper bound for any single wait, including Retry-After
+            timeouts (dict): Extra {host: (connect, read)} timeouts
+            rate_limiter (RateLimiter): Optional limiter consulted before every request
+                and told the status of every response
+            session (requests.Session): Custom session/transport (default: a new pooled one)
+            cache (ResponseCache): Optional cache for successful responses
+            metrics (Metrics): Records the duration, status and retries of
+                every request (default: disabled)
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics or NULL_METRICS
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self.session = session
+
+    def timeout_for(self, url):
+        """
+        Get the (connect, read) timeout for a URL's host.
+
+        Args:
+            url (str): Request URL
+
+        Returns:
+            tuple: (connect timeout, read timeout) in seconds
+        """
+        return self.timeouts.get(urlparse(url).hostname, DEFAULT_TIMEOUT)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retry number `attempt` (0-based). Also used
+        by clients that retry their own requests (e.g. the Sheets API
+        client), so every retry follows the same policy.
+
+        Args:
+            attempt (int): Number of retries already made
+            retry_after (float): Delay the server asked for, if any
+
+        Returns:
+            float: Seconds to sleep
+        """
+        if retry_after is not None:
+            # The server told us how long to wait; add a little jitter so
+            # parallel workers don't all retry at the same instant
+            return min(self.backoff_max, retry_after + random.uniform(0, self.backoff_base))
+
+        # Exponential backoff with "full jitter"
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url, params=None, **kwargs):
+        """
+        Send a GET request, retrying transient failures.
+
+        When a cache is configured, fresh cached responses are returned
+        without touching the network, and stale ones are revalidated with
+        If-None-Match / If-Modified-Since. Streamed responses (stream=True)
+        are not stored, since that would mean reading the whole body.
+
+        Args:
+            url (str): Request URL
+            params (dict): Query string parameters
+            **kwargs: Extra arguments passed to requests (e.g. headers)
+
+        Returns:
+            requests.Response: The last response received (call
+                raise_for_status() on it as usual). Its `from_cache`
+                attribute tells whether the body came from the cache, and
+                `requests_sent` how many requests were actually sent for it
+                (0 for a fresh cache hit; retries and 304 revalidations count).
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails
+                with a network error after all retries
+        """
+        if self.cache is None:
+            response = self._send(url, params, **kwargs)
+            response.from_cache = False
+            return response
+
+        key = cache_key(url, params)
+        entry, fresh = self.cache.lookup(key)
+
+        if fresh:
+            self.metrics.inc('http_cache_hits_total', host=urlparse(url).netloc)
+            return self._cached_response(url, entry, requests_sent=0)
+
+        if kwargs.get('stream'):
+            response = self._send(url, params, **kwargs)
+            response.from_cache = False
+            return response
+
+        if entry is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            kwargs['headers'] = headers
+
+        response = self._send(url, params, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            refreshed = self.cache.refresh(key, url, response.headers)
+            return self._cached_response(url, refreshed or entry, response.requests_sent)
+
+        if response.status_code == 200:
+            self.cache.store(key, url, response.headers, response.content)
+
+        response.from_cache = False
+        return response
+
+    @staticmethod
+    def _cached_response(url, entry, requests_sent):
+        """Build a requests.Response from a cache entry."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.from_cache = True
+        response.requests_sent = requests_sent
+        return response
+
+    def _send(self, url, params=None, **kwargs):
+        """Send a GET request with retries (no caching)."""
+        kwargs.setdefault('timeout', self.timeout_for(url))
+        metrics = self.metrics
+        host = urlparse(url).netloc if metrics.enabled else None
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if metrics.enabled:
+                    self._record(host, type(e).__name__, start, attempt)
+                if attempt >= self.max_retries:
+                    raise
+                metrics.inc('http_retries_total', host=host, reason=type(e).__name__)
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+
+            if metrics.enabled:
+                self._record(host, response.status_code, start, attempt)
+
+            retry_after = None
+            if response.status_code in RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if self.rate_limiter is not None:
+                # Let the limiter speed up again, or back off on 429s
+                self.rate_limiter.feedback(url, response.status_code, retry_after)
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                response.requests_sent = attempt + 1
+                return response
+
+            metrics.inc('http_retries_total', host=host, reason=response.status_code)
+            response.close()
+            time.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+
+    def _record(self, host, status, start, attempt):
+        """Record the metrics and log event of one request attempt."""
+        seconds = time.perf_counter() - start
+        self.metrics.observe('http_request_seconds', seconds, host=host)
+        self.metrics.inc('http_requests_total', host=host, status=status)
+        self.metrics.event('http_request', host=host, status=status,
+                           seconds=round(seconds, 4), attempt=attempt)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
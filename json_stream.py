@@ -0,0 +1,150 @@
+"""
+JSON Streaming
+==============
+Incremental parsing of large API responses, for both the CSV and Google
+Sheets versions.
+
+response.json() reads the whole body and builds the complete object tree
+before the fetchers pick out a few fields. With streaming enabled, the
+body is read in chunks (response.iter_content) and parsed with ijson, so
+records are built one at a time and the full object tree (dicts and
+strings for every field, used or not) is never built. The fetchers still
+collect all records of a response before saving them, but only as compact
+records/RecordBatch columns, so peak memory is that result plus the one
+item being parsed, not the raw response body and its parsed tree.
+
+Without ijson (or with stream=False) the same functions fall back to
+response.json(), so callers have a single code path.
+
+Requires ijson for streaming (pip install ijson).
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import io
+
+try:
+    import ijson
+except ImportError:  # ijson is optional
+    ijson = None
+
+from serialization import response_json
+
+
+CHUNK_SIZE = 64 * 1024
+
+_START_EVENTS = ('start_map', 'start_array')
+_END_EVENTS = ('end_map', 'end_array')
+_SCALAR_EVENTS = ('string', 'number', 'boolean', 'null')
+
+
+def streaming_available():
+    """Check whether ijson is installed."""
+    return ijson is not None
+
+
+class _ContentReader(io.RawIOBase):
+    """Read-only file object over response.iter_content()."""
+
+    def __init__(self, response):
+        self._chunks = response.iter_content(CHUNK_SIZE)
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b''
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _body(response):
+    """File object for a response body (streamed from the socket when possible)."""
+    if getattr(response, 'from_cache', False) or response.raw is None:
+        # Cached responses already hold their body in memory
+        return io.BytesIO(response.content)
+    return io.BufferedReader(_ContentReader(response), CHUNK_SIZE)
+
+
+def _lookup(data, prefix):
+    """Yield the values at an ijson-style prefix of an already parsed object."""
+    values = [data]
+    for part in prefix.split('.') if prefix else []:
+        if part == 'item':
+            values = [item for value in values if isinstance(value, list) for item in value]
+        else:
+            values = [value[part] for value in values if isinstance(value, dict) and part in value]
+    return iter(values)
+
+
+def iter_items(response, prefix, fields=None, stream=True):
+    """
+    Yield the JSON values found at `prefix`, one at a time.
+
+    Prefixes use ijson's notation: "item" is every element of a top-level
+    array, "articles.item" every element of the "articles" array.
+
+    Args:
+        response (requests.Response): Response (ideally sent with stream=True)
+        prefix (str): Location of the values to yield
+        fields (dict): If given, filled with the top-level scalar values
+            (e.g. "status"); complete once the generator is exhausted
+        stream (bool): Parse incrementally (falls back to response.json()
+            if False or if ijson isn't installed)
+
+    Yields:
+        The parsed values (dicts, lists or scalars)
+    """
+    if not stream or ijson is None:
+        data = response_json(response)
+        if fields is not None and isinstance(data, dict):
+            fields.update((k, v) for k, v in data.items() if not isinstance(v, (dict, list)))
+        yield from _lookup(data, prefix)
+        return
+
+    events = ijson.parse(_body(response), use_float=True)
+    for path, event, value in events:
+        if path == prefix and event in _START_EVENTS:
+            # Build just this value, then hand it out
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+            while depth:
+                path, event, value = next(events)
+                builder.event(event, value)
+                if event in _START_EVENTS:
+                    depth += 1
+                elif event in _END_EVENTS:
+                    depth -= 1
+            yield builder.value
+        elif path == prefix and event in _SCALAR_EVENTS:
+            yield value
+        elif fields is not None and event in _SCALAR_EVENTS and path and '.' not in path:
+            fields[path] = value
+
+
+def iter_kvitems(response, stream=True):
+    """
+    Yield the (key, value) pairs of a top-level JSON object, one at a time.
+
+    Args:
+        response (requests.Response): Response (ideally sent with stream=True)
+        stream (bool): Parse incrementally (falls back to response.json()
+            if False or if ijson isn't installed)
+
+    Yields:
+        tuple: (key, parsed value)
+    """
+    if not stream or ijson is None:
+        yield from response_json(response).items()
+        return
+
+    yield from ijson.kvitems(_body(response), '', use_float=True)
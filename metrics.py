@@ -0,0 +1,420 @@
+"""
+Metrics and Tracing
+===================
+Counters, timers and spans for the CSV and Google Sheets versions, so a
+long-running deployment can see which API is slow, how often requests
+are retried and how long saves take.
+
+- Every HTTP attempt (HttpClient) and every Sheets API call is timed and
+  counted per host and status; retries and cache hits are counted too
+- Every save (save_to_csv / save_to_sheet / flush) is timed per target
+- Every automation run is a span with its duration and outcome
+
+Metrics can be exported as a Prometheus textfile (for node_exporter's
+textfile collector), sent through the OpenTelemetry API (if installed)
+and/or logged as one JSON object per line:
+
+    {"ts": "2025-01-01T12:00:00Z", "event": "http_request", "host": "api.coingecko.com", ...}
+
+Instrumentation is off by default: the assistants then use NULL_METRICS,
+whose methods do nothing, so the cost is one no-op call per request.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+
+NAMESPACE = 'automation'
+
+# Histogram bucket bounds in seconds (Prometheus defaults plus 30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Help text of the metrics recorded by the assistants
+HELP = {
+    'http_requests_total': 'HTTP requests sent (one per attempt), by host and status',
+    'http_request_seconds': 'Duration of HTTP requests, by host',
+    'http_retries_total': 'HTTP requests retried, by host and reason',
+    'http_cache_hits_total': 'Requests answered from the response cache, by host',
+    'saves_total': 'Saves, by target and status',
+    'saved_rows_total': 'Rows saved, by target',
+    'save_seconds': 'Duration of saves, by target',
+    'runs_total': 'Automation runs, by automation and status',
+    'run_seconds': 'Duration of automation runs, by automation',
+    'spooled_rows_total': 'Rows spooled to disk because a Google Sheets write failed',
+    'replayed_rows_total': 'Spooled rows written to Google Sheets',
+    'spool_dropped_rows_total': 'Spooled rows dropped to keep the spool within its size limit',
+    'duplicate_rows_skipped_total': 'Rows not written again because their ID was already in the sheet',
+    'spool_dead_letter_rows_total': 'Spooled rows Google Sheets rejected for good, moved to the dead-letter file',
+    'spool_rows': 'Rows waiting in the Google Sheets spool',
+    'spool_bytes': 'Disk space used by the Google Sheets spool',
+    'spool_oldest_seconds': 'Age of the oldest row waiting in the Google Sheets spool',
+}
+
+_logger = logging.getLogger(NAMESPACE)
+
+_NULL_CONTEXT = nullcontext()
+
+
+def _escape(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels, extra=None):
+    """Format a label tuple as {a="1",b="2"} (empty string without labels)."""
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value):
+    """Format a sample value the way Prometheus expects."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and histograms, with optional
+    Prometheus textfile, OpenTelemetry and JSON log output.
+    """
+
+    enabled = True
+
+    def __init__(self, textfile=None, json_logs=False, otel=False, buckets=DEFAULT_BUCKETS,
+                 namespace=NAMESPACE):
+        """
+        Initialize the registry.
+
+        Args:
+            textfile (str): Write Prometheus metrics to this file after
+                every automation run and on close (e.g. for node_exporter)
+            json_logs (bool): Log every event as a JSON line (logger "automation",
+                stderr unless the application configured handlers)
+            otel (bool): Also record metrics and spans through the
+                OpenTelemetry API (needs opentelemetry-api)
+            buckets (tuple): Histogram bucket bounds in seconds
+            namespace (str): Prefix of every metric name
+        """
+        self.textfile = textfile
+        self.json_logs = json_logs
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+        if json_logs and not _logger.handlers:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+
+        self._meter = None
+        self._tracer = None
+        self._instruments = {}
+        if otel:
+            # Imported only when asked for, to keep start-up fast
+            try:
+                from opentelemetry import metrics as otel_metrics
+                from opentelemetry import trace as otel_trace
+            except ImportError:  # OpenTelemetry is optional
+                print("⚠️  opentelemetry-api is not installed, OpenTelemetry export disabled")
+            else:
+                self._meter = otel_metrics.get_meter(namespace)
+                self._tracer = otel_trace.get_tracer(namespace)
+
+    def inc(self, name, value=1, **labels):
+        """
+        Increase a counter.
+
+        Args:
+            name (str): Metric name without namespace, ending in _total
+            value (float): Amount to add
+            **labels: Label values (e.g. host="api.coingecko.com")
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+        if self._meter is not None:
+            self._instrument(name, 'counter').add(value, attributes=labels)
+
+    def set(self, name, value, **labels):
+        """
+        Set a gauge (a value that can go up and down, e.g. a queue size).
+
+        Args:
+            name (str): Metric name without namespace
+            value (float): Current value
+            **labels: Label values
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+        if self._meter is not None:
+            self._instrument(name, 'gauge').set(value, attributes=labels)
+
+    def observe(self, name, seconds, **labels):
+        """
+        Record a duration in a histogram.
+
+        Args:
+            name (str): Metric name without namespace, ending in _seconds
+            seconds (float): Observed duration
+            **labels: Label values
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # Per-bucket counts (last one is +Inf), then sum and count
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+        if self._meter is not None:
+            self._instrument(name, 'histogram').record(seconds, attributes=labels)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """
+        Time a block of code into a histogram.
+
+        Args:
+            name (str): Histogram name
+            **labels: Label values
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def span(self, automation, **attributes):
+        """
+        Trace one automation run: logs its start and end, records
+        run_seconds / runs_total and opens an OpenTelemetry span.
+
+        Args:
+            automation (str): Automation name (e.g. "weather")
+            **attributes: Extra fields for the log events and span
+        """
+        self.event('run_started', automation=automation, **attributes)
+        context = (self._tracer.start_as_current_span(f"{automation}_automation", attributes=attributes)
+                   if self._tracer is not None else _NULL_CONTEXT)
+        status = 'error'
+        start = time.perf_counter()
+        try:
+            with context:
+                yield
+            status = 'ok'
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe('run_seconds', seconds, automation=automation)
+            self.inc('runs_total', automation=automation, status=status)
+            self.event('run_finished', automation=automation, status=status,
+                       seconds=round(seconds, 4), **attributes)
+            if self.textfile:
+                self.write_textfile()
+
+    def event(self, name, **fields):
+        """
+        Log a structured event (only with json_logs=True).
+
+        Args:
+            name (str): Event name (e.g. "http_request")
+            **fields: JSON-serializable event fields
+        """
+        if not self.json_logs:
+            return
+        record = {
+            'ts': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'event': name,
+            **fields
+        }
+        _logger.info(json.dumps(record, default=str))
+
+    def _instrument(self, name, kind):
+        """Get (or create) the OpenTelemetry instrument for a metric."""
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            full_name = f"{self.namespace}_{name}"
+            if kind == 'counter':
+                instrument = self._meter.create_counter(full_name, description=HELP.get(name, ''))
+            elif kind == 'gauge':
+                instrument = self._meter.create_gauge(full_name, description=HELP.get(name, ''))
+            else:
+                instrument = self._meter.create_histogram(full_name, unit='s',
+                                                          description=HELP.get(name, ''))
+            self._instruments[name] = instrument
+        return instrument
+
+    def snapshot(self):
+        """
+        Get the current values.
+
+        Returns:
+            dict: counters and gauges {(name, labels): value} and
+                histograms {(name, labels): (sum, count)}
+        """
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'histograms': {key: (value[1], value[2]) for key, value in self._histograms.items()}
+            }
+
+    def render_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, (list(value[0]), value[1], value[2]))
+                                for key, value in self._histograms.items())
+
+        lines = []
+        last_name = None
+        for (name, labels), value in counters:
+            full_name = f"{self.namespace}_{name}"
+            if name != last_name:
+                lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} counter")
+                last_name = name
+            lines.append(f"{full_name}{_label_text(labels)} {_number(value)}")
+
+        for (name, labels), value in gauges:
+            full_name = f"{self.namespace}_{name}"
+            if name != last_name:
+                lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} gauge")
+                last_name = name
+            lines.append(f"{full_name}{_label_text(labels)} {_number(value)}")
+
+        bounds = self.buckets + (float('inf'),)
+        for (name, labels), (counts, total, count) in histograms:
+            full_name = f"{self.namespace}_{name}"
+            if name != last_name:
+                lines.append(f"# HELP {full_name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full_name} histogram")
+                last_name = name
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                lines.append(f"{full_name}_bucket{_label_text(labels, ('le', _number(bound)))} "
+                             f"{cumulative}")
+            lines.append(f"{full_name}_sum{_label_text(labels)} {_number(total)}")
+            lines.append(f"{full_name}_count{_label_text(labels)} {count}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path=None):
+        """
+        Write the metrics to a Prometheus textfile.
+        The file is replaced atomically, so scrapers never see half a file.
+
+        Args:
+            path (str): Output path (default: the textfile given at init)
+        """
+        path = path or self.textfile
+        if not path:
+            return
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus())
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write metrics to '{path}': {e}")
+
+    def close(self):
+        """Write the final textfile."""
+        if self.textfile:
+            self.write_textfile()
+
+
+class NullMetrics:
+    """Drop-in replacement for Metrics that records nothing."""
+
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def set(self, name, value, **labels):
+        pass
+
+    def observe(self, name, seconds, **labels):
+        pass
+
+    def timer(self, name, **labels):
+        return _NULL_CONTEXT
+
+    def span(self, automation, **attributes):
+        return _NULL_CONTEXT
+
+    def event(self, name, **fields):
+        pass
+
+    def write_textfile(self, path=None):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+def add_metrics_arguments(parser):
+    """
+    Add the metrics command line options to an argparse parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+    """
+    parser.add_argument('--metrics-file', default=None,
+                        help='Write Prometheus metrics to this textfile after every run')
+    parser.add_argument('--json-logs', action='store_true',
+                        help='Log requests, saves and runs as JSON lines on stderr')
+    parser.add_argument('--otel', action='store_true',
+                        help='Export metrics and spans through OpenTelemetry (needs opentelemetry-api)')
+
+
+def metrics_from_args(args):
+    """
+    Create the metrics registry selected on the command line.
+
+    Args:
+        args (argparse.Namespace): Parsed options from add_metrics_arguments()
+
+    Returns:
+        Metrics or NullMetrics: NULL_METRICS if no output was requested
+    """
+    if not (args.metrics_file or args.json_logs or args.otel):
+        return NULL_METRICS
+    return Metrics(textfile=args.metrics_file, json_logs=args.json_logs, otel=args.otel)
@@ -0,0 +1,352 @@
+"""
+Mock API Server
+===============
+A local stand-in for every API the assistants talk to, used by the
+benchmark suite (benchmark.py) so runs are fast, repeatable and don't
+use real quotas.
+
+Mimics:
+
+- Open-Meteo geocoding (/v1/search) and forecast (/v1/forecast)
+- CoinGecko simple/price
+- NewsAPI top-headlines (paged, with new articles on every call)
+- Google Sheets v4: spreadsheets.get, values.batchGet, values.append
+  and spreadsheets.batchUpdate (addSheet / appendCells)
+
+Requests are routed by the original host as the first path segment,
+e.g. http://127.0.0.1:8765/api.coingecko.com/api/v3/simple/price.
+mock_session() returns a requests.Session that rewrites the real URLs
+this way, so the assistants run unchanged.
+
+Latency and error rate are configurable; errors are returned as HTTP
+503, which the HttpClient retries like a real outage.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def _coordinate(text, span):
+    """Deterministic pseudo-random coordinate for a name."""
+    digest = hashlib.md5(text.encode('utf-8')).digest()
+    return round(int.from_bytes(digest[:4], 'big') / 2 ** 32 * 2 * span - span, 4)
+
+
+class MockAPIServer:
+    """
+    Threaded HTTP server faking the weather, crypto, news and Sheets APIs.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 seed=None):
+        """
+        Initialize the server (call start() to begin serving).
+
+        Args:
+            host (str): Interface to listen on
+            port (int): Port (0 picks a free one)
+            latency (float): Seconds added to every response
+            jitter (float): Up to this many random extra seconds per response
+            error_rate (float): Share of requests answered with HTTP 503 (0-1)
+            seed (int): Random seed for repeatable jitter and errors
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = {}
+        self.errors = 0
+        self.sheets = {}
+
+        self._random = random.Random(seed)
+        self._article_counter = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._handle(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                server._handle(self, json.loads(body) if body else {})
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output clean
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        """Base URL of the running server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        """Clear the call and error counters."""
+        with self._lock:
+            self.calls = {}
+            self.errors = 0
+
+    def stats(self):
+        """
+        Get the request counters.
+
+        Returns:
+            dict: calls (per endpoint) and errors (injected 503s)
+        """
+        with self._lock:
+            return {'calls': dict(self.calls), 'errors': self.errors}
+
+    def _handle(self, handler, body):
+        """Route one request to the matching fake endpoint."""
+        parts = urlsplit(handler.path)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        path = '/' + path
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        query_lists = parse_qs(parts.query)
+
+        with self._lock:
+            if host == 'sheets.googleapis.com':
+                endpoint = host + self._sheets_endpoint(path)
+            else:
+                endpoint = host + path
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0)
+            fail = self.error_rate and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+
+        if delay:
+            time.sleep(delay)
+
+        if fail:
+            return self._send(handler, 503, {'error': 'injected failure'})
+
+        try:
+            if host == 'geocoding-api.open-meteo.com':
+                payload = self._geocode(query)
+            elif host == 'api.open-meteo.com':
+                payload = self._forecast(query)
+            elif host == 'api.coingecko.com':
+                payload = self._prices(query)
+            elif host == 'newsapi.org':
+                payload = self._news(query)
+            elif host == 'sheets.googleapis.com':
+                payload = self._sheets(path, query_lists, body)
+            else:
+                return self._send(handler, 404, {'error': f'unknown host {host}'})
+        except (KeyError, ValueError) as e:
+            return self._send(handler, 400, {'error': str(e)})
+
+        self._send(handler, 200, payload)
+
+    @staticmethod
+    def _send(handler, status, payload):
+        """Write a JSON response."""
+        body = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    # --- Weather, crypto and news -------------------------------------
+
+    @staticmethod
+    def _geocode(query):
+        name = query['name']
+        return {'results': [{
+            'name': name,
+            'latitude': _coordinate(name, 80),
+            'longitude': _coordinate(name[::-1], 170)
+        }]}
+
+    def _forecast(self, query):
+        latitudes = str(query['latitude']).split(',')
+        locations = [
+            {
+                'latitude': float(lat),
+                'longitude': float(lon),
+                'current_weather': {
+                    'temperature': round(15 + self._random.uniform(-10, 10), 1),
+                    'windspeed': round(self._random.uniform(0, 30), 1),
+                    'weathercode': self._random.choice([0, 1, 2, 3, 45, 61]),
+                }
+            }
+            for lat, lon in zip(latitudes, str(query['longitude']).split(','))
+        ]
+        return locations[0] if len(locations) == 1 else locations
+
+    def _prices(self, query):
+        return {
+            coin: {
+                'usd': round(self._random.uniform(0.01, 50000), 4),
+                'usd_market_cap': round(self._random.uniform(1e6, 1e12), 2),
+                'usd_24h_change': round(self._random.uniform(-10, 10), 4),
+            }
+            for coin in query['ids'].split(',') if coin
+        }
+
+    def _news(self, query):
+        page_size = int(query.get('pageSize', 20))
+        page = int(query.get('page', 1))
+        category = query.get('category', 'general')
+        country = query.get('country', 'us')
+
+        with self._lock:
+            start = self._article_counter
+            self._article_counter += page_size
+
+        articles = [
+            {
+                'source': {'id': None, 'name': 'Mock News'},
+                'author': 'Benchmark',
+                'title': f"{category.title()} story {n}",
+                'description': 'Lorem ipsum dolor sit amet. ' * 8,
+                'url': f"https://news.example.com/{category}/{country}/{n}",
+                'publishedAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(1700000000 + n)),
+                'content': 'Lorem ipsum dolor sit amet. ' * 20,
+            }
+            for n in range(start, start + page_size)
+        ]
+        # Newest first, like the real API; three pages per feed
+        articles.reverse()
+        return {'status': 'ok', 'totalResults': page_size * 3, 'articles': articles if page <= 3 else []}
+
+    # --- Google Sheets v4 ---------------------------------------------
+
+    @staticmethod
+    def _sheets_endpoint(path):
+        """Name a Sheets call without its spreadsheet id / range."""
+        if path.endswith(':batchUpdate'):
+            return '/spreadsheets:batchUpdate'
+        if path.endswith(':batchGet'):
+            return '/values:batchGet'
+        if path.endswith(':append'):
+            return '/values:append'
+        return '/spreadsheets.get'
+
+    def _sheets(self, path, query, body):
+        """Fake the few Sheets calls the assistant makes."""
+        with self._lock:
+            if path.endswith(':batchUpdate'):
+                for request in body.get('requests', []):
+                    if 'addSheet' in request:
+                        properties = request['addSheet']['properties']
+                        self.sheets[properties['title']] = {'id': properties['sheetId'], 'rows': []}
+                    elif 'appendCells' in request:
+                        cells = request['appendCells']
+                        sheet = next(s for s in self.sheets.values() if s['id'] == cells['sheetId'])
+                        sheet['rows'].extend(
+                            [next(iter(cell.get('userEnteredValue', {'stringValue': ''}).values()))
+                             for cell in row['values']]
+                            for row in cells['rows']
+                        )
+                return {'replies': [{} for _ in body.get('requests', [])]}
+
+            if path.endswith(':batchGet'):
+                ranges = query.get('ranges', [])
+                value_ranges = []
+                for a1 in ranges:
+                    title = a1.rsplit('!', 1)[0].strip("'").replace("''", "'")
+                    rows = self.sheets.get(title, {}).get('rows', [])
+                    value_ranges.append({'range': a1, 'values': rows[:1]})
+                return {'valueRanges': value_ranges}
+
+            if path.endswith(':append'):
+                title = path.split('/values/', 1)[1].rsplit(':', 1)[0].split('!')[0].strip("'")
+                sheet = self.sheets.setdefault(title, {'id': len(self.sheets) + 1, 'rows': []})
+                sheet['rows'].extend(body.get('values', []))
+                return {'updates': {'updatedRows': len(body.get('values', []))}}
+
+            return {'sheets': [
+                {'properties': {'sheetId': sheet['id'], 'title': title}}
+                for title, sheet in self.sheets.items()
+            ]}
+
+
+class _MockAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to the mock server."""
+
+    def __init__(self, base_url, on_response=None, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.on_response = on_response
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        host = parts.netloc
+        request.url = f"{self.base_url}/{host}{parts.path}" + (f"?{parts.query}" if parts.query else '')
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        if self.on_response is not None:
+            self.on_response(host, time.perf_counter() - start, response.status_code)
+        return response
+
+
+def mock_session(base_url, on_response=None, pool_size=10):
+    """
+    Create a requests.Session whose requests all go to the mock server.
+
+    Args:
+        base_url (str): URL of a running MockAPIServer
+        on_response (callable): Called as on_response(host, seconds, status)
+            after every request (e.g. to record latencies)
+        pool_size (int): Connections kept open
+
+    Returns:
+        requests.Session: Session to pass to HttpClient(session=...)
+    """
+    session = requests.Session()
+    adapter = _MockAdapter(base_url, on_response, pool_connections=pool_size,
+                           pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the mock API server")
+    parser.add_argument('--port', type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to each response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Random extra seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests failing with 503")
+    args = parser.parse_args()
+
+    mock = MockAPIServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate)
+    print(f"✓ Mock API server listening on {mock.url} (Ctrl+C to stop)")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        mock.stop()
@@ -0,0 +1,388 @@
+"""
+News Index
+==========
+Remembers which news articles were already collected, so the CSV and
+Google Sheets versions only save new ones.
+
+- Article URLs are stored as short hashes in an SQLite set on disk
+- An in-memory Bloom filter answers "definitely new" without touching
+  the disk; only possible repeats are checked against the exact set
+- The newest publishedAt seen per (category, country) is kept as a
+  high-water mark, so paging through results can stop once it reaches
+  articles that were already collected
+- Per-feed yield (how often a fetch finds new articles) and a daily
+  request counter let many feeds share NewsAPI's daily quota: feeds
+  that keep producing new articles are fetched first, ones that rarely
+  do are only retried now and then
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def article_key(url):
+    """
+    Hash an article URL (or title, if there is no URL) to a compact key.
+
+    Args:
+        url (str): Article URL
+
+    Returns:
+        bytes: 8-byte key
+    """
+    return hashlib.blake2b(url.strip().encode('utf-8'), digest_size=8).digest()
+
+
+def parse_feeds(text):
+    """
+    Parse a "category:country" list, e.g. "technology:us,business:gb".
+    A missing country defaults to "us".
+
+    Args:
+        text (str): Comma-separated feeds
+
+    Returns:
+        list: (category, country) tuples
+    """
+    feeds = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        category, _, country = item.partition(':')
+        feeds.append((category.strip().lower(), (country.strip() or 'us').lower()))
+    return feeds
+
+
+def _today():
+    """Current quota day (UTC), e.g. "2026-10-16"."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set: "not in the filter" is always right,
+    "in the filter" may occasionally be wrong (false positive).
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        """
+        Initialize the filter.
+
+        Args:
+            capacity (int): Expected number of items
+            error_rate (float): Acceptable false positive rate at that size
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        """Bit positions for a key (double hashing)."""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        """Add a key (bytes) to the filter."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class NewsIndex:
+    """
+    Persistent set of seen articles plus per-feed high-water marks.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, path, bloom_capacity=100000):
+        """
+        Open (or create) the index.
+
+        Args:
+            path (str): Path of the SQLite index file
+            bloom_capacity (int): Expected number of articles (sizes the Bloom filter)
+        """
+        self.path = path
+        self.exact_checks = 0
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen_articles (key BLOB PRIMARY KEY) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS high_water_marks ("
+            " category TEXT NOT NULL,"
+            " country TEXT NOT NULL,"
+            " published_at TEXT NOT NULL,"
+            " PRIMARY KEY (category, country))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS feed_stats ("
+            " category TEXT NOT NULL,"
+            " country TEXT NOT NULL,"
+            " fetches INTEGER NOT NULL DEFAULT 0,"
+            " productive_fetches INTEGER NOT NULL DEFAULT 0,"
+            " new_articles INTEGER NOT NULL DEFAULT 0,"
+            " last_fetched REAL,"
+            " PRIMARY KEY (category, country))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS quota_usage ("
+            " day TEXT PRIMARY KEY,"
+            " used INTEGER NOT NULL DEFAULT 0,"
+            " remaining INTEGER)"
+        )
+        self._db.commit()
+
+        count = self._db.execute("SELECT COUNT(*) FROM seen_articles").fetchone()[0]
+        self._bloom = BloomFilter(capacity=max(bloom_capacity, count * 2))
+        for (key,) in self._db.execute("SELECT key FROM seen_articles"):
+            self._bloom.add(bytes(key))
+
+    def seen(self, url):
+        """
+        Check whether an article was recorded before (without recording it).
+
+        Args:
+            url (str): Article URL
+
+        Returns:
+            bool: True if add() was called for it before
+        """
+        key = article_key(url)
+
+        with self._lock:
+            if key not in self._bloom:
+                return False
+            self.exact_checks += 1
+            row = self._db.execute(
+                "SELECT 1 FROM seen_articles WHERE key = ?", (key,)
+            ).fetchone()
+            return row is not None
+
+    def add(self, url):
+        """
+        Record an article as seen.
+
+        Args:
+            url (str): Article URL
+
+        Returns:
+            bool: True if the article is new, False if it was seen before
+        """
+        key = article_key(url)
+
+        with self._lock:
+            if key in self._bloom:
+                # Possibly seen before: confirm with the exact set
+                self.exact_checks += 1
+                row = self._db.execute(
+                    "SELECT 1 FROM seen_articles WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    return False
+
+            self._db.execute("INSERT OR IGNORE INTO seen_articles (key) VALUES (?)", (key,))
+            self._db.commit()
+            self._bloom.add(key)
+            return True
+
+    def high_water_mark(self, category, country):
+        """
+        Get the newest publishedAt collected for a feed.
+
+        Args:
+            category (str): News category
+            country (str): Country code
+
+        Returns:
+            str: ISO 8601 timestamp, or None if the feed was never collected
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT published_at FROM high_water_marks WHERE category = ? AND country = ?",
+                (category, country)
+            ).fetchone()
+        return row[0] if row else None
+
+    def update_high_water_mark(self, category, country, published_at):
+        """
+        Move a feed's high-water mark forward (never backwards).
+
+        Args:
+            category (str): News category
+            country (str): Country code
+            published_at (str): ISO 8601 timestamp of the newest article
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO high_water_marks (category, country, published_at)"
+                " VALUES (?, ?, ?)"
+                " ON CONFLICT (category, country) DO UPDATE"
+                " SET published_at = MAX(published_at, excluded.published_at)",
+                (category, country, published_at)
+            )
+            self._db.commit()
+
+    def record_fetch(self, category, country, new_articles):
+        """
+        Record the outcome of one fetch of a feed.
+
+        Args:
+            category (str): News category
+            country (str): Country code
+            new_articles (int): Number of new articles the fetch found
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO feed_stats"
+                " (category, country, fetches, productive_fetches, new_articles, last_fetched)"
+                " VALUES (?, ?, 1, ?, ?, ?)"
+                " ON CONFLICT (category, country) DO UPDATE SET"
+                " fetches = fetches + 1,"
+                " productive_fetches = productive_fetches + excluded.productive_fetches,"
+                " new_articles = new_articles + excluded.new_articles,"
+                " last_fetched = excluded.last_fetched",
+                (category, country, 1 if new_articles else 0, new_articles, time.time())
+            )
+            self._db.commit()
+
+    def plan_feeds(self, feeds, budget, min_yield=0.1, retry_after=6 * 3600):
+        """
+        Choose which feeds to fetch with the requests left in the quota.
+
+        Feeds are ordered by yield (most productive first, least recently
+        fetched on ties). Feeds below `min_yield` are skipped unless they
+        haven't been fetched for `retry_after` seconds, so they still get
+        a chance to recover.
+
+        Args:
+            feeds (list): (category, country) tuples
+            budget (int): Maximum number of feeds to fetch
+            min_yield (float): Skip feeds less productive than this
+            retry_after (float): Seconds after which a low-yield feed is retried
+
+        Returns:
+            tuple: (selected, skipped) - feeds to fetch in priority order, and
+                a list of (feed, reason) tuples for the rest
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT category, country, fetches, productive_fetches, last_fetched"
+                " FROM feed_stats"
+            ).fetchall()
+        stats = {(row[0], row[1]): row[2:] for row in rows}
+
+        now = time.time()
+        candidates, skipped = [], []
+        for feed in dict.fromkeys(feeds):
+            fetches, productive, last_fetched = stats.get(feed, (0, 0, None))
+            # Smoothed share of productive fetches (0.5 for a new feed)
+            score = (productive + 1) / (fetches + 2)
+            if (score < min_yield and last_fetched is not None
+                    and now - last_fetched < retry_after):
+                skipped.append((feed, f"low yield ({score:.0%})"))
+                continue
+            candidates.append((-score, last_fetched or 0, feed))
+
+        candidates.sort()
+        budget = max(0, budget)
+        selected = [feed for _, _, feed in candidates[:budget]]
+        skipped.extend((feed, "daily quota") for _, _, feed in candidates[budget:])
+        return selected, skipped
+
+    def count_request(self, remaining=None, count=1):
+        """
+        Count API requests against today's quota.
+
+        Args:
+            remaining (int or str): Remaining requests reported by the API, if any
+            count (int): Number of requests sent (e.g. including retries)
+        """
+        try:
+            remaining = int(remaining) if remaining is not None else None
+        except ValueError:
+            remaining = None
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO quota_usage (day, used, remaining) VALUES (?, ?, ?)"
+                " ON CONFLICT (day) DO UPDATE SET used = used + excluded.used,"
+                " remaining = COALESCE(excluded.remaining, remaining)",
+                (_today(), count, remaining)
+            )
+            self._db.commit()
+
+    def quota(self, daily_limit):
+        """
+        Get today's quota usage.
+
+        Args:
+            daily_limit (int): Requests allowed per day
+
+        Returns:
+            dict: used and remaining (the lower of the local count and
+                what the API last reported)
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT used, remaining FROM quota_usage WHERE day = ?", (_today(),)
+            ).fetchone()
+        used, reported = row or (0, None)
+        remaining = daily_limit - used
+        if reported is not None:
+            remaining = min(remaining, reported)
+        return {'used': used, 'remaining': max(0, remaining)}
+
+    def request_budget(self, daily_limit, reserve=0):
+        """
+        Get how many requests a fan-out run may use now.
+
+        What's left of today's quota is paced evenly until it resets
+        (midnight UTC): a run gets the share of it matching the time
+        passed since the previous run, so frequent runs don't use up
+        the whole quota early in the day.
+
+        Args:
+            daily_limit (int): Requests allowed per day
+            reserve (int): Requests to always leave unused
+
+        Returns:
+            int: Number of requests the run may send
+        """
+        remaining = self.quota(daily_limit)['remaining'] - reserve
+        if remaining <= 0:
+            return 0
+
+        with self._lock:
+            last_run = self._db.execute("SELECT MAX(last_fetched) FROM feed_stats").fetchone()[0]
+        if last_run is None:
+            return remaining
+
+        now = datetime.now(timezone.utc)
+        reset = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        share = min(1.0, (now.timestamp() - last_run) / (reset - now).total_seconds())
+        return max(1, math.ceil(remaining * share))
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._db.close()
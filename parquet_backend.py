@@ -0,0 +1,300 @@
+"""
+Parquet Backend
+===============
+Optional columnar storage for the CSV version.
+
+CSV files store everything as text, so every analysis has to re-parse
+numbers and timestamps. This backend keeps a typed copy of the data in
+Parquet files (via pyarrow), partitioned by date:
+
+    data/parquet/crypto_prices/date=2026-10-16/part-....parquet
+
+Each save becomes one row group. A one-shot converter migrates the CSV
+files that already exist:
+
+    python parquet_backend.py data
+
+Requires pyarrow (pip install pyarrow).
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import argparse
+import csv
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pa = None
+    pq = None
+
+from records import RecordBatch, as_dict, as_rows, iter_values
+
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _require_pyarrow():
+    """Raise a helpful error if pyarrow is not installed."""
+    if pa is None:
+        raise ImportError("The Parquet backend needs pyarrow: pip install pyarrow")
+
+
+def _schemas():
+    """Typed Arrow schemas for the built-in datasets (keyed by CSV name without .csv)."""
+    _require_pyarrow()
+    return {
+        'weather_data': pa.schema([
+            ('timestamp', pa.timestamp('s')),
+            ('city', pa.string()),
+            ('temperature_celsius', pa.float64()),
+            ('windspeed_kmh', pa.float64()),
+            ('weather_code', pa.int32()),
+            ('latitude', pa.float64()),
+            ('longitude', pa.float64()),
+        ]),
+        'crypto_prices': pa.schema([
+            ('timestamp', pa.timestamp('s')),
+            ('cryptocurrency', pa.string()),
+            ('price_usd', pa.float64()),
+            ('market_cap_usd', pa.float64()),
+            ('change_24h_percent', pa.float64()),
+        ]),
+        'latest_news': pa.schema([
+            ('timestamp', pa.timestamp('s')),
+            ('title', pa.string()),
+            ('source', pa.string()),
+            ('author', pa.string()),
+            ('published_at', pa.timestamp('s', tz='UTC')),
+            ('url', pa.string()),
+            ('description', pa.string()),
+        ]),
+    }
+
+
+def _convert(value, arrow_type):
+    """
+    Convert one value (possibly a CSV string) to the Python type for a column.
+
+    Returns:
+        The converted value, or None for empty/missing values
+    """
+    if value is None or value == '':
+        return None
+
+    if pa.types.is_timestamp(arrow_type):
+        if isinstance(value, datetime):
+            return value
+        if arrow_type.tz is not None:
+            # ISO 8601 from the APIs, e.g. "2026-10-16T09:30:00Z"
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed
+        return datetime.strptime(str(value), TIMESTAMP_FORMAT)
+
+    if pa.types.is_integer(arrow_type):
+        return int(float(value))
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    return str(value)
+
+
+def dataset_name(filename):
+    """
+    Get the dataset name for a CSV file name, e.g. "crypto_prices.csv" -> "crypto_prices".
+
+    Args:
+        filename (str): CSV file name
+
+    Returns:
+        str: Dataset name
+    """
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def to_table(dataset, rows):
+    """
+    Build a typed Arrow table from a list of records.
+
+    Args:
+        dataset (str): Dataset name (selects the schema)
+        rows (list or RecordBatch): Records or dicts (values may be strings,
+            as read from CSV)
+
+    Returns:
+        pyarrow.Table: Typed table (schema inferred for unknown datasets)
+    """
+    _require_pyarrow()
+    schema = _schemas().get(dataset)
+
+    if schema is None:
+        return pa.Table.from_pylist([as_dict(row) for row in rows])
+
+    if isinstance(rows, RecordBatch):
+        # Read the batch column by column instead of building records
+        columns = {
+            field.name: [_convert(value, field.type) for value in rows.column(field.name)]
+            for field in schema
+        }
+    else:
+        values = list(iter_values(rows, schema.names))
+        columns = {
+            field.name: [_convert(row[index], field.type) for row in values]
+            for index, field in enumerate(schema)
+        }
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+class ParquetStore:
+    """
+    Appends records to date-partitioned Parquet files.
+
+    Writers stay open while the process runs, so every save is appended as
+    a new row group. A file is finalized (and becomes readable) once it has
+    `max_row_groups` row groups, when its date is over, or on close().
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, folder, compression='zstd', max_row_groups=100):
+        """
+        Initialize the store.
+
+        Args:
+            folder (str): Root folder of the Parquet datasets
+            compression (str): Parquet compression codec
+            max_row_groups (int): Row groups per file before starting a new one
+        """
+        _require_pyarrow()
+        self.folder = folder
+        self.compression = compression
+        self.max_row_groups = max_row_groups
+        self._writers = {}
+        self._row_groups = {}
+        self._lock = threading.Lock()
+
+    def _writer(self, dataset, date, schema):
+        """Get (or open) the writer for one date partition (lock must be held)."""
+        key = (dataset, date)
+        writer = self._writers.get(key)
+
+        if writer is None:
+            # A new date means older partitions of this dataset are complete
+            for old_key in [k for k in self._writers if k[0] == dataset]:
+                self._close_writer(old_key)
+
+            partition = os.path.join(self.folder, dataset, f"date={date}")
+            os.makedirs(partition, exist_ok=True)
+
+            # Unique name per process, so concurrent runs never clash
+            filename = f"part-{int(time.time() * 1000)}-{os.getpid()}.parquet"
+            writer = pq.ParquetWriter(
+                os.path.join(partition, filename), schema, compression=self.compression
+            )
+            self._writers[key] = writer
+            self._row_groups[key] = 0
+
+        return writer
+
+    def _close_writer(self, key):
+        """Finalize one open file (lock must be held)."""
+        self._writers.pop(key).close()
+        self._row_groups.pop(key, None)
+
+    def write(self, dataset, rows):
+        """
+        Append records as one row group per date partition.
+
+        Args:
+            dataset (str): Dataset name, e.g. "crypto_prices"
+            rows (list, dict or RecordBatch): Records to append
+
+        Returns:
+            int: Number of records written
+        """
+        rows = as_rows(rows)
+        if not len(rows):
+            return 0
+
+        table = to_table(dataset, rows)
+
+        # Group rows by the date of their timestamp
+        partitions = {}
+        for index, (timestamp,) in enumerate(iter_values(rows, ('timestamp',))):
+            date = str(timestamp or '')[:10] or 'unknown'
+            partitions.setdefault(date, []).append(index)
+
+        with self._lock:
+            for date, indices in partitions.items():
+                part = table.take(pa.array(indices)) if len(partitions) > 1 else table
+                key = (dataset, date)
+                self._writer(dataset, date, table.schema).write_table(part)
+                self._row_groups[key] += 1
+                if self._row_groups[key] >= self.max_row_groups:
+                    self._close_writer(key)
+
+        return len(rows)
+
+    def close(self):
+        """Finalize every open Parquet file."""
+        with self._lock:
+            for key in list(self._writers):
+                self._close_writer(key)
+
+
+def convert_csv_folder(data_folder, output_folder=None, chunk_rows=50000):
+    """
+    One-shot migration of every CSV file in a folder to Parquet.
+
+    Args:
+        data_folder (str): Folder containing the CSV files
+        output_folder (str): Parquet root (default: <data_folder>/parquet)
+        chunk_rows (int): Rows read per row group, to keep memory bounded
+
+    Returns:
+        dict: Number of rows converted per dataset
+    """
+    output_folder = output_folder or os.path.join(data_folder, 'parquet')
+    store = ParquetStore(output_folder)
+    converted = {}
+
+    try:
+        for filename in sorted(os.listdir(data_folder)):
+            if not filename.endswith('.csv'):
+                continue
+
+            dataset = dataset_name(filename)
+            count = 0
+
+            with open(os.path.join(data_folder, filename), newline='', encoding='utf-8') as csvfile:
+                chunk = []
+                for row in csv.DictReader(csvfile):
+                    chunk.append(row)
+                    if len(chunk) >= chunk_rows:
+                        count += store.write(dataset, chunk)
+                        chunk = []
+                if chunk:
+                    count += store.write(dataset, chunk)
+
+            converted[dataset] = count
+            print(f"✓ Converted '{filename}' ({count} rows)")
+    finally:
+        store.close()
+
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert collected CSV files to Parquet")
+    parser.add_argument('data_folder', nargs='?', default='data',
+                        help="Folder containing the CSV files (default: data)")
+    parser.add_argument('--output', help="Parquet root folder (default: <data_folder>/parquet)")
+    args = parser.parse_args()
+
+    convert_csv_folder(args.data_folder, args.output)
@@ -0,0 +1,250 @@
+"""
+Records
+=======
+Typed record classes for the collected data, shared by the CSV and
+Google Sheets versions and all of their storage backends.
+
+Building one dict per row repeats every column name in every row.
+Instead, the fetchers return:
+
+- WeatherRecord / CryptoRecord / NewsRecord: lightweight NamedTuples
+  (no per-row __dict__, fields in CSV column order)
+- RecordBatch: a column-oriented list of records sharing one timestamp,
+  with numeric columns stored in compact typed arrays, for large
+  snapshots such as thousands of coin prices (a column falls back to a
+  plain list when it holds integers or missing values, so every value
+  is saved exactly as the API returned it)
+
+The sinks (CSV, Google Sheets, Parquet, SQLite) read values through
+iter_values(), which accepts records, batches and plain dicts alike, so
+custom code saving lists of dicts keeps working.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+from array import array
+from itertools import repeat
+from typing import NamedTuple, Optional
+
+
+class WeatherRecord(NamedTuple):
+    """Current weather of one city."""
+    timestamp: str
+    city: str
+    temperature_celsius: float
+    windspeed_kmh: float
+    weather_code: int
+    latitude: float
+    longitude: float
+
+
+class CryptoRecord(NamedTuple):
+    """Price of one cryptocurrency."""
+    timestamp: str
+    cryptocurrency: str
+    price_usd: float
+    market_cap_usd: float
+    change_24h_percent: float
+
+
+class NewsRecord(NamedTuple):
+    """One news article."""
+    timestamp: str
+    title: str
+    source: str
+    author: Optional[str]
+    published_at: str
+    url: Optional[str]
+    description: str
+
+
+# Annotation -> array typecode for numeric columns
+_TYPECODES = {float: 'd', int: 'q'}
+
+
+class RecordBatch:
+    """
+    Column-oriented list of records of one type that share a timestamp.
+
+    Numeric columns are stored in typed arrays (8 bytes per value) and
+    the timestamp once for the whole batch. Iterating yields records;
+    sinks that only need values can use tuples() and never build them.
+    """
+
+    def __init__(self, record_type, timestamp):
+        """
+        Initialize an empty batch.
+
+        Args:
+            record_type (type): Record class, e.g. CryptoRecord (first field: timestamp)
+            timestamp (str): Timestamp shared by every record
+        """
+        self.record_type = record_type
+        self.fields = record_type._fields
+        self.timestamp = timestamp
+        self._length = 0
+
+        annotations = record_type.__annotations__
+        self._columns = {
+            name: array(_TYPECODES[annotations[name]]) if annotations[name] in _TYPECODES else []
+            for name in self.fields[1:]
+        }
+
+    def append(self, *values):
+        """
+        Add one record.
+
+        Args:
+            *values: Field values after the timestamp, in field order
+        """
+        for name, value in zip(self.fields[1:], values):
+            column = self._columns[name]
+            if isinstance(column, array) and column.typecode == 'd' and type(value) is not float:
+                # A float array would turn integers into floats (67187 is
+                # saved as 67187.0), so keep this column as a plain list
+                column = self._columns[name] = list(column)
+            try:
+                column.append(value)
+            except TypeError:
+                # Missing numbers (e.g. a null market cap) can't go in a
+                # typed array, so keep this column as a plain list instead
+                column = self._columns[name] = list(column)
+                column.append(value)
+        self._length += 1
+
+    def extend(self, other):
+        """
+        Add every record of another batch of the same type.
+
+        Args:
+            other (RecordBatch): Batch to copy the records from
+        """
+        for name, values in other._columns.items():
+            column = self._columns[name]
+            if isinstance(column, array) and not (
+                    isinstance(values, array) and values.typecode == column.typecode):
+                # The other batch holds None values in this column
+                column = self._columns[name] = list(column)
+            column.extend(values)
+        self._length += len(other)
+
+    def column(self, name):
+        """
+        Get all values of one field.
+
+        Args:
+            name (str): Field name
+
+        Returns:
+            Sequence of values (an array for all-float and int fields)
+        """
+        if name == self.fields[0]:
+            return [self.timestamp] * self._length
+        return self._columns[name]
+
+    def tuples(self, columns=None):
+        """
+        Iterate over the records as plain value tuples.
+
+        Args:
+            columns (tuple): Field names to include, in order (default: all)
+
+        Returns:
+            iterator: One tuple per record (missing fields are None)
+        """
+        iterables = []
+        for name in columns or self.fields:
+            if name == self.fields[0]:
+                iterables.append(repeat(self.timestamp, self._length))
+            elif name in self._columns:
+                iterables.append(self._columns[name])
+            else:
+                iterables.append(repeat(None, self._length))
+        return zip(*iterables)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return map(self.record_type._make, self.tuples())
+
+    def __getitem__(self, index):
+        values = [column[index] for column in self._columns.values()]
+        return self.record_type(self.timestamp, *values)
+
+
+def is_record(value):
+    """Check whether a value is a record (NamedTuple) rather than a dict."""
+    return isinstance(value, tuple) and hasattr(value, '_fields')
+
+
+def as_rows(data):
+    """
+    Wrap a single record (or dict) in a list; lists and batches are returned as is.
+
+    Args:
+        data: A record, dict, list of them, or RecordBatch
+
+    Returns:
+        list or RecordBatch: Sized, iterable rows
+    """
+    if isinstance(data, dict) or is_record(data):
+        return [data]
+    return data
+
+
+def fields_of(rows):
+    """
+    Get the column names of some rows (from the first row).
+
+    Args:
+        rows (list or RecordBatch): Non-empty rows
+
+    Returns:
+        tuple: Field names in order
+    """
+    if isinstance(rows, RecordBatch):
+        return rows.fields
+    first = rows[0]
+    return first._fields if is_record(first) else tuple(first.keys())
+
+
+def row_values(row, columns):
+    """
+    Get one row's values in `columns` order.
+
+    Args:
+        row: Record or dict
+        columns (tuple): Field names
+
+    Returns:
+        tuple: Values (None for missing fields)
+    """
+    if is_record(row):
+        if row._fields == columns:
+            return row
+        return tuple(getattr(row, name, None) for name in columns)
+    return tuple(row.get(name) for name in columns)
+
+
+def iter_values(rows, columns):
+    """
+    Iterate over rows as value tuples in `columns` order.
+
+    Args:
+        rows (list or RecordBatch): Records, dicts or a batch
+        columns (tuple): Field names
+
+    Returns:
+        iterator: One tuple per row
+    """
+    columns = tuple(columns)
+    if isinstance(rows, RecordBatch):
+        return rows.tuples(columns)
+    return (row_values(row, columns) for row in rows)
+
+
+def as_dict(row):
+    """Convert a record to a dict (dicts are returned as is)."""
+    return row._asdict() if is_record(row) else row
@@ -0,0 +1,376 @@
+"""
+Response Cache
+==============
+HTTP response cache used by HttpClient, shared by the CSV and Google
+Sheets versions.
+
+- Honors Cache-Control (max-age, no-cache, no-store) when the API sends it
+- Falls back to a per-host TTL when it doesn't
+- Revalidates stale entries with ETag / Last-Modified (304 Not Modified
+  responses reuse the cached body instead of re-downloading it)
+- Keeps recent responses in memory and everything else in an SQLite
+  file, both bounded by size (least recently used entries are evicted)
+
+It also remembers a fingerprint of the last data saved to each output,
+so the assistants can skip writing data that did not change.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlparse
+
+from requests.structures import CaseInsensitiveDict
+
+from records import as_rows, fields_of, iter_values
+
+
+# Seconds a response stays fresh when the API sends no Cache-Control header
+DEFAULT_TTLS = {
+    'geocoding-api.open-meteo.com': 24 * 3600,
+    'api.open-meteo.com': 300,
+    'api.coingecko.com': 30,
+    'newsapi.org': 120,
+}
+DEFAULT_TTL = 60
+
+
+def cache_key(url, params=None):
+    """
+    Build a cache key for a request.
+    The key is hashed so API keys in the query string are never stored.
+
+    Args:
+        url (str): Request URL
+        params (dict): Query string parameters
+
+    Returns:
+        str: Hex digest identifying the request
+    """
+    query = urlencode(sorted((params or {}).items()))
+    return hashlib.sha256(f"{url}?{query}".encode('utf-8')).hexdigest()
+
+
+def data_fingerprint(data):
+    """
+    Fingerprint a list of records, ignoring their 'timestamp' field.
+
+    Args:
+        data (list, dict or RecordBatch): Records about to be saved
+
+    Returns:
+        str: Hex digest of the record contents
+    """
+    data = as_rows(data)
+    columns = sorted(set(fields_of(data)) - {'timestamp'}) if len(data) else []
+    rows = list(iter_values(data, columns))
+    payload = json.dumps([columns, rows], default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def parse_cache_control(value):
+    """
+    Parse a Cache-Control header into a dict of directives.
+
+    Args:
+        value (str): Header value, e.g. "public, max-age=30"
+
+    Returns:
+        dict: Directive names mapped to their value (or True)
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+class ResponseCache:
+    """
+    Two-level (memory + SQLite) cache of successful GET responses.
+    Safe to use from multiple threads.
+    """
+
+    def __init__(self, path, ttls=None, max_memory_bytes=8 * 1024 * 1024,
+                 max_disk_bytes=64 * 1024 * 1024):
+        """
+        Initialize the response cache.
+
+        Args:
+            path (str): Path of the SQLite cache file
+            ttls (dict): Extra {host: seconds} fallback TTLs
+            max_memory_bytes (int): Size limit of cached bodies kept in memory
+            max_disk_bytes (int): Size limit of cached bodies kept on disk
+        """
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " headers TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS saved_fingerprints ("
+            " name TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def _freshness(self, url, headers):
+        """
+        Work out how long a response may be served without revalidating.
+
+        Returns:
+            float: Lifetime in seconds, or None if it must not be stored
+        """
+        directives = parse_cache_control(headers.get('Cache-Control'))
+
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+
+        max_age = directives.get('s-maxage') or directives.get('max-age')
+        if max_age not in (None, True):
+            try:
+                age = float(headers.get('Age') or 0)
+                return max(0.0, float(max_age) - age)
+            except ValueError:
+                pass
+
+        return self.ttls.get(urlparse(url).hostname, DEFAULT_TTL)
+
+    def _remember(self, key, entry):
+        """Put an entry in the memory LRU, evicting old ones over the size limit."""
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old['body'])
+
+        if len(entry['body']) > self.max_memory_bytes:
+            return
+
+        self._memory[key] = entry
+        self._memory_bytes += len(entry['body'])
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted['body'])
+
+    def _evict_disk(self):
+        """Delete least recently used rows until the disk cache fits its limit."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+        ).fetchone()[0]
+
+        if total <= self.max_disk_bytes:
+            return
+
+        for key, size in self._db.execute(
+            "SELECT key, LENGTH(body) FROM responses ORDER BY last_used"
+        ).fetchall():
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._memory_bytes -= len(self._memory.pop(key, {'body': b''})['body'])
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    def _load(self, key):
+        """Get an entry from memory or disk (lock must be held)."""
+        entry = self._memory.get(key)
+
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        row = self._db.execute(
+            "SELECT headers, body, etag, last_modified, expires_at"
+            " FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        entry = {
+            'headers': json.loads(row[0]),
+            'body': bytes(row[1]),
+            'etag': row[2],
+            'last_modified': row[3],
+            'expires_at': row[4]
+        }
+        self._remember(key, entry)
+        return entry
+
+    def lookup(self, key):
+        """
+        Find a cached response.
+
+        Args:
+            key (str): Key from cache_key()
+
+        Returns:
+            tuple: (entry, fresh) - entry is a dict with 'headers', 'body',
+                'etag' and 'last_modified' (or None), fresh tells whether it
+                can be used without asking the server
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._load(key)
+
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            fresh = now < entry['expires_at']
+            if fresh:
+                self.hits += 1
+                self._db.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+                )
+                self._db.commit()
+            else:
+                self.misses += 1
+
+            return entry, fresh
+
+    def store(self, key, url, headers, body):
+        """
+        Store a 200 response (unless Cache-Control forbids it).
+
+        Args:
+            key (str): Key from cache_key()
+            url (str): Request URL (used for the per-host TTL)
+            headers (dict): Response headers
+            body (bytes): Response body
+        """
+        headers = CaseInsensitiveDict(headers)
+        lifetime = self._freshness(url, headers)
+        if lifetime is None:
+            return
+
+        now = time.time()
+        entry = {
+            'headers': dict(headers),
+            'body': body,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'expires_at': now + lifetime
+        }
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, headers, body, etag, last_modified, expires_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(entry['headers']), body, entry['etag'],
+                 entry['last_modified'], entry['expires_at'], now)
+            )
+            self._evict_disk()
+            self._db.commit()
+            self._remember(key, entry)
+
+    def refresh(self, key, url, headers):
+        """
+        Extend a cached entry after the server answered 304 Not Modified.
+
+        Args:
+            key (str): Key from cache_key()
+            url (str): Request URL
+            headers (dict): Headers of the 304 response
+
+        Returns:
+            dict: The refreshed entry, or None if it was evicted meanwhile
+        """
+        with self._lock:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            self.revalidated += 1
+
+        merged = dict(entry['headers'])
+        merged.update(headers)
+        self.store(key, url, merged, entry['body'])
+        return entry
+
+    def unchanged_since_last_save(self, name, data):
+        """
+        Check whether `data` matches what was last saved to an output.
+
+        Args:
+            name (str): Output name (CSV file name or sheet name)
+            data (list or dict): Records about to be saved
+
+        Returns:
+            bool: True if the records (ignoring timestamps) were already saved
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fingerprint FROM saved_fingerprints WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None and row[0] == data_fingerprint(data)
+
+    def mark_saved(self, name, data):
+        """
+        Remember the records that were just saved to an output.
+
+        Args:
+            name (str): Output name (CSV file name or sheet name)
+            data (list or dict): Records that were saved
+        """
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO saved_fingerprints (name, fingerprint) VALUES (?, ?)",
+                (name, data_fingerprint(data))
+            )
+            self._db.commit()
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: hits, misses, revalidated (304s) and bytes held in memory
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'memory_bytes': self._memory_bytes
+            }
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,232 @@
+"""
+Scheduler
+=========
+Long-running daemon mode shared by the CSV and Google Sheets versions.
+
+Instead of starting a fresh process from cron every minute (re-importing
+libraries and reconnecting to Google Sheets each time), the daemon keeps
+one warm assistant and runs each automation on its own interval:
+
+- Every job has its own interval and random jitter
+- Jobs run on a shared worker pool
+- A job is skipped if its previous run is still going
+- Ctrl+C / SIGTERM stops scheduling, waits for running jobs and then
+  runs the shutdown hooks (e.g. flushing pending writes)
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import random
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+
+from news_index import parse_feeds
+
+
+class Job:
+    """A named task that runs every `interval` seconds (plus jitter)."""
+
+    def __init__(self, name, func, interval, jitter=0):
+        """
+        Initialize a job.
+
+        Args:
+            name (str): Name shown in log messages
+            func (callable): Function to run (no arguments)
+            interval (float): Seconds between runs
+            jitter (float): Up to this many random seconds added to each wait
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+
+        self.next_run = time.monotonic() + random.uniform(0, jitter)
+        self.running = False
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def schedule_next(self, now):
+        """Pick the next run time, counting from `now`."""
+        self.next_run = now + self.interval + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    """
+    Runs jobs on a shared thread pool until stopped.
+    """
+
+    def __init__(self, max_workers=4):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers (int): Maximum number of jobs running at the same time
+        """
+        self.jobs = []
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._shutdown_hooks = []
+
+    def add_job(self, name, func, interval, jitter=0):
+        """
+        Register a job.
+
+        Args:
+            name (str): Name shown in log messages
+            func (callable): Function to run (no arguments)
+            interval (float): Seconds between runs
+            jitter (float): Up to this many random seconds added to each wait
+
+        Returns:
+            Job: The registered job
+        """
+        job = Job(name, func, interval, jitter)
+        self.jobs.append(job)
+        return job
+
+    def on_shutdown(self, func):
+        """
+        Register a function to call after the last job has finished.
+
+        Args:
+            func (callable): Function to run at shutdown (no arguments)
+        """
+        self._shutdown_hooks.append(func)
+
+    def _run_job(self, job):
+        """Run one job, recording failures instead of crashing the daemon."""
+        try:
+            job.func()
+        except Exception as e:
+            job.failures += 1
+            print(f"❌ Job '{job.name}' failed: {e}")
+        finally:
+            with self._lock:
+                job.runs += 1
+                job.running = False
+
+    def run_pending(self):
+        """Start every job that is due (skipping jobs that are still running)."""
+        now = time.monotonic()
+
+        for job in self.jobs:
+            if now < job.next_run:
+                continue
+
+            job.schedule_next(now)
+
+            with self._lock:
+                if job.running:
+                    job.skipped += 1
+                    print(f"⏭️  Skipping '{job.name}': previous run still in progress")
+                    continue
+                job.running = True
+
+            print(f"\n⏰ [{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting '{job.name}'")
+            self._pool.submit(self._run_job, job)
+
+    def _seconds_until_next_job(self):
+        """Time to sleep before the next job is due (at most one second)."""
+        if not self.jobs:
+            return 1.0
+        wait = min(job.next_run for job in self.jobs) - time.monotonic()
+        return max(0.0, min(1.0, wait))
+
+    def _handle_signal(self, signum, frame):
+        """Stop the scheduler on Ctrl+C or SIGTERM."""
+        print("\n🛑 Shutdown requested, finishing running jobs...")
+        self.stop()
+
+    def run(self):
+        """
+        Run jobs until stop() is called or the process receives
+        SIGINT/SIGTERM, then shut down gracefully.
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self._handle_signal)
+            signal.signal(signal.SIGTERM, self._handle_signal)
+
+        print(f"\n🕒 Scheduler started with {len(self.jobs)} job(s):")
+        for job in self.jobs:
+            print(f"   - {job.name}: every {job.interval}s (+ up to {job.jitter}s jitter)")
+
+        try:
+            while not self._stop.is_set():
+                self.run_pending()
+                self._stop.wait(self._seconds_until_next_job())
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """Ask the scheduler loop to exit."""
+        self._stop.set()
+
+    def shutdown(self):
+        """Wait for running jobs, then run the shutdown hooks."""
+        self._pool.shutdown(wait=True)
+
+        for hook in self._shutdown_hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"❌ Error during shutdown: {e}")
+
+        print("\n👋 Scheduler stopped")
+        for job in self.jobs:
+            print(f"   - {job.name}: {job.runs} run(s), {job.skipped} skipped, "
+                  f"{job.failures} failed")
+
+
+def add_daemon_arguments(parser):
+    """
+    Add the daemon-mode command line options to an argparse parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+    """
+    parser.add_argument('--daemon', action='store_true',
+                        help='Run continuously on a schedule instead of showing the menu')
+    parser.add_argument('--weather-interval', type=float, default=900,
+                        help='Seconds between weather runs (0 disables the job)')
+    parser.add_argument('--crypto-interval', type=float, default=60,
+                        help='Seconds between crypto runs (0 disables the job)')
+    parser.add_argument('--news-interval', type=float, default=1800,
+                        help='Seconds between news runs (0 disables the job)')
+    parser.add_argument('--news-feeds', type=parse_feeds, default=None,
+                        help='Fetch several news feeds per run, e.g. "technology:us,business:gb"')
+    parser.add_argument('--jitter', type=float, default=5,
+                        help='Random extra delay (seconds) added to each interval')
+    parser.add_argument('--workers', type=int, default=3,
+                        help='Number of jobs that may run at the same time')
+
+
+def run_daemon(assistant, args):
+    """
+    Run the weather, crypto and news automations on a schedule.
+
+    Args:
+        assistant: AutomationAssistant or AutomationAssistantGSheets instance
+        args (argparse.Namespace): Parsed options from add_daemon_arguments()
+    """
+    scheduler = Scheduler(max_workers=args.workers)
+
+    jobs = [
+        ('weather', assistant.run_weather_automation, args.weather_interval),
+        ('crypto', assistant.run_crypto_automation, args.crypto_interval),
+        ('news', partial(assistant.run_news_automation, feeds=args.news_feeds),
+         args.news_interval),
+    ]
+    for name, func, interval in jobs:
+        if interval > 0:
+            scheduler.add_job(name, func, interval, jitter=args.jitter)
+
+    scheduler.on_shutdown(assistant.close)
+    scheduler.run()
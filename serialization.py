@@ -0,0 +1,262 @@
+"""
+Serialization Fast Path
+=======================
+Faster JSON decoding and timestamp formatting, shared by the CSV and
+Google Sheets versions.
+
+- JSON bodies are decoded with orjson when it is installed (several
+  times faster than the standard json module); otherwise, or if orjson
+  rejects a document, the standard json module is used. The decoded
+  values are the same either way (except integers above 64 bits, which
+  orjson reads as floats; none of the APIs used here send those).
+- Timestamps are formatted at most once per second instead of calling
+  datetime.now().strftime() for every record.
+
+Both are picked automatically, no configuration needed. Run this file
+for a micro-benchmark comparing the fast path with the standard one:
+
+    python serialization.py
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# (second, formatted text) of the last timestamp, replaced as a whole
+_timestamp_cache = (None, None)
+
+
+def loads(data):
+    """
+    Decode a JSON document.
+
+    Args:
+        data (bytes or str): JSON text
+
+    Returns:
+        The decoded value
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # let the json module decide (and raise its usual error)
+    return json.loads(data)
+
+
+def response_json(response):
+    """
+    Decode a requests.Response body (drop-in for response.json()).
+
+    Args:
+        response (requests.Response): Response with a JSON body
+
+    Returns:
+        The decoded value
+
+    Raises:
+        requests.exceptions.JSONDecodeError: If the body isn't valid JSON
+            (like response.json(), so callers catching RequestException
+            keep working)
+    """
+    if orjson is None:
+        return response.json()
+    try:
+        return loads(response.content)
+    except json.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos, response=response) from e
+
+
+def timestamp_now():
+    """
+    Get the current local time as 'YYYY-MM-DD HH:MM:SS'.
+    The text is only formatted again when the second changes.
+
+    Returns:
+        str: Formatted timestamp
+    """
+    global _timestamp_cache
+
+    second = int(time.time())
+    cached_second, text = _timestamp_cache
+    if cached_second != second:
+        text = datetime.fromtimestamp(second).strftime(TIMESTAMP_FORMAT)
+        _timestamp_cache = (second, text)
+    return text
+
+
+def _time(func, repeat):
+    """Best time of `repeat` runs of func (seconds)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _production_csv(payload, timestamp, folder):
+    """
+    Write a CoinGecko price payload to CSV the way the assistants do:
+    CryptoSource parses it into a RecordBatch and a CsvWriter writes it.
+
+    Returns:
+        bytes: Content of the CSV file
+    """
+    # Imported here so the module itself has no dependency on the fetchers
+    from types import SimpleNamespace
+    from csv_writer import CsvWriter
+    from sources import CryptoSource
+
+    def get(url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = payload
+        return response
+
+    assistant = SimpleNamespace(http=SimpleNamespace(get=get), stream_json=False)
+    batch = CryptoSource(assistant)._fetch_chunk([], timestamp)
+
+    path = os.path.join(folder, 'crypto_prices.csv')
+    writer = CsvWriter(path, fsync='never')
+    writer.write_rows(batch)
+    writer.close()
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _baseline_csv(payload, timestamp, folder):
+    """
+    Write the same payload the way the original code did: json.loads,
+    one dict per coin, csv.DictWriter.
+
+    Returns:
+        bytes: Content of the CSV file
+    """
+    path = os.path.join(folder, 'baseline.csv')
+    rows = [
+        {
+            'timestamp': timestamp,
+            'cryptocurrency': coin_id.title(),
+            'price_usd': coin_data.get('usd', 0),
+            'market_cap_usd': coin_data.get('usd_market_cap', 0),
+            'change_24h_percent': coin_data.get('usd_24h_change', 0)
+        }
+        for coin_id, coin_data in json.loads(payload).items()
+    ]
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def run_benchmark(rows=2000, repeat=5):
+    """
+    Compare the fast path with the standard library on a crypto snapshot.
+
+    Args:
+        rows (int): Number of coins in the synthetic snapshot
+        repeat (int): Runs per measurement (the best one is reported)
+
+    Returns:
+        list: (name, standard seconds, fast seconds) tuples
+    """
+    # Imported here so the module itself has no dependency on records
+    from records import CryptoRecord
+
+    # Like CoinGecko: whole-dollar prices and market caps come back as
+    # integers, and some coins have no market cap at all
+    payload = json.dumps({
+        f"coin-{i}": {
+            'usd': 1000 + i if i % 3 == 0 else 1000 + i / 7,
+            'usd_market_cap': 1323456789012 + i if i % 5 else None,
+            'usd_24h_change': -1.2345 + i / 1000
+        }
+        for i in range(rows)
+    }).encode('utf-8')
+    data = json.loads(payload)
+    header = list(CryptoRecord._fields)
+    timestamp = timestamp_now()
+
+    dict_rows = [
+        {
+            'timestamp': timestamp,
+            'cryptocurrency': coin.title(),
+            'price_usd': values['usd'],
+            'market_cap_usd': values['usd_market_cap'],
+            'change_24h_percent': values['usd_24h_change']
+        }
+        for coin, values in data.items()
+    ]
+    tuple_rows = [
+        CryptoRecord(timestamp, coin.title(), values['usd'],
+                     values['usd_market_cap'], values['usd_24h_change'])
+        for coin, values in data.items()
+    ]
+
+    def dict_writer():
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(dict_rows)
+        return out.getvalue()
+
+    def tuple_writer():
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(header)
+        writer.writerows(tuple_rows)
+        return out.getvalue()
+
+    # The fast path must not change a single byte of the output: run the
+    # payload through the real fetch-and-save path and compare the file
+    # with what the original json.loads + DictWriter code wrote
+    with tempfile.TemporaryDirectory() as folder:
+        if _production_csv(payload, timestamp, folder) != _baseline_csv(payload, timestamp, folder):
+            raise AssertionError("RecordBatch + CsvWriter produced different CSV output")
+    if loads(payload) != json.loads(payload):
+        raise AssertionError("orjson decoded the payload differently")
+
+    results = [
+        ('JSON decode', _time(lambda: json.loads(payload), repeat),
+         _time(lambda: loads(payload), repeat)),
+        ('Timestamps (per record)',
+         _time(lambda: [datetime.now().strftime(TIMESTAMP_FORMAT) for _ in range(rows)], repeat),
+         _time(lambda: [timestamp_now() for _ in range(rows)], repeat)),
+        ('CSV rows', _time(dict_writer, repeat), _time(tuple_writer, repeat)),
+    ]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the serialization fast path")
+    parser.add_argument('--rows', type=int, default=2000, help="Coins in the test snapshot (default: 2000)")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement (default: 5)")
+    args = parser.parse_args()
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed (json fallback)'}")
+    print(f"{'Step':<26}{'standard':>12}{'fast path':>12}{'speedup':>10}")
+    for name, standard, fast in run_benchmark(args.rows, args.repeat):
+        print(f"{name:<26}{standard * 1000:>10.2f}ms{fast * 1000:>10.2f}ms{standard / fast:>9.1f}x")
+    print("✓ CSV output is byte-identical")
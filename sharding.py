@@ -0,0 +1,334 @@
+"""
+Sharded Collection
+==================
+Multi-process mode of the CSV version, for watchlists of many thousands
+of cities or coins.
+
+Threads overlap the network waits, but parsing and formatting all the
+records still runs on one core (the GIL). In sharded mode the city or
+coin list is split into N shards, each collected by its own process:
+
+- Assignment is deterministic (a stable hash of each city/coin ID), so
+  the same item always lands in the same shard and each shard's caches
+  (e.g. geocoded coordinates) stay warm between runs
+- Every shard writes to its own partition under data/shards/, e.g.
+  data/shards/weather/shard-02-of-04/weather_data.csv (plus its own
+  SQLite/Parquet copies if enabled) and logs to run.log there
+- A merge step appends the new partition rows to the usual
+  data/weather_data.csv / data/crypto_prices.csv. Merged byte offsets
+  are recorded in merged.json, so running the merge again never
+  duplicates rows. Before each append the main file's size is recorded
+  there as "pending"; if the merge crashed mid-append, the next merge
+  finishes the bookkeeping or cuts the partial rows off first
+
+API rate limits are shared: each shard gets 1/N of the configured rates.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from csv_writer import SchemaMismatchError
+
+
+SHARDS_FOLDER = "shards"
+MANIFEST_FILE = "merged.json"
+
+# Manifest key of the append in progress: {part, offset, size, main_size}
+PENDING_KEY = "pending"
+
+
+def shard_for(key, shards):
+    """
+    Pick the shard of an item (stable across runs and processes,
+    unlike hash(), which is randomized per process).
+
+    Args:
+        key (str): Item ID (city name, coin ID, ...)
+        shards (int): Number of shards
+
+    Returns:
+        int: Shard index in [0, shards)
+    """
+    return zlib.crc32(str(key).encode('utf-8')) % shards
+
+
+def partition(items, shards):
+    """
+    Split items into shards, keeping their order within each shard.
+
+    Args:
+        items (list): Items to split
+        shards (int): Number of shards
+
+    Returns:
+        list: One list of items per shard (some may be empty)
+    """
+    parts = [[] for _ in range(shards)]
+    for item in items:
+        parts[shard_for(item, shards)].append(item)
+    return parts
+
+
+def shard_folder(data_folder, source_name, shard, shards):
+    """
+    Get the partition folder of one shard.
+
+    Args:
+        data_folder (str): Main data folder
+        source_name (str): Source name (e.g. "weather")
+        shard (int): Shard index
+        shards (int): Number of shards
+
+    Returns:
+        str: Folder path
+    """
+    return os.path.join(data_folder, SHARDS_FOLDER, source_name,
+                        f"shard-{shard:02d}-of-{shards:02d}")
+
+
+def run_shard(task):
+    """
+    Collect one shard in a worker process (runs in a fresh interpreter).
+
+    Args:
+        task (dict): source, option, items, target, shard, shards,
+            folder, assistant_options and fetch_options
+
+    Returns:
+        dict: shard, items, rows (saved) and log (path of the shard's log)
+    """
+    # Imported here: this module is imported by the assistant itself
+    from automation_assistant_csv import AutomationAssistant
+
+    os.makedirs(task['folder'], exist_ok=True)
+    log_path = os.path.join(task['folder'], "run.log")
+
+    with open(log_path, 'a', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        print(f"\n=== Shard {task['shard'] + 1}/{task['shards']}: "
+              f"{len(task['items'])} {task['option']} ===")
+
+        assistant = AutomationAssistant(data_folder=task['folder'], write_behind=False,
+                                        **task['assistant_options'])
+        # All shards share the APIs' rate limits
+        assistant.rate_limiter.split(task['shards'])
+
+        try:
+            source = assistant.source(task['source'])
+            data = source.fetch(**{task['option']: task['items']}, **task['fetch_options'])
+            rows = 0
+            if data:
+                assistant.save(data, task['target'])
+                rows = len(data)
+        finally:
+            assistant.close()
+
+    return {'shard': task['shard'], 'items': len(task['items']), 'rows': rows, 'log': log_path}
+
+
+def run_shards(tasks, processes):
+    """
+    Run shard tasks on a process pool.
+
+    Args:
+        tasks (list): Tasks for run_shard()
+        processes (int): Maximum number of worker processes
+
+    Returns:
+        tuple: (results, failures) - run_shard() results, and (task, reason)
+            tuples for shards whose process failed
+    """
+    results, failures = [], []
+    if not tasks:
+        return results, failures
+
+    # "spawn": forking a process that runs threads (write-behind, flush
+    # timers) could copy held locks into the children
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(processes, len(tasks)), mp_context=context) as pool:
+        futures = [(task, pool.submit(run_shard, task)) for task in tasks]
+        for task, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append((task, str(e)))
+
+    return results, failures
+
+
+def _load_manifest(path):
+    """Read the merged byte offsets ({} if there is no manifest yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(path, manifest):
+    """Replace the manifest atomically."""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def _read_header(path):
+    """First row of a CSV file (None if the file is missing or empty)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+
+def _read_new_bytes(part_path, offset, size):
+    """Bytes of the rows a partition added between two offsets (without the header row)."""
+    with open(part_path, 'rb') as part:
+        part.seek(offset)
+        if offset == 0:
+            part.readline()  # the header row
+        return part.read(size - part.tell())
+
+
+def _main_bytes(new_bytes, part_header, main_header, part_path, main_path):
+    """
+    Bytes to append to the main file for a partition's new rows: the same
+    bytes when the columns are in the same order, else the rows reordered
+    to the main file's header.
+
+    Raises:
+        SchemaMismatchError: If the partition's columns differ from the main file's
+    """
+    if part_header == main_header:
+        return new_bytes
+    if set(part_header) != set(main_header):
+        raise SchemaMismatchError(
+            f"Columns of '{part_path}' don't match header of '{main_path}'"
+        )
+
+    order = [part_header.index(name) for name in main_header]
+    out = io.StringIO(newline='')
+    main_writer = csv.writer(out)
+    # newline='' keeps line breaks inside quoted fields
+    for row in csv.reader(io.StringIO(new_bytes.decode('utf-8'), newline='')):
+        main_writer.writerow([row[i] for i in order])
+    return out.getvalue().encode('utf-8')
+
+
+def _recover_pending(manifest, data_folder, main_path):
+    """
+    Finish an append interrupted by a crash (manifest is updated in place):
+    if all its bytes reached the main file, its offset is recorded; if only
+    some did, they are cut off so the rows are merged again in full.
+    """
+    pending = manifest.pop(PENDING_KEY, None)
+    part_path = os.path.join(data_folder, pending['part']) if pending else None
+    if pending is None or not os.path.exists(main_path) or not os.path.exists(part_path):
+        return
+
+    expected = _main_bytes(
+        _read_new_bytes(part_path, pending['offset'], pending['size']),
+        _read_header(part_path), _read_header(main_path), part_path, main_path
+    )
+    with open(main_path, 'rb+') as main:
+        main.seek(pending['main_size'])
+        appended = main.read(len(expected) + 1)
+        if appended[:len(expected)] == expected:
+            manifest[pending['part']] = pending['size']
+        elif expected.startswith(appended):
+            if not appended:
+                return  # Crashed before appending anything
+            main.truncate(pending['main_size'])
+            print(f"⚠️  Removed {len(appended)} byte(s) of an interrupted merge from '{main_path}'")
+        else:
+            print(f"⚠️  Can't tell how much of '{part_path}' an interrupted merge appended "
+                  f"to '{main_path}'; its rows will be merged again")
+
+
+def merge_partitions(data_folder, source_name, filename, shards, writer=None):
+    """
+    Append the rows the shards added since the last merge to the main CSV file.
+
+    Partitions are merged in shard order. When the columns are in the
+    same order the bytes are copied as they are; otherwise rows are
+    reordered to the main file's header.
+
+    Each append is recorded as pending in the manifest first, so a crash
+    in the middle never duplicates or loses rows (see _recover_pending).
+
+    Args:
+        data_folder (str): Main data folder
+        source_name (str): Source name (e.g. "weather")
+        filename (str): CSV file name (e.g. "weather_data.csv")
+        shards (int): Number of shards
+        writer (CsvWriter): Hand the rows to this writer instead of
+            appending to the main file (e.g. a RotatingCsvWriter)
+
+    Returns:
+        int: Number of rows appended
+
+    Raises:
+        SchemaMismatchError: If a partition's columns differ from the main file's
+    """
+    manifest_path = os.path.join(data_folder, SHARDS_FOLDER, source_name, MANIFEST_FILE)
+    manifest = _load_manifest(manifest_path)
+    main_path = os.path.join(data_folder, filename)
+    if PENDING_KEY in manifest:
+        _recover_pending(manifest, data_folder, main_path)
+        _save_manifest(manifest_path, manifest)
+    main_header = _read_header(main_path)
+    merged_rows = 0
+
+    for shard in range(shards):
+        part_path = os.path.join(shard_folder(data_folder, source_name, shard, shards), filename)
+        part_header = _read_header(part_path)
+        if part_header is None:
+            continue
+
+        key = os.path.relpath(part_path, data_folder)
+        offset = manifest.get(key, 0)
+        size = os.path.getsize(part_path)
+        if offset >= size:
+            continue
+
+        new_bytes = _read_new_bytes(part_path, offset, size)
+        # newline='' keeps line breaks inside quoted fields
+        rows = list(csv.reader(io.StringIO(new_bytes.decode('utf-8'), newline='')))
+
+        if writer is not None:
+            if rows:
+                writer.write_rows([dict(zip(part_header, row)) for row in rows])
+                # On disk before the offset moves past them
+                writer.flush()
+        else:
+            if main_header is None:
+                main_header = part_header
+                with open(main_path, 'w', newline='', encoding='utf-8') as main:
+                    csv.writer(main).writerow(main_header)
+
+            main_bytes = _main_bytes(new_bytes, part_header, main_header, part_path, main_path)
+            manifest[PENDING_KEY] = {
+                'part': key,
+                'offset': offset,
+                'size': size,
+                'main_size': os.path.getsize(main_path),
+            }
+            _save_manifest(manifest_path, manifest)
+            with open(main_path, 'ab') as main:
+                main.write(main_bytes)
+                main.flush()
+                os.fsync(main.fileno())
+            del manifest[PENDING_KEY]
+        merged_rows += len(rows)
+
+        manifest[key] = size
+        _save_manifest(manifest_path, manifest)
+
+    return merged_rows
@@ -0,0 +1,458 @@
+"""
+Sheets Spool
+============
+Durable on-disk spool for the Google Sheets version: rows that could not
+be written (quota spikes, API outages, network errors) are kept on disk
+instead of being lost, and written later by a background replayer.
+
+- The spool is an append-only log split into segment files
+  (data/sheets_spool/000001.seg, ...). Every entry is one line with a
+  CRC32 checksum, so a line torn by a crash is detected and skipped
+- Every row has an ID, derived from its save and its position in it
+  (identical rows from different saves are still different rows). The
+  ID is given when the row is first saved, kept in the spool and
+  written to the sheet's row_id column with the row
+- After rows are written to Sheets their IDs are recorded in acked.log
+  before anything is deleted; segments whose rows are all written are
+  then deleted
+- Delivery is exactly-once: before a replay (or a retry), the assistant
+  reads the IDs already in the sheet and skips those rows, so a write
+  that Sheets applied but whose response was lost, or a crash before
+  acked.log is synced, doesn't write rows twice (as long as nobody
+  edits the row_id column)
+- The spool has a size limit: when it is reached the oldest segments
+  are dropped (and counted in the metrics) instead of filling the disk
+- Rows that Sheets rejects for good (e.g. 400 bad request, 403 no
+  permission, or columns that don't match the tab's header) are moved
+  to dead_letter.log instead of being retried forever and blocking the
+  rows behind them
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+
+from metrics import NULL_METRICS
+from records import fields_of, iter_values
+
+
+SEGMENT_SUFFIX = ".seg"
+ACK_FILE = "acked.log"
+DEAD_LETTER_FILE = "dead_letter.log"
+
+
+def row_id(save_id, index):
+    """
+    Get the ID of one row of a save (always the same for the same row).
+
+    Args:
+        save_id (str): ID of the save the row belongs to
+        index (int): Position of the row in the save
+
+    Returns:
+        str: 16 hex characters
+    """
+    return hashlib.blake2b(f"{save_id}:{index}".encode('ascii'), digest_size=8).hexdigest()
+
+
+def new_row_ids(count):
+    """
+    Get the IDs of the rows of a new save.
+
+    Args:
+        count (int): Number of rows in the save
+
+    Returns:
+        list: One ID per row, unique even for identical rows
+    """
+    save_id = uuid.uuid4().hex
+    return [row_id(save_id, index) for index in range(count)]
+
+
+def _encode(entry):
+    """Encode one log line: checksum, space, JSON, newline."""
+    payload = json.dumps(entry, default=str, separators=(',', ':')).encode('utf-8')
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _read_log(path):
+    """
+    Read the valid entries of a log file.
+
+    Returns:
+        tuple: (entries, corrupt) - decoded entries, and the number of
+            lines skipped because their checksum or JSON was bad
+    """
+    entries, corrupt = [], 0
+    with open(path, 'rb') as f:
+        for line in f:
+            checksum, _, payload = line.rstrip(b"\n").partition(b" ")
+            try:
+                if int(checksum, 16) != zlib.crc32(payload):
+                    raise ValueError("checksum mismatch")
+                entries.append(json.loads(payload))
+            except ValueError:
+                corrupt += 1
+    return entries, corrupt
+
+
+class SheetsSpool:
+    """
+    Thread-safe append-only spool of rows waiting to be written to Google Sheets.
+    """
+
+    def __init__(self, folder, segment_bytes=4 * 1024 * 1024, max_bytes=100 * 1024 * 1024,
+                 metrics=None):
+        """
+        Open (or create) the spool.
+
+        Args:
+            folder (str): Spool folder (e.g. data/sheets_spool)
+            segment_bytes (int): Size at which a new segment file is started
+            max_bytes (int): Disk space limit of the segments (acked.log and
+                dead_letter.log don't count); the oldest segments are dropped beyond it
+            metrics (Metrics): Receives spool size/age gauges and counters
+        """
+        self.folder = folder
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.metrics = metrics or NULL_METRICS
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+        # In-memory index: {segment path: [(spooled at, [row IDs]), ...]},
+        # plus running totals so sizes and counts never need a full pass
+        self._segments = {}
+        self._segment_sizes = {}
+        self._acked = set()
+        # Rows not written yet: {row ID: segment path}, and their count per segment
+        self._unwritten = {}
+        self._unwritten_per_segment = {}
+        self._active = None
+        self._next_number = 1
+
+        corrupt = 0
+        ack_path = os.path.join(folder, ACK_FILE)
+        if os.path.exists(ack_path):
+            entries, skipped = _read_log(ack_path)
+            corrupt += skipped
+            for ids in entries:
+                self._acked.update(ids)
+
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            path = os.path.join(folder, name)
+            entries, skipped = _read_log(path)
+            corrupt += skipped
+            self._segments[path] = [(entry['ts'], [row[0] for row in entry['rows']])
+                                    for entry in entries]
+            self._segment_sizes[path] = os.path.getsize(path)
+            self._unwritten_per_segment[path] = 0
+            for _, ids in self._segments[path]:
+                for id_ in ids:
+                    if id_ not in self._acked:
+                        self._unwritten[id_] = path
+                        self._unwritten_per_segment[path] += 1
+            self._next_number = int(name[:-len(SEGMENT_SUFFIX)]) + 1
+            self._active = path
+
+        if corrupt:
+            print(f"⚠️  Skipped {corrupt} damaged line(s) in the Sheets spool '{folder}'")
+
+        # Never append after a torn last line: start a fresh segment instead
+        if self._active is not None:
+            with open(self._active, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._active = None
+
+        # Forget acknowledgements of segments deleted before
+        self._acked &= {id_ for entries in self._segments.values() for _, ids in entries for id_ in ids}
+        self._drop_written_segments()
+        self._update_gauges()
+
+    @property
+    def rows(self):
+        """Number of rows waiting to be written."""
+        with self._lock:
+            return self._pending_count()
+
+    def _pending_count(self):
+        """Rows not yet acknowledged (lock must be held)."""
+        return len(self._unwritten)
+
+    def append(self, sheet_name, data, ids=None):
+        """
+        Spool the rows of one save.
+
+        Args:
+            sheet_name (str): Sheet tab the rows belong to
+            data (list or RecordBatch): Records or dicts (non-empty)
+            ids (list): The rows' IDs (default: new ones, see new_row_ids)
+
+        Returns:
+            int: Number of rows spooled
+        """
+        fields = list(fields_of(data))
+        ids = ids or new_row_ids(len(data))
+        rows = [[id_, list(values)] for id_, values in zip(ids, iter_values(data, fields))]
+        entry = {'ts': time.time(), 'sheet': sheet_name, 'fields': fields, 'rows': rows}
+        line = _encode(entry)
+
+        with self._lock:
+            if (self._active is None or not os.path.exists(self._active)
+                    or self._segment_sizes[self._active] + len(line) > self.segment_bytes):
+                self._start_segment()
+            with open(self._active, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._segments[self._active].append((entry['ts'], [row[0] for row in rows]))
+            self._segment_sizes[self._active] += len(line)
+            for row in rows:
+                self._unwritten[row[0]] = self._active
+            self._unwritten_per_segment[self._active] += len(rows)
+            self._enforce_limit()
+            self._update_gauges()
+
+        self.metrics.inc('spooled_rows_total', len(rows), target=sheet_name)
+        return len(rows)
+
+    def pending(self, max_rows=5000):
+        """
+        Get the oldest rows waiting to be written.
+
+        Rows already written are left out.
+
+        Args:
+            max_rows (int): Stop after this many rows (a whole entry is
+                always included, so it may be exceeded by one save)
+
+        Returns:
+            list: Entries {'sheet', 'fields', 'rows': [[row ID, values], ...]},
+                oldest first
+        """
+        with self._lock:
+            paths = list(self._segments)
+            acked = set(self._acked)
+
+        result, count = [], 0
+        for path in paths:
+            if count >= max_rows:
+                break
+            if not os.path.exists(path):
+                continue
+            entries, _ = _read_log(path)
+            for entry in entries:
+                rows = [row for row in entry['rows'] if row[0] not in acked]
+                if not rows:
+                    continue
+                result.append({'sheet': entry['sheet'], 'fields': entry['fields'], 'rows': rows})
+                count += len(rows)
+                if count >= max_rows:
+                    break
+        return result
+
+    def ack(self, entries):
+        """
+        Mark rows as written, then delete the segments that no longer hold
+        unwritten rows.
+
+        Args:
+            entries (list): Entries returned by pending() that were written
+        """
+        ids = [row[0] for entry in entries for row in entry['rows']]
+        if not ids:
+            return
+
+        with self._lock:
+            # Durable before anything is deleted, so no row is lost. A crash
+            # before this write is synced means the rows are written again
+            with open(os.path.join(self.folder, ACK_FILE), 'ab') as f:
+                f.write(_encode(ids))
+                f.flush()
+                os.fsync(f.fileno())
+            self._acked.update(ids)
+            for id_ in ids:
+                path = self._unwritten.pop(id_, None)
+                if path is not None:
+                    self._unwritten_per_segment[path] -= 1
+            self._drop_written_segments()
+            self._update_gauges()
+
+    def dead_letter(self, entries, error):
+        """
+        Move rows that can never be written to dead_letter.log (kept for
+        inspection) and remove them from the spool.
+
+        Args:
+            entries (list): Entries returned by pending()
+            error (Exception): Why Sheets rejected them
+        """
+        if not entries:
+            return
+
+        now = time.time()
+        with self._lock:
+            with open(os.path.join(self.folder, DEAD_LETTER_FILE), 'ab') as f:
+                for entry in entries:
+                    f.write(_encode({'ts': now, 'error': str(error), 'sheet': entry['sheet'],
+                                     'fields': entry['fields'], 'rows': entry['rows']}))
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.ack(entries)
+        for entry in entries:
+            self.metrics.inc('spool_dead_letter_rows_total', len(entry['rows']), target=entry['sheet'])
+        count = sum(len(entry['rows']) for entry in entries)
+        print(f"⚠️  Google Sheets rejected {count} spooled row(s) ({error}); "
+              f"moved them to '{os.path.join(self.folder, DEAD_LETTER_FILE)}'")
+
+    def stats(self):
+        """
+        Get the spool's size.
+
+        Returns:
+            dict: rows (waiting), bytes (on disk), oldest_seconds (age of the
+                oldest waiting row, 0 if empty) and segments
+        """
+        with self._lock:
+            return self._stats()
+
+    def _stats(self):
+        """Spool size (lock must be held)."""
+        oldest = None
+        for path, entries in self._segments.items():
+            if not self._unwritten_per_segment[path]:
+                continue
+            for spooled_at, ids in entries:
+                if any(id_ in self._unwritten for id_ in ids):
+                    oldest = spooled_at
+                    break
+            if oldest is not None:
+                break
+
+        return {
+            'rows': self._pending_count(),
+            'bytes': sum(self._segment_sizes.values()),
+            'oldest_seconds': max(0.0, time.time() - oldest) if oldest is not None else 0.0,
+            'segments': len(self._segments),
+        }
+
+    def _update_gauges(self):
+        """Publish the spool size to the metrics (lock must be held)."""
+        if not self.metrics.enabled:
+            return
+        stats = self._stats()
+        self.metrics.set('spool_rows', stats['rows'])
+        self.metrics.set('spool_bytes', stats['bytes'])
+        self.metrics.set('spool_oldest_seconds', round(stats['oldest_seconds'], 3))
+
+    def _start_segment(self):
+        """Start a new segment file (lock must be held)."""
+        self._active = os.path.join(self.folder, f"{self._next_number:06d}{SEGMENT_SUFFIX}")
+        self._next_number += 1
+        self._segments[self._active] = []
+        self._segment_sizes[self._active] = 0
+        self._unwritten_per_segment[self._active] = 0
+
+    def _drop_written_segments(self):
+        """
+        Delete segments whose rows are all written and forget their IDs
+        (lock must be held).
+        """
+        written = [path for path, count in self._unwritten_per_segment.items() if not count]
+        if not written:
+            return
+
+        for path in written:
+            # Keep only the acknowledgements that still refer to a segment
+            for _, ids in self._segments.pop(path):
+                self._acked.difference_update(ids)
+            del self._segment_sizes[path]
+            del self._unwritten_per_segment[path]
+            if os.path.exists(path):
+                os.remove(path)
+            if path == self._active:
+                self._active = None
+
+        ack_path = os.path.join(self.folder, ACK_FILE)
+        temp_path = ack_path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            if self._acked:
+                f.write(_encode(sorted(self._acked)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, ack_path)
+
+    def _enforce_limit(self):
+        """Drop the oldest segments while the spool is over its size limit (lock must be held)."""
+        size = sum(self._segment_sizes.values())
+        while size > self.max_bytes and len(self._segments) > 1:
+            path = next(iter(self._segments))
+            for _, ids in self._segments.pop(path):
+                for id_ in ids:
+                    self._unwritten.pop(id_, None)
+                    self._acked.discard(id_)
+            dropped = self._unwritten_per_segment.pop(path)
+            size -= self._segment_sizes.pop(path)
+            os.remove(path)
+            self.metrics.inc('spool_dropped_rows_total', dropped)
+            print(f"⚠️  Sheets spool is over {self.max_bytes / 1024 / 1024:g} MB: "
+                  f"dropped {dropped} of the oldest spooled row(s)")
+
+
+class SpoolReplayer:
+    """
+    Background thread that drains the spool once Google Sheets accepts
+    writes again, waiting longer after every failed attempt.
+    """
+
+    def __init__(self, spool, replay, interval=30, max_interval=600):
+        """
+        Start the replayer thread.
+
+        Args:
+            spool (SheetsSpool): Spool to watch
+            replay (callable): Function that writes spooled rows and returns
+                True once the spool is empty (e.g. assistant.replay_spool)
+            interval (float): Seconds between attempts while the API is fine
+            max_interval (float): Longest wait between failed attempts
+        """
+        self.spool = spool
+        self.replay = replay
+        self.interval = interval
+        self.max_interval = max_interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sheets-spool-replayer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.wait(delay):
+            if not self.spool.rows:
+                delay = self.interval
+                continue
+            # replay() sets aside rows Sheets rejects for good, so only a
+            # temporary outage (429, 5xx, network) makes it back off here
+            try:
+                drained = self.replay()
+            except Exception as e:
+                print(f"❌ Error replaying the Sheets spool: {e}")
+                drained = False
+            delay = self.interval if drained else min(self.max_interval, delay * 2)
+
+    def close(self):
+        """Stop the thread (a replay in progress is finished first)."""
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,777 @@
+"""
+Data Sources
+============
+Pluggable data sources shared by the CSV and Google Sheets versions.
+
+A source fetches one API and declares what it produces: a record type
+from records.py (the output schema) and a default target for each sink
+(CSV file name, Sheets tab name). Sources run on the assistant that owns
+them, so every source uses the same pooled and cached HTTP client, rate
+limiter, thread pool and local indexes, and every sink can save what any
+source returns.
+
+Adding an API means writing one Source subclass; no runner code changes:
+
+    @register_source
+    class QuotesSource(Source):
+        name = 'quotes'
+        title = '💬 QUOTES AUTOMATION'
+        record_type = QuoteRecord
+        targets = {'csv': 'quotes.csv', 'sheets': 'Quotes'}
+
+        def fetch(self, **options):
+            response = self.http.get("https://api.example.com/quotes")
+            response.raise_for_status()
+            return [QuoteRecord(timestamp_now(), q['text']) for q in response_json(response)]
+
+    assistant.run_source('quotes')
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import os
+import threading
+from functools import partial
+
+import requests
+
+from coin_watchlist import load_coins, url_safe_chunks
+from concurrency import chunked, fetch_all
+from json_stream import iter_items, iter_kvitems
+from records import CryptoRecord, NewsRecord, RecordBatch, WeatherRecord, as_rows
+from serialization import response_json, timestamp_now
+
+
+# Registered source classes by name
+SOURCES = {}
+
+
+def register_source(source_class):
+    """
+    Class decorator adding a Source subclass to the registry.
+
+    Args:
+        source_class (type): Source subclass with a unique `name`
+
+    Returns:
+        type: The same class
+    """
+    if not source_class.name:
+        raise ValueError(f"{source_class.__name__} has no name")
+    if source_class.name in SOURCES and SOURCES[source_class.name] is not source_class:
+        raise ValueError(f"A source named '{source_class.name}' is already registered")
+    SOURCES[source_class.name] = source_class
+    return source_class
+
+
+def get_source(name):
+    """
+    Look up a registered source class.
+
+    Args:
+        name (str): Source name (e.g. "weather")
+
+    Returns:
+        type: Source subclass
+
+    Raises:
+        KeyError: If no source has that name
+    """
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise KeyError(f"Unknown source '{name}' (available: {', '.join(sorted(SOURCES))})") from None
+
+
+class Source:
+    """
+    Base class for data sources.
+
+    Subclasses set the class attributes below and implement fetch().
+    """
+
+    name = None          # Registry key, also used for metrics and spans
+    title = None         # Banner printed when the source runs
+    record_type = None   # Record class the source returns (output schema)
+    targets = {}         # Default target per sink, e.g. {'csv': 'x.csv', 'sheets': 'X'}
+    shard_option = None  # fetch() option listing the items sharded mode splits (see sharding.py)
+
+    def __init__(self, assistant):
+        """
+        Initialize the source.
+
+        Args:
+            assistant: AutomationAssistant or AutomationAssistantGSheets
+                providing the HTTP client, caches and settings
+        """
+        self.assistant = assistant
+
+    @property
+    def http(self):
+        """Shared HTTP client (pooling, retries, rate limiting, caching)."""
+        return self.assistant.http
+
+    @property
+    def stream_json(self):
+        """Whether large responses should be parsed incrementally."""
+        return self.assistant.stream_json
+
+    @property
+    def max_workers(self):
+        """Default concurrency limit."""
+        return self.assistant.max_workers
+
+    @property
+    def fields(self):
+        """Column names of the records this source returns."""
+        return self.record_type._fields
+
+    def target_for(self, sink):
+        """
+        Get the default target of this source for a sink.
+
+        Args:
+            sink (str): Sink name ('csv' or 'sheets')
+
+        Returns:
+            str: Target name (falls back to the source name)
+        """
+        return self.targets.get(sink, self.name)
+
+    def default_items(self):
+        """
+        Get the items fetched when the shard_option isn't given.
+
+        Returns:
+            list: Items (e.g. city names) to split into shards
+        """
+        raise NotImplementedError
+
+    def fetch(self, **options):
+        """
+        Fetch the data of one automation run.
+
+        Args:
+            **options: Source-specific options
+
+        Returns:
+            Records (list or RecordBatch) to save, or None if nothing was fetched
+        """
+        raise NotImplementedError
+
+    def saved(self, data):
+        """
+        Called by the assistant after records were saved successfully
+        (any records, not only this source's). Sources that remember what
+        they collected update that state here, never at fetch time, so a
+        failed save doesn't lose data.
+
+        Args:
+            data (list or RecordBatch): The saved records
+        """
+
+    def save_failed(self, data):
+        """
+        Called by the assistant when saving records failed (any records).
+
+        Args:
+            data (list or RecordBatch): The records that were not saved
+        """
+
+    async def fetch_async(self, **options):
+        """
+        Fetch without blocking an asyncio event loop.
+
+        The default runs fetch() in a worker thread; sources with a native
+        async client can override this.
+
+        Args:
+            **options: Source-specific options
+
+        Returns:
+            Same as fetch()
+        """
+        # Imported here: only async callers need asyncio, and it is slow to import
+        import asyncio
+        return await asyncio.to_thread(self.fetch, **options)
+
+
+@register_source
+class WeatherSource(Source):
+    """Current weather per city from Open-Meteo (free, no key required)."""
+
+    name = 'weather'
+    title = '🌤️  WEATHER DATA AUTOMATION'
+    record_type = WeatherRecord
+    targets = {'csv': 'weather_data.csv', 'sheets': 'Weather Data'}
+    shard_option = 'cities'
+
+    DEFAULT_CITIES = ["London", "New York", "Tokyo"]
+
+    GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+    FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+    def default_items(self):
+        """Cities fetched when none are given."""
+        return list(self.DEFAULT_CITIES)
+
+    def geocode(self, city):
+        """
+        Convert a city name to coordinates, using the geocode cache first.
+
+        Args:
+            city (str): City name to look up
+
+        Returns:
+            tuple: (latitude, longitude) or None if the city is not found
+        """
+        geocode_cache = self.assistant.geocode_cache
+        coords = geocode_cache.get(city)
+        if coords is not None:
+            return coords
+
+        geo_response = self.http.get(self.GEOCODE_URL, params={'name': city, 'count': 1})
+        geo_response.raise_for_status()
+        geo_data = response_json(geo_response)
+
+        if not geo_data.get('results'):
+            return None
+
+        lat = geo_data['results'][0]['latitude']
+        lon = geo_data['results'][0]['longitude']
+        geocode_cache.set(city, lat, lon)
+
+        return lat, lon
+
+    def fetch_city(self, city="London"):
+        """
+        Fetch current weather data for one city.
+
+        Args:
+            city (str): City name to get weather for
+
+        Returns:
+            WeatherRecord: Weather data or None if request fails
+        """
+        print(f"\n📡 Fetching weather data for {city}...")
+
+        try:
+            # Get city coordinates (cached after the first lookup)
+            coords = self.geocode(city)
+
+            if coords is None:
+                print(f"❌ City '{city}' not found")
+                return None
+
+            result = self._fetch_chunk([(city, coords)])[0]
+
+            print(f"✓ Successfully fetched weather data for {city}")
+            return result
+
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching weather data: {e}")
+            return None
+
+    def _fetch_chunk(self, locations):
+        """
+        Fetch current weather for several locations in a single request.
+        Open-Meteo accepts comma-separated latitude/longitude lists.
+
+        Args:
+            locations (list): List of (city, (latitude, longitude)) tuples
+
+        Returns:
+            list: WeatherRecord rows in the same order as `locations`
+        """
+        params = {
+            'latitude': ','.join(str(coords[0]) for _, coords in locations),
+            'longitude': ','.join(str(coords[1]) for _, coords in locations),
+            'current_weather': 'true',
+            'temperature_unit': 'celsius'
+        }
+
+        response = self.http.get(self.FORECAST_URL, params=params)
+        response.raise_for_status()
+        data = response_json(response)
+
+        # One location comes back as an object, several as a list
+        if isinstance(data, dict):
+            data = [data]
+
+        results = []
+        timestamp = timestamp_now()
+
+        for (city, (lat, lon)), location in zip(locations, data):
+            weather = location['current_weather']
+            results.append(WeatherRecord(
+                timestamp=timestamp,
+                city=city,
+                temperature_celsius=weather['temperature'],
+                windspeed_kmh=weather['windspeed'],
+                weather_code=weather['weathercode'],
+                latitude=lat,
+                longitude=lon
+            ))
+
+        return results
+
+    def fetch_batch(self, cities, chunk_size=None, max_workers=None):
+        """
+        Fetch current weather for many cities using as few forecast
+        requests as possible.
+
+        Args:
+            cities (list): City names to get weather for
+            chunk_size (int): Locations per forecast request (default: the
+                assistant's weather_batch_size)
+            max_workers (int): Concurrency limit (default: the assistant's max_workers)
+
+        Returns:
+            tuple: (results, failures) - WeatherRecord rows, and (city, reason)
+                tuples for failed cities
+        """
+        print(f"\n📡 Fetching weather data for {len(cities)} cities...")
+
+        workers = max_workers or self.max_workers
+
+        def resolve(city):
+            coords = self.geocode(city)
+            if coords is None:
+                raise LookupError("city not found")
+            return city, coords
+
+        # Step 1: Resolve coordinates (mostly served from the geocode cache)
+        locations, failures = fetch_all(resolve, cities, max_workers=workers)
+
+        # Step 2: Fetch the weather for many locations per request
+        chunks = chunked(locations, chunk_size or self.assistant.weather_batch_size)
+        chunk_results, chunk_failures = fetch_all(self._fetch_chunk, chunks, max_workers=workers)
+
+        for chunk, reason in chunk_failures:
+            failures.extend((city, reason) for city, _ in chunk)
+
+        results = [row for rows in chunk_results for row in rows]
+
+        print(f"✓ Successfully fetched weather data for {len(results)} cities "
+              f"in {len(chunks)} request(s)")
+        return results, failures
+
+    def fetch(self, cities=None, max_workers=None, batch=True):
+        """
+        Fetch the weather for every city, reporting failed cities.
+
+        Args:
+            cities (list): Cities to fetch weather for (default: DEFAULT_CITIES)
+            max_workers (int): Concurrency limit (default: the assistant's max_workers)
+            batch (bool): Fetch many cities per forecast request (default)
+                instead of one request per city
+
+        Returns:
+            list: WeatherRecord rows (empty if every city failed)
+        """
+        if cities is None:
+            cities = self.default_items()
+
+        # The per-host rate limiter keeps us nice to the API
+        if batch:
+            weather_data, failures = self.fetch_batch(cities, max_workers=max_workers)
+        else:
+            weather_data, failures = fetch_all(
+                self.fetch_city,
+                cities,
+                max_workers=max_workers or self.max_workers
+            )
+
+        if failures:
+            print(f"\n⚠️  {len(failures)} of {len(cities)} cities failed:")
+            for city, reason in failures:
+                print(f"   - {city}: {reason}")
+
+        stats = self.assistant.geocode_cache.stats()
+        print(f"\n📍 Geocode cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+        return weather_data
+
+
+@register_source
+class CryptoSource(Source):
+    """Cryptocurrency prices from CoinGecko (free, no key required)."""
+
+    name = 'crypto'
+    title = '₿  CRYPTOCURRENCY AUTOMATION'
+    record_type = CryptoRecord
+    targets = {'csv': 'crypto_prices.csv', 'sheets': 'Crypto Prices'}
+    shard_option = 'coins'
+
+    PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+
+    def __init__(self, assistant):
+        super().__init__(assistant)
+        # (chunk, reason) tuples for the requests that failed in the last fetch
+        self.failures = []
+
+    def default_items(self):
+        """The assistant's coins_file watchlist."""
+        return load_coins(self.assistant.coins_file)
+
+    def _fetch_chunk(self, coins, timestamp):
+        """
+        Fetch prices for one chunk of coins in a single request.
+
+        Args:
+            coins (list): Coin IDs (short enough for one URL)
+            timestamp (str): Snapshot timestamp shared by all chunks
+
+        Returns:
+            RecordBatch: CryptoRecord rows for the coins in the response
+        """
+        params = {
+            'ids': ','.join(coins),
+            'vs_currencies': 'usd',
+            'include_24hr_change': 'true',
+            'include_market_cap': 'true'
+        }
+
+        response = self.http.get(self.PRICE_URL, params=params, stream=self.stream_json)
+        response.raise_for_status()
+
+        # Coins are parsed one at a time (streamed with stream_json)
+        # straight into the batch's columns
+        results = RecordBatch(CryptoRecord, timestamp)
+
+        for coin_id, coin_data in iter_kvitems(response, stream=self.stream_json):
+            results.append(
+                coin_id.title(),
+                coin_data.get('usd', 0),
+                coin_data.get('usd_market_cap', 0),
+                coin_data.get('usd_24h_change', 0)
+            )
+
+        return results
+
+    def fetch(self, coins=None, max_workers=None):
+        """
+        Fetch the prices of a watchlist.
+
+        Large watchlists are split into URL-length-safe chunks that are
+        fetched concurrently (CoinGecko has its own, lower rate limit) and
+        merged into one snapshot with a single timestamp. Chunks that fail
+        are recorded in self.failures instead of dropping the rest.
+
+        Args:
+            coins (list): Cryptocurrency IDs (default: the assistant's coins_file watchlist)
+            max_workers (int): Concurrency limit (default: the assistant's max_workers)
+
+        Returns:
+            RecordBatch: CryptoRecord rows, or None if every request fails
+        """
+        if coins is None:
+            coins = self.default_items()
+
+        if len(coins) <= 10:
+            print(f"\n📡 Fetching cryptocurrency prices for {', '.join(coins)}...")
+        else:
+            print(f"\n📡 Fetching cryptocurrency prices for {len(coins)} coins...")
+
+        chunks = url_safe_chunks(coins)
+        timestamp = timestamp_now()
+
+        chunk_data, self.failures = fetch_all(
+            partial(self._fetch_chunk, timestamp=timestamp),
+            chunks,
+            max_workers=max_workers or self.max_workers
+        )
+
+        for chunk, reason in self.failures:
+            print(f"❌ Error fetching crypto data for {len(chunk)} coin(s) "
+                  f"({chunk[0]} ... {chunk[-1]}): {reason}")
+
+        if not chunk_data:
+            return None
+
+        # Merge the chunks into one snapshot
+        results = RecordBatch(CryptoRecord, timestamp)
+        for batch in chunk_data:
+            results.extend(batch)
+
+        print(f"✓ Successfully fetched prices for {len(results)} cryptocurrencies "
+              f"in {len(chunks)} request(s)")
+        if self.failures:
+            print(f"⚠️  {len(self.failures)} of {len(chunks)} request(s) failed; "
+                  f"saving a partial snapshot")
+        return results
+
+
+@register_source
+class NewsSource(Source):
+    """Top headlines from NewsAPI.org (free API key in NEWS_API_KEY)."""
+
+    name = 'news'
+    title = '📰 NEWS AUTOMATION'
+    record_type = NewsRecord
+    targets = {'csv': 'latest_news.csv', 'sheets': 'Latest News'}
+
+    HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
+
+    def __init__(self, assistant):
+        super().__init__(assistant)
+        # Fetched articles not saved yet: {article key: {(category, country), ...}}
+        self._unsaved = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def article_key(article):
+        """Key an article is indexed by: its URL, or its title if it has none."""
+        return article.url or article.title
+
+    def fetch_feed(self, category="technology", country="us", incremental=True,
+                   page_size=10, max_pages=5):
+        """
+        Fetch latest news headlines for one category and country.
+        Requires the NEWS_API_KEY environment variable to be set.
+
+        Get your free API key from https://newsapi.org/register
+        Then add it to your .env file: NEWS_API_KEY=your-key-here
+
+        Args:
+            category (str): News category (business, technology, science, etc.)
+            country (str): Country code (us, gb, ca, etc.)
+            incremental (bool): Only return articles not collected before,
+                paging back until the last collected article is reached
+            page_size (int): Articles per request
+            max_pages (int): Maximum number of pages per call (incremental mode)
+
+        Returns:
+            list: NewsRecord articles or None if request fails
+        """
+        print(f"\n📡 Fetching latest {category} news from {country.upper()}...")
+
+        # Get API key from environment variable
+        api_key = os.getenv('NEWS_API_KEY')
+
+        if not api_key:
+            print("\n⚠️  NEWS_API_KEY not found!")
+            print("   To use the News API:")
+            print("   1. Get a free API key from https://newsapi.org/register")
+            print("   2. Create a .env file in your project folder")
+            print("   3. Add this line: NEWS_API_KEY=your-actual-key")
+            print("   4. Run the script again")
+            return None
+
+        news_index = self.assistant.news_index
+
+        params = {
+            'apiKey': api_key,
+            'category': category,
+            'country': country,
+            'pageSize': page_size  # Articles per page
+        }
+
+        try:
+            # Page further back only when collecting incrementally
+            high_water = news_index.high_water_mark(category, country) if incremental else None
+            articles = []
+            timestamp = timestamp_now()
+
+            for page in range(1, (max_pages if incremental else 1) + 1):
+                if page > 1:
+                    params['page'] = page
+
+                response = self.http.get(self.HEADLINES_URL, params=params, stream=self.stream_json)
+                # Every request sent counts against the daily quota, including
+                # retries and 304 revalidations of cached pages
+                requests_sent = getattr(response, 'requests_sent', 0 if response.from_cache else 1)
+                if requests_sent:
+                    remaining = response.headers.get('X-RateLimit-Remaining')
+                    news_index.count_request(0 if response.status_code == 429 else remaining,
+                                             count=requests_sent)
+                response.raise_for_status()
+
+                # Articles are parsed one at a time (streamed with stream_json)
+                # and kept only as compact records
+                fields = {}
+                page_records = []
+                reached_collected = False
+
+                for article in iter_items(response, 'articles.item', fields, stream=self.stream_json):
+                    if high_water and article['publishedAt'] <= high_water:
+                        reached_collected = True
+                    page_records.append(NewsRecord(
+                        timestamp=timestamp,
+                        title=article['title'],
+                        source=article['source']['name'],
+                        author=article.get('author', 'Unknown'),
+                        published_at=article['publishedAt'],
+                        url=article['url'],
+                        # The API sends null for articles without a description
+                        description=(article.get('description') or '')[:200]
+                    ))
+
+                if fields.get('status') != 'ok':
+                    print(f"❌ API returned error: {fields.get('message', 'Unknown error')}")
+                    print("   Check your API key is valid and not expired")
+                    return None
+
+                articles.extend(page_records)
+
+                # Stop at the last page, or once we reach articles collected before
+                if (not page_records
+                        or len(articles) >= fields.get('totalResults', 0)
+                        or reached_collected):
+                    break
+
+            fetched = len(articles)
+
+            # Keep only articles whose URL hasn't been collected yet. They
+            # count as collected once they are saved (see saved()); until
+            # then they are reserved, so an overlapping run skips them too
+            if incremental:
+                unique = {}
+                for article in articles:
+                    unique.setdefault(self.article_key(article), article)
+                articles = []
+                with self._lock:
+                    for key, article in unique.items():
+                        if key in self._unsaved:
+                            # Fetched earlier, its save is still pending
+                            self._unsaved[key].add((category, country))
+                        elif not news_index.seen(key):
+                            self._unsaved[key] = {(category, country)}
+                            articles.append(article)
+
+            print(f"✓ Successfully fetched {len(articles)} news articles")
+            if incremental and fetched > len(articles):
+                print(f"  ({fetched - len(articles)} already collected, skipped)")
+            return articles
+
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching news data: {e}")
+            return None
+
+    def fetch_feeds(self, feeds, max_pages=1, max_workers=None):
+        """
+        Fetch many (category, country) news feeds concurrently within
+        the NewsAPI daily quota.
+
+        Feeds that most often produce new articles are fetched first;
+        feeds that rarely do, or don't fit in this run's share of the
+        quota, are skipped. Articles are merged into one list without duplicates
+        (an article listed in several feeds is only returned once).
+
+        Args:
+            feeds (list): (category, country) tuples
+            max_pages (int): Maximum number of pages per feed
+            max_workers (int): Concurrency limit (default: the assistant's max_workers)
+
+        Returns:
+            tuple: (articles, failures, skipped) - new articles, and lists
+                of (feed, reason) tuples for failed and skipped feeds
+        """
+        if not os.getenv('NEWS_API_KEY'):
+            # Let fetch_feed explain how to set the key, once
+            self.fetch_feed()
+            return [], [], [(feed, "no API key") for feed in feeds]
+
+        news_index = self.assistant.news_index
+
+        # Requests this run may use, pacing the daily quota across runs
+        budget = news_index.request_budget(self.assistant.news_daily_quota,
+                                           self.assistant.news_quota_reserve)
+        budget //= max(1, max_pages)
+        selected, skipped = news_index.plan_feeds(feeds, budget)
+
+        def fetch(feed):
+            category, country = feed
+            articles = self.fetch_feed(category, country, max_pages=max_pages)
+            if articles is not None:
+                news_index.record_fetch(category, country, len(articles))
+            return articles
+
+        results, failures = fetch_all(fetch, selected, max_workers=max_workers or self.max_workers)
+        unique = {}
+        for result in results:
+            for article in result:
+                unique.setdefault(self.article_key(article), article)
+        return list(unique.values()), failures, skipped
+
+    def saved(self, data):
+        """
+        Record saved articles in the news index and move their feeds'
+        high-water marks forward.
+
+        Args:
+            data (list or RecordBatch): The saved records
+        """
+        if not self._unsaved or (isinstance(data, RecordBatch) and data.record_type is not NewsRecord):
+            return
+
+        news_index = self.assistant.news_index
+        newest = {}
+        for article in as_rows(data):
+            if not isinstance(article, NewsRecord):
+                continue
+            key = self.article_key(article)
+            # Indexed before the reservation is released, so a concurrent
+            # fetch always sees the article as reserved or as collected
+            with self._lock:
+                feeds = self._unsaved.pop(key, ())
+                if not feeds:
+                    continue
+                news_index.add(key)
+            for feed in feeds:
+                newest[feed] = max(newest.get(feed, article.published_at), article.published_at)
+
+        for (category, country), published_at in newest.items():
+            news_index.update_high_water_mark(category, country, published_at)
+
+    def save_failed(self, data):
+        """
+        Release the reservation of articles whose save failed, so the next
+        run fetches them again.
+
+        Args:
+            data (list or RecordBatch): The records that were not saved
+        """
+        if not self._unsaved or (isinstance(data, RecordBatch) and data.record_type is not NewsRecord):
+            return
+
+        with self._lock:
+            for article in as_rows(data):
+                if isinstance(article, NewsRecord):
+                    self._unsaved.pop(self.article_key(article), None)
+
+    def fetch(self, category="technology", feeds=None, max_workers=None):
+        """
+        Fetch one category, or several feeds, reporting failed and skipped feeds.
+
+        Args:
+            category (str): News category to fetch
+            feeds (list): (category, country) tuples to fetch concurrently
+                instead of a single category (see fetch_feeds)
+            max_workers (int): Concurrency limit for feeds (default: the assistant's max_workers)
+
+        Returns:
+            list: New NewsRecord articles, or None if the request failed
+        """
+        if not feeds:
+            return self.fetch_feed(category=category)
+
+        feeds = list(dict.fromkeys(feeds))
+        news_data, failures, skipped = self.fetch_feeds(feeds, max_workers=max_workers)
+
+        fetched = len(feeds) - len(failures) - len(skipped)
+        print(f"\n✓ {len(news_data)} new article(s) from {fetched} of {len(feeds)} feed(s)")
+
+        if failures:
+            print(f"\n⚠️  {len(failures)} feed(s) failed:")
+            for (feed_category, country), reason in failures:
+                print(f"   - {feed_category}/{country}: {reason}")
+
+        if skipped:
+            print(f"\nℹ️  {len(skipped)} feed(s) skipped:")
+            for (feed_category, country), reason in skipped:
+                print(f"   - {feed_category}/{country}: {reason}")
+
+        quota = self.assistant.news_index.quota(self.assistant.news_daily_quota)
+        print(f"\n📊 NewsAPI quota: {quota['used']} request(s) used today, {quota['remaining']} left")
+        return news_data
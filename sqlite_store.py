@@ -0,0 +1,334 @@
+"""
+SQLite Time-Series Store
+========================
+Optional indexed storage for the CSV version.
+
+CSV files can only be queried by re-reading them from the start and
+happily store the same record twice. This store keeps one table per
+dataset in an SQLite database (WAL mode, so readers never block the
+writer):
+
+- indexes on (entity, timestamp) for fast range queries
+- a latest_<dataset> table per time series holding each entity's newest
+  record, kept up to date by every upsert, so "latest" queries read one
+  row per entity instead of the whole history
+- unique constraints, so saving the same record again updates it
+  instead of adding a duplicate (idempotent upserts)
+- bulk inserts with executemany inside a single transaction
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import os
+import sqlite3
+import threading
+
+from records import as_rows, iter_values
+
+
+# Articles are keyed by URL, or by title if they have none (like the news index)
+NEWS_KEY = "COALESCE(NULLIF(url, ''), title)"
+
+# Dataset name -> (columns, unique key columns or expressions)
+DATASETS = {
+    'weather': (
+        ['timestamp', 'city', 'temperature_celsius', 'windspeed_kmh',
+         'weather_code', 'latitude', 'longitude'],
+        ['city', 'timestamp']
+    ),
+    'crypto': (
+        ['timestamp', 'cryptocurrency', 'price_usd', 'market_cap_usd',
+         'change_24h_percent'],
+        ['cryptocurrency', 'timestamp']
+    ),
+    'news': (
+        ['timestamp', 'title', 'source', 'author', 'published_at', 'url',
+         'description'],
+        [NEWS_KEY]
+    ),
+}
+
+# Time series dataset -> entity column; latest_<dataset> keeps the newest record per entity
+LATEST = {
+    'weather': 'city',
+    'crypto': 'cryptocurrency',
+}
+
+# CSV file names used by the assistants -> dataset name
+DATASET_FOR_FILE = {
+    'weather_data.csv': 'weather',
+    'crypto_prices.csv': 'crypto',
+    'latest_news.csv': 'news',
+}
+
+NEWS_TABLE = """
+CREATE TABLE IF NOT EXISTS news (
+    timestamp TEXT NOT NULL,
+    title TEXT,
+    source TEXT,
+    author TEXT,
+    published_at TEXT,
+    url TEXT,
+    description TEXT
+);
+"""
+
+SCHEMA = NEWS_TABLE + f"""
+CREATE TABLE IF NOT EXISTS weather (
+    timestamp TEXT NOT NULL,
+    city TEXT NOT NULL,
+    temperature_celsius REAL,
+    windspeed_kmh REAL,
+    weather_code INTEGER,
+    latitude REAL,
+    longitude REAL,
+    UNIQUE (city, timestamp)
+);
+CREATE TABLE IF NOT EXISTS crypto (
+    timestamp TEXT NOT NULL,
+    cryptocurrency TEXT NOT NULL,
+    price_usd REAL,
+    market_cap_usd REAL,
+    change_24h_percent REAL,
+    UNIQUE (cryptocurrency, timestamp)
+);
+CREATE TABLE IF NOT EXISTS latest_weather (
+    timestamp TEXT NOT NULL,
+    city TEXT PRIMARY KEY,
+    temperature_celsius REAL,
+    windspeed_kmh REAL,
+    weather_code INTEGER,
+    latitude REAL,
+    longitude REAL
+);
+CREATE TABLE IF NOT EXISTS latest_crypto (
+    timestamp TEXT NOT NULL,
+    cryptocurrency TEXT PRIMARY KEY,
+    price_usd REAL,
+    market_cap_usd REAL,
+    change_24h_percent REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_key ON news ({NEWS_KEY});
+CREATE INDEX IF NOT EXISTS idx_weather_timestamp ON weather (timestamp);
+CREATE INDEX IF NOT EXISTS idx_crypto_timestamp ON crypto (timestamp);
+CREATE INDEX IF NOT EXISTS idx_news_source_published ON news (source, published_at);
+CREATE INDEX IF NOT EXISTS idx_news_published ON news (published_at);
+"""
+
+
+class TimeSeriesStore:
+    """
+    SQLite store for collected weather, crypto and news records.
+    Safe to use from multiple threads.
+
+    The UNIQUE (entity, timestamp) constraints double as the
+    (entity, timestamp) indexes used by the query methods.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) the database.
+
+        Args:
+            path (str): Path of the SQLite database file
+        """
+        self.path = path
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        tables = {row['name'] for row in self._db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self._db.executescript(SCHEMA)
+        for dataset in LATEST:
+            if f"latest_{dataset}" not in tables:
+                self._fill_latest(dataset)
+        self._db.commit()
+
+    def _migrate(self):
+        """
+        Update a database created by an older version: news.url used to be
+        NOT NULL (and the unique key), which rejected articles without a URL.
+        """
+        columns = {row['name']: row for row in self._db.execute("PRAGMA table_info(news)")}
+        if 'url' not in columns or not columns['url']['notnull']:
+            return
+
+        # SQLite can't drop a constraint, so the table is copied
+        names = ', '.join(DATASETS['news'][0])
+        self._db.execute("BEGIN")
+        try:
+            self._db.execute("ALTER TABLE news RENAME TO news_old")
+            self._db.execute(NEWS_TABLE)
+            self._db.execute(f"INSERT INTO news ({names}) SELECT {names} FROM news_old")
+            self._db.execute("DROP TABLE news_old")
+            self._db.commit()
+        except sqlite3.Error:
+            self._db.rollback()
+            raise
+
+    def _fill_latest(self, dataset):
+        """
+        Fill a latest_<dataset> table from the stored history (once, when
+        the table is added to an existing database).
+        """
+        columns = ', '.join(DATASETS[dataset][0])
+        entity = LATEST[dataset]
+        self._db.execute(
+            f"INSERT INTO latest_{dataset} ({columns})"
+            f" SELECT {columns} FROM {dataset}"
+            f" JOIN (SELECT {entity}, MAX(timestamp) AS timestamp"
+            f"       FROM {dataset} GROUP BY {entity}) USING ({entity}, timestamp)"
+        )
+
+    def upsert(self, dataset, rows):
+        """
+        Insert records, updating any that already exist.
+
+        Args:
+            dataset (str): 'weather', 'crypto' or 'news'
+            rows (list, dict or RecordBatch): Records with the dataset's columns
+
+        Returns:
+            int: Number of records written
+        """
+        rows = as_rows(rows)
+        if not len(rows):
+            return 0
+
+        columns, key = DATASETS[dataset]
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c not in key)
+        sql = (
+            f"INSERT INTO {dataset} ({', '.join(columns)})"
+            f" VALUES ({', '.join('?' for _ in columns)})"
+            f" ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}"
+        )
+        values = list(iter_values(rows, columns))
+
+        with self._lock:
+            # "with" wraps all rows in one transaction
+            with self._db:
+                self._db.executemany(sql, values)
+                if dataset in LATEST:
+                    self._db.executemany(self._latest_sql(dataset), values)
+
+        return len(values)
+
+    @staticmethod
+    def _latest_sql(dataset):
+        """Build the upsert that keeps latest_<dataset> at each entity's newest record."""
+        columns = DATASETS[dataset][0]
+        entity = LATEST[dataset]
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns if c != entity)
+        return (
+            f"INSERT INTO latest_{dataset} ({', '.join(columns)})"
+            f" VALUES ({', '.join('?' for _ in columns)})"
+            f" ON CONFLICT ({entity}) DO UPDATE SET {updates}"
+            f" WHERE excluded.timestamp >= latest_{dataset}.timestamp"
+        )
+
+    @staticmethod
+    def _time_filter(start, end):
+        """Build the optional "timestamp between" part of a WHERE clause."""
+        sql, params = '', []
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND timestamp <= ?"
+            params.append(end)
+        return sql, params
+
+    def _query(self, sql, params=()):
+        """Run a query and return the rows as dicts."""
+        with self._lock:
+            return [dict(row) for row in self._db.execute(sql, params).fetchall()]
+
+    def latest_prices(self):
+        """
+        Get the latest stored price of every cryptocurrency.
+
+        Returns:
+            list: One dict per coin with its most recent record
+        """
+        return self._query("SELECT * FROM latest_crypto ORDER BY cryptocurrency")
+
+    def price_history(self, cryptocurrency, start=None, end=None):
+        """
+        Get the stored prices of one coin between two timestamps.
+
+        Args:
+            cryptocurrency (str): Coin name as saved, e.g. "Bitcoin"
+            start (str): First timestamp ('YYYY-MM-DD HH:MM:SS', default: no limit)
+            end (str): Last timestamp (default: no limit)
+
+        Returns:
+            list: Records ordered by timestamp
+        """
+        time_sql, time_params = self._time_filter(start, end)
+        return self._query(
+            "SELECT * FROM crypto WHERE cryptocurrency = ?" + time_sql + " ORDER BY timestamp",
+            [cryptocurrency] + time_params
+        )
+
+    def latest_weather(self):
+        """
+        Get the latest stored weather of every city.
+
+        Returns:
+            list: One dict per city with its most recent record
+        """
+        return self._query("SELECT * FROM latest_weather ORDER BY city")
+
+    def temperature_range(self, city, start=None, end=None):
+        """
+        Get the min/max/average temperature of a city over a time range.
+
+        Args:
+            city (str): City name as saved
+            start (str): First timestamp ('YYYY-MM-DD HH:MM:SS', default: no limit)
+            end (str): Last timestamp (default: no limit)
+
+        Returns:
+            dict: min, max, avg temperature and number of readings
+        """
+        time_sql, time_params = self._time_filter(start, end)
+        rows = self._query(
+            "SELECT MIN(temperature_celsius) AS min, MAX(temperature_celsius) AS max,"
+            " AVG(temperature_celsius) AS avg, COUNT(*) AS readings"
+            " FROM weather WHERE city = ?" + time_sql,
+            [city] + time_params
+        )
+        return rows[0]
+
+    def latest_news(self, limit=10, source=None):
+        """
+        Get the most recently published articles.
+
+        Args:
+            limit (int): Maximum number of articles
+            source (str): Only articles from this source (default: all)
+
+        Returns:
+            list: Articles, newest first
+        """
+        if source is None:
+            return self._query(
+                "SELECT * FROM news ORDER BY published_at DESC LIMIT ?", (limit,)
+            )
+        return self._query(
+            "SELECT * FROM news WHERE source = ? ORDER BY published_at DESC LIMIT ?",
+            (source, limit)
+        )
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,120 @@
+"""
+Startup Check
+=============
+Guards the start-up time of the scripts, which matters because cron
+starts a fresh process for every run.
+
+Imports a module in a fresh interpreter with `python -X importtime`
+and fails if:
+
+- a heavy library that should only be loaded on first use (the Google
+  client libraries, pyarrow, OpenTelemetry) is imported at start-up, or
+- the whole import takes longer than the time budget
+
+    python startup_check.py                     # Google Sheets version, 300ms budget
+    python startup_check.py --budget-ms 200
+
+Exits with status 1 when a check fails, so it can run in CI or before
+deploying.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+# Packages that must only be imported on first use
+LAZY_IMPORTS = ('googleapiclient', 'google.oauth2', 'google.auth', 'httplib2', 'pyarrow',
+                'opentelemetry')
+
+
+def measure_imports(module):
+    """
+    Import a module in a fresh interpreter and collect -X importtime data.
+
+    Args:
+        module (str): Module to import
+
+    Returns:
+        dict: {module name: (self microseconds, cumulative microseconds)}
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name == 'site':
+            # Everything so far was the interpreter's own start-up
+            timings.clear()
+            continue
+        timings[name] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def check_startup(module, budget_ms, lazy=LAZY_IMPORTS, repeat=3):
+    """
+    Check that a module imports quickly and without the lazy packages.
+
+    Args:
+        module (str): Module to import
+        budget_ms (float): Maximum cumulative import time (best of `repeat`)
+        lazy (tuple): Packages that must not be imported at start-up
+        repeat (int): Fresh imports to measure (the fastest one counts)
+
+    Returns:
+        tuple: (ok, total milliseconds, eager lazy packages, timings of the fastest run)
+    """
+    best = None
+    for _ in range(repeat):
+        timings = measure_imports(module)
+        total_ms = timings[module][1] / 1000
+        if best is None or total_ms < best[0]:
+            best = (total_ms, timings)
+
+    total_ms, timings = best
+    eager = sorted(
+        name for name in timings
+        if any(name == package or name.startswith(package + '.') for package in lazy)
+    )
+    ok = total_ms <= budget_ms and not eager
+    return ok, total_ms, eager, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the import time of a script")
+    parser.add_argument('--module', default='automation_assistant_gsheets',
+                        help="Module to import (default: automation_assistant_gsheets)")
+    parser.add_argument('--budget-ms', type=float, default=300,
+                        help="Maximum import time in milliseconds (default: 300)")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports to list (default: 10)")
+    args = parser.parse_args()
+
+    ok, total_ms, eager, timings = check_startup(args.module, args.budget_ms)
+
+    print(f"Import of {args.module}: {total_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    print("\nSlowest imports (cumulative):")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (_, cumulative_us) in slowest[1:args.top + 1]:
+        print(f"   {cumulative_us / 1000:>8.1f}ms  {name}")
+
+    if eager:
+        print(f"\n❌ Imported at start-up but should be lazy: {', '.join(eager[:10])}"
+              f"{' ...' if len(eager) > 10 else ''}")
+    if total_ms > args.budget_ms:
+        print(f"\n❌ Start-up is over budget by {total_ms - args.budget_ms:.0f}ms")
+    if ok:
+        print("\n✓ Start-up check passed")
+
+    sys.exit(0 if ok else 1)
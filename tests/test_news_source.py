@@ -0,0 +1,92 @@
+"""
+Tests for NewsSource: articles fetched by one run are reserved until
+they are saved, so overlapping runs never save an article twice.
+"""
+
+import csv
+import json
+import os
+import threading
+
+import pytest
+import requests
+
+from automation_assistant_csv import AutomationAssistant
+
+
+ARTICLES = [
+    {
+        'title': f"Article {i}",
+        'source': {'name': "Example"},
+        'author': "Author",
+        'publishedAt': f"2026-01-01T00:00:{i:02d}Z",
+        'url': f"https://example.com/{i}",
+        'description': "Description",
+    }
+    for i in range(30)
+]
+
+
+class CannedClient:
+    """HTTP client that answers every request with the same NewsAPI page."""
+
+    def get(self, url, params=None, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(
+            {'status': 'ok', 'totalResults': len(ARTICLES), 'articles': ARTICLES}
+        ).encode('utf-8')
+        response.from_cache = True
+        response.requests_sent = 0
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def assistant(tmp_path, monkeypatch):
+    monkeypatch.setenv('NEWS_API_KEY', 'test-key')
+    assistant = AutomationAssistant(data_folder=str(tmp_path), http_client=CannedClient(),
+                                    skip_unchanged=False)
+    yield assistant
+    assistant.close()
+
+
+def saved_urls(assistant):
+    with open(os.path.join(assistant.data_folder, 'latest_news.csv'), newline='', encoding='utf-8') as f:
+        return [row['url'] for row in csv.DictReader(f)]
+
+
+def test_overlapping_runs_save_each_article_once(assistant):
+    # Hold the write-behind worker so the second run starts before the first is saved
+    release = threading.Event()
+    get_writer = assistant.csv_writers.get
+
+    def slow_get(filename):
+        release.wait(5)
+        return get_writer(filename)
+
+    assistant.csv_writers.get = slow_get
+    assistant.run_news_automation()
+    assistant.run_news_automation()
+    release.set()
+    assistant.close()
+
+    urls = saved_urls(assistant)
+    assert len(urls) == len(ARTICLES)
+    assert len(set(urls)) == len(ARTICLES)
+
+
+def test_failed_save_releases_articles(assistant):
+    get_writer = assistant.csv_writers.get
+
+    def failing_get(filename):
+        raise OSError("disk full")
+
+    assistant.csv_writers.get = failing_get
+    assistant.run_news_automation()
+    assistant.write_queue.join()
+
+    assistant.csv_writers.get = get_writer
+    assert len(assistant.fetch_news()) == len(ARTICLES)
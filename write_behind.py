@@ -0,0 +1,162 @@
+"""
+Write-Behind Queue
+==================
+Decouples fetching from saving, for both the CSV and Google Sheets
+versions.
+
+Fetchers put their records on a bounded queue and return immediately;
+background writer threads drain the queue by calling the usual
+save_to_csv / save_to_sheet method, so the output is exactly the same.
+When the queue is full, put() waits (backpressure) instead of letting
+memory grow without limit.
+
+Author: Blessing Onyekanna
+Date: 2025
+"""
+
+import queue
+import threading
+import time
+
+from records import as_rows
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of pending saves drained by background writer threads.
+
+    With the default single writer, saves happen in the order they were
+    queued. More writers increase throughput but may reorder saves.
+    """
+
+    def __init__(self, sink, maxsize=100, workers=1, on_error=None):
+        """
+        Initialize the queue and start the writer threads.
+
+        Args:
+            sink (callable): Function called as sink(data, target), e.g. save_to_csv
+            maxsize (int): Maximum number of pending saves before put() blocks
+            workers (int): Number of background writer threads
+            on_error (callable): Called as on_error(data, target) when the sink raises
+        """
+        self.sink = sink
+        self.on_error = on_error
+        self.maxsize = maxsize
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.rows_written = 0
+        self.max_depth = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._threads = []
+
+        for index in range(max(1, workers)):
+            thread = threading.Thread(
+                target=self._worker, name=f"write-behind-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, data, target, timeout=None):
+        """
+        Queue data to be saved by a background writer.
+        Blocks while the queue is full.
+
+        Args:
+            data (list or dict): Records to save
+            target (str): Where to save them (file name or sheet name)
+            timeout (float): Max seconds to wait for space (None = forever)
+
+        Raises:
+            queue.Full: If there is still no space after `timeout` seconds
+            RuntimeError: If the queue has been closed
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+
+        self._queue.put((time.monotonic(), data, target), timeout=timeout)
+
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _worker(self):
+        """Writer thread: save queued data until told to stop."""
+        while True:
+            item = self._queue.get()
+
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            queued_at, data, target = item
+            try:
+                self.sink(data, target)
+                ok = True
+            except Exception as e:
+                ok = False
+                print(f"❌ Background write to '{target}' failed: {e}")
+                if self.on_error is not None:
+                    self.on_error(data, target)
+
+            lag = time.monotonic() - queued_at
+            with self._lock:
+                if ok:
+                    self.written += 1
+                    self.rows_written += len(as_rows(data))
+                else:
+                    self.failed += 1
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+
+            self._queue.task_done()
+
+    @property
+    def depth(self):
+        """Number of saves waiting in the queue."""
+        return self._queue.qsize()
+
+    def join(self):
+        """Wait until every queued save has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Drain the queue, then stop the writer threads. Safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        """
+        Get queue metrics.
+
+        Returns:
+            dict: depth, max_depth, enqueued, written, failed, rows_written,
+                last_lag and max_lag (seconds between queueing and saving)
+        """
+        with self._lock:
+            return {
+                'depth': self._queue.qsize(),
+                'max_depth': self.max_depth,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'failed': self.failed,
+                'rows_written': self.rows_written,
+                'last_lag': self.last_lag,
+                'max_lag': self.max_lag
+            }